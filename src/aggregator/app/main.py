@@ -1,21 +1,57 @@
+from asyncio import Task, create_task, gather
+from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from datetime import datetime
 from os import getenv
-from typing import cast
+from subprocess import Popen
+from time import perf_counter
+from typing import Annotated, Any, Literal, cast
+from zlib import compressobj
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from orjson import dumps
+from pydantic import ValidationError
 
+from .models.event_cursor import EventCursorModel
 from .models.event_response import EventResponseModel
 from .models.events import EventModel
-from .models.publish_request import PublishRequestModel
-from .models.stats_response import StatsResponseModel
-from .services.consumer import ConsumerService
-from .services.event_queue import EventQueueService
+from .models.publish_request import EventRequestModel, PublishRequestModel
+from .models.stats_response import (
+    IndexStatsModel,
+    QueueStatsModel,
+    StatsResponseModel,
+)
+from .services.consumer import ConsumerService, configure_log_sink
+from .services.event_queue import QueueFullError
+from .services.metrics import MetricsService, MetricsSnapshot, render_metrics
+from .services.ndjson_reader import InvalidStreamError, decompress_gzip, iter_lines
+from .services.response_cache import ResponseCache, etag_matches
+from .services.writer_client import WriterClient
+
+WRITER_SOCKETS: str = getenv(key="AGGREGATOR_WRITER_SOCKETS", default="")
+PUBLISH_STREAM_BATCH_SIZE: int = max(
+    1, int(getenv(key="PUBLISH_STREAM_BATCH_SIZE", default="500"))
+)
+PUBLISH_STREAM_MAX_LINE_BYTES: int = int(
+    getenv(key="PUBLISH_STREAM_MAX_LINE_BYTES", default="1048576")
+)
+PUBLISH_STREAM_MAX_ERRORS: int = 100
+PUBLISH_STREAM_DURABLE_IN_FLIGHT: int = 4
 
-consumer: ConsumerService = ConsumerService()
+consumer: ConsumerService | WriterClient = (
+    WriterClient(WRITER_SOCKETS.split(",")) if WRITER_SOCKETS else ConsumerService()
+)
+metrics: MetricsService = MetricsService()
+response_cache: ResponseCache = ResponseCache(
+    int(getenv(key="RESPONSE_CACHE_BYTES", default="16777216"))
+)
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):  # noqa: ANN201
+    configure_log_sink()
     await consumer.initialize()
     await consumer.start()
 
@@ -24,6 +60,11 @@ async def lifespan(_app: FastAPI):  # noqa: ANN201
     await consumer.close()
 
 
+PUBLISH_REQUEST_SCHEMA: dict[str, Any] = PublishRequestModel.inline_json_schema()
+EVENT_REQUEST_SCHEMA: dict[str, Any] = PUBLISH_REQUEST_SCHEMA["properties"]["events"][
+    "items"
+]
+
 app: FastAPI = FastAPI(
     title="ChronicleWeaver",
     description="Publish-Subscribe Log Aggregator",
@@ -37,59 +78,297 @@ def root() -> dict[str, str]:
     return {"message": "ChronicleWeaver is running..."}
 
 
-@app.post(path="/publish")
-async def publish_events(request: PublishRequestModel) -> dict[str, str | int]:
+@app.post(
+    path="/publish",
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": PUBLISH_REQUEST_SCHEMA}},
+            "required": True,
+        }
+    },
+)
+async def publish_events(
+    request: Request, ack: Literal["queued", "durable"] = "queued"
+) -> dict[str, object]:
+    started_at: float = perf_counter()
+    body: bytes = await request.body()
+
     try:
-        queue: EventQueueService = EventQueueService()
-
-        for event_request in request.events:
-            event: EventModel = EventModel(
-                event_id=event_request.event_id,
-                topic=event_request.topic,
-                source=event_request.source,
-                payload=event_request.payload,
-                timestamp=event_request.timestamp,
-            )
+        publish_request: PublishRequestModel = PublishRequestModel.model_validate_json(
+            body
+        )
+    except ValidationError as e:
+        raise RequestValidationError(errors=e.errors(include_url=False), body=body)
+
+    try:
+        events: list[EventModel] = list[EventModel](publish_request.events)
+        results: list[str] | None = await consumer.publish(
+            events, len(body), durable=ack == "durable"
+        )
+
+        metrics.observe("publish_seconds", perf_counter() - started_at)
+        metrics.observe("publish_events", len(events))
 
-            await queue.put(event)
+        if results is None:
+            return {
+                "status": "success",
+                "message": f"Published {len(events)} events",
+                "events_count": len(events),
+            }
+
+        accepted: int = results.count("accepted")
 
         return {
             "status": "success",
-            "message": f"Published {len(request.events)} events",
-            "events_count": len(request.events),
+            "message": f"Committed {len(events)} events",
+            "events_count": len(events),
+            "accepted": accepted,
+            "duplicates": len(results) - accepted,
+            "results": results,
         }
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Failed to publish events: {str(e)}",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except TimeoutError:
+        raise HTTPException(
+            status_code=504, detail="Timed out waiting for events to be committed"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to publish events: {str(e)}"
         )
 
 
-@app.get(path="/events", response_model=EventResponseModel)
-async def get_events(topic: str | None = None) -> EventResponseModel:
+def parse_stream_line(line: bytes | None) -> EventModel | list[Any]:
+    if line is None:
+        return [
+            {
+                "type": "line_too_long",
+                "loc": [],
+                "msg": f"Line exceeds {PUBLISH_STREAM_MAX_LINE_BYTES} bytes",
+            }
+        ]
+
     try:
-        if topic is None:
-            events: list[EventModel] = consumer.get_all_events()
+        return EventRequestModel.model_validate_json(line)
+    except ValidationError as e:
+        return e.errors(include_url=False, include_context=False, include_input=False)
+
+
+@app.post(
+    path="/publish/stream",
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/x-ndjson": {"schema": EVENT_REQUEST_SCHEMA}},
+            "required": True,
+        }
+    },
+)
+async def publish_stream(
+    request: Request, ack: Literal["queued", "durable"] = "queued"
+) -> dict[str, object]:
+    started_at: float = perf_counter()
+    durable: bool = ack == "durable"
+    chunks: AsyncIterator[bytes] = request.stream()
+    if "gzip" in request.headers.get("content-encoding", ""):
+        chunks = decompress_gzip(chunks)
+
+    batch: list[EventModel] = []
+    batch_bytes: int = 0
+    published: int = 0
+    rejected: int = 0
+    errors: list[dict[str, object]] = []
+    in_flight: list[Task[list[str] | None]] = []
+    results: list[str] = []
+
+    async def flush() -> None:
+        nonlocal batch, batch_bytes, published
+
+        events, size = batch, batch_bytes
+        batch, batch_bytes = [], 0
+
+        if not durable:
+            _ = await consumer.publish(events, size)
         else:
-            events = consumer.get_events_by_topic(topic)
+            in_flight.append(create_task(consumer.publish(events, size, durable=True)))
+            if len(in_flight) >= PUBLISH_STREAM_DURABLE_IN_FLIGHT:
+                results.extend(cast(list[str], await in_flight.pop(0)))
 
-        return EventResponseModel(count=len(events), events=events)
+        published += len(events)
+
+    try:
+        async for line_number, line in iter_lines(
+            chunks, PUBLISH_STREAM_MAX_LINE_BYTES
+        ):
+            event: EventModel | list[Any] = parse_stream_line(line)
+            if isinstance(event, EventModel):
+                batch.append(event)
+                batch_bytes += len(cast(bytes, line))
+                if len(batch) >= PUBLISH_STREAM_BATCH_SIZE:
+                    await flush()
+            else:
+                rejected += 1
+                if len(errors) < PUBLISH_STREAM_MAX_ERRORS:
+                    errors.append({"line": line_number, "errors": event})
+
+        if batch:
+            await flush()
+
+        for result in await gather(*in_flight):
+            results.extend(cast(list[str], result))
+        in_flight.clear()
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Failed to publish events after {published} events: {str(e)}",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except InvalidStreamError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to read stream after {published} events: {str(e)}",
+        )
+    except TimeoutError:
+        raise HTTPException(
+            status_code=504, detail="Timed out waiting for events to be committed"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to publish events after {published} events: {str(e)}",
+        )
+    finally:
+        for task in in_flight:
+            _ = task.cancel()
+
+    metrics.observe("publish_seconds", perf_counter() - started_at)
+    metrics.observe("publish_events", published)
+
+    response: dict[str, object] = {
+        "status": "success" if not rejected else "partial",
+        "message": f"{'Committed' if durable else 'Published'} {published} events",
+        "events_count": published,
+        "rejected": rejected,
+        "errors": errors,
+    }
+
+    if durable:
+        accepted: int = results.count("accepted")
+        response["accepted"] = accepted
+        response["duplicates"] = len(results) - accepted
+
+    return response
+
+
+@app.get(path="/events", response_model=EventResponseModel)
+async def get_events(
+    request: Request,
+    topic: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=10000)] = 1000,
+    cursor: str | None = None,
+    from_: Annotated[datetime | None, Query(alias="from")] = None,
+    to: datetime | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Response:
+    try:
+        position: EventCursorModel = (
+            EventCursorModel.decode(cursor) if cursor else EventCursorModel(after=0)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        version: int = await consumer.get_version(topic)
+        etag: str = f'"{version}"'
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(
+                status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"}
+            )
+
+        key: str = f"/events?{request.url.query}"
+        content: bytes | None = response_cache.get(key, version)
+        if content is None:
+            events, next_cursor = await consumer.get_events_page(
+                topic, position, limit, from_ or since, to or until
+            )
+            content = b'{"count":%d,"events":[%b],"next_cursor":%b}' % (
+                len(events),
+                b",".join(events),
+                dumps(next_cursor.encode()) if next_cursor is not None else b"null",
+            )
+            response_cache.put(key, version, content)
+
+        return Response(
+            content=content,
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": "no-cache"},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to retrieve events: {str(e)}"
         )
 
 
+@app.get(path="/events/stream")
+async def stream_events(
+    request: Request,
+    topic: str | None = None,
+    from_: Annotated[datetime | None, Query(alias="from")] = None,
+    to: datetime | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> StreamingResponse:
+    chunks: AsyncIterator[bytes] = consumer.iter_events_ndjson(
+        topic, from_ or since, to or until
+    )
+
+    if "gzip" not in request.headers.get("accept-encoding", ""):
+        return StreamingResponse(content=chunks, media_type="application/x-ndjson")
+
+    async def compress() -> AsyncIterator[bytes]:
+        compressor = compressobj(wbits=31)
+
+        async for chunk in chunks:
+            if compressed := compressor.compress(chunk):
+                yield compressed
+
+        yield compressor.flush()
+
+    return StreamingResponse(
+        content=compress(),
+        media_type="application/x-ndjson",
+        headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+    )
+
+
 @app.get(path="/stats", response_model=StatsResponseModel)
-async def get_stats() -> StatsResponseModel:
+async def get_stats(
+    request: Request, response: Response
+) -> StatsResponseModel | Response:
     try:
-        stats: dict[str, object] = consumer.get_stats()
+        etag: str = f'W/"{await consumer.get_version()}"'
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(
+                status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"}
+            )
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        stats: dict[str, object] = await consumer.get_stats()
 
         return StatsResponseModel(
             received=cast(int, stats["received"]),
             unique_processed=cast(int, stats["unique_processed"]),
             duplicated_dropped=cast(int, stats["duplicated_dropped"]),
+            reaccepted=cast(int, stats["reaccepted"]),
             topics=cast(list[str], stats["topics"]),
             uptime=cast(int, stats["uptime"]),
+            queue=QueueStatsModel.model_validate(stats["queue"]),
+            index=IndexStatsModel.model_validate(stats["index"]),
         )
     except Exception as e:
         raise HTTPException(
@@ -97,14 +376,55 @@ async def get_stats() -> StatsResponseModel:
         )
 
 
+@app.get(path="/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    try:
+        snapshot: MetricsSnapshot = await consumer.get_metrics()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to retrieve metrics: {str(e)}"
+        )
+
+    return PlainTextResponse(
+        content=render_metrics(snapshot),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.get(path="/health")
 async def get_health() -> dict[str, str]:
     return {"message": "healthy"}
 
 
 if __name__ == "__main__":
+    from signal import SIGTERM, signal
+    from sys import exit
+
     import uvicorn
 
+    from .writer import start_writers, stop_writers
+
     APP_PORT: int = int(getenv(key="APP_PORT", default="8000"))
+    HTTP_WORKERS: int = max(1, int(getenv(key="AGGREGATOR_HTTP_WORKERS", default="1")))
+    WRITERS: int = max(
+        int(getenv(key="AGGREGATOR_WRITERS", default="0")),
+        1 if HTTP_WORKERS > 1 else 0,
+    )
 
-    uvicorn.run(app, host="0.0.0.0", port=APP_PORT)
+    if WRITERS == 0:
+        uvicorn.run(app, host="0.0.0.0", port=APP_PORT)
+    else:
+        writers: list[Popen[bytes]] = start_writers(WRITERS)
+        # uvicorn re-raises the captured SIGTERM after shutdown; turn it into
+        # SystemExit so the writers are stopped instead of orphaned.
+        _ = signal(SIGTERM, lambda *_: exit(0))
+
+        try:
+            uvicorn.run(
+                "src.aggregator.app.main:app",
+                host="0.0.0.0",
+                port=APP_PORT,
+                workers=HTTP_WORKERS,
+            )
+        finally:
+            stop_writers(writers)
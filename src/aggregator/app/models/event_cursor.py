@@ -0,0 +1,24 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from pydantic import BaseModel, NonNegativeInt
+
+
+class EventCursorModel(BaseModel):
+    after: NonNegativeInt
+    timestamp: int | None = None
+
+    def encode(self) -> str:
+        return (
+            urlsafe_b64encode(self.model_dump_json(exclude_none=True).encode())
+            .decode()
+            .rstrip("=")
+        )
+
+    @classmethod
+    def decode(cls, cursor: str) -> "EventCursorModel":
+        try:
+            return cls.model_validate_json(
+                urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            )
+        except ValueError as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -6,3 +6,4 @@ from .events import EventModel
 class EventResponseModel(BaseModel):
     count: int
     events: list[EventModel]
+    next_cursor: str | None = None
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class EventPayloadModel(BaseModel):
@@ -14,3 +14,6 @@ class EventModel(BaseModel):
     source: str
     payload: EventPayloadModel
     timestamp: datetime = Field(default=..., description="ISO 8601 timestamp")
+
+
+EVENTS_ADAPTER: TypeAdapter[list[EventModel]] = TypeAdapter(list[EventModel])
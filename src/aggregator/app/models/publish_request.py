@@ -1,17 +1,32 @@
-from datetime import datetime
+from typing import Any, cast
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 
-from .events import EventPayloadModel
+from .events import EventModel
 
 
-class EventRequestModel(BaseModel):
-    event_id: str
-    topic: str
-    source: str
-    payload: EventPayloadModel
-    timestamp: datetime = Field(default=..., description="ISO 8601 timestamp")
+class EventRequestModel(EventModel):
+    pass
 
 
 class PublishRequestModel(BaseModel):
     events: list[EventRequestModel]
+
+    @classmethod
+    def inline_json_schema(cls) -> dict[str, Any]:
+        schema: dict[str, Any] = cls.model_json_schema()
+        definitions: dict[str, Any] = schema.pop("$defs", {})
+
+        def resolve(node: object) -> object:
+            if isinstance(node, dict):
+                if "$ref" in node:
+                    return resolve(definitions[node["$ref"].rsplit("/", 1)[-1]])
+
+                return {key: resolve(value) for key, value in node.items()}
+
+            if isinstance(node, list):
+                return [resolve(item) for item in node]
+
+            return node
+
+        return cast(dict[str, Any], resolve(schema))
@@ -2,9 +2,32 @@ from pydantic import BaseModel
 from pydantic.types import NonNegativeInt
 
 
+class QueueStatsModel(BaseModel):
+    depth: NonNegativeInt
+    depth_bytes: NonNegativeInt
+    high_water_mark: NonNegativeInt
+    max_events: NonNegativeInt
+    max_bytes: NonNegativeInt
+    partitions: NonNegativeInt
+
+
+class IndexStatsModel(BaseModel):
+    kind: str
+    keys: NonNegativeInt
+    bytes: NonNegativeInt
+    hits: NonNegativeInt
+    misses: NonNegativeInt
+    db_fallbacks: NonNegativeInt
+    evicted: NonNegativeInt
+    shards: NonNegativeInt
+
+
 class StatsResponseModel(BaseModel):
     received: NonNegativeInt
     unique_processed: NonNegativeInt
     duplicated_dropped: NonNegativeInt
+    reaccepted: NonNegativeInt
     topics: list[str]
     uptime: NonNegativeInt
+    queue: QueueStatsModel
+    index: IndexStatsModel
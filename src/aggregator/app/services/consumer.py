@@ -1,80 +1,353 @@
-from asyncio import CancelledError, Task, create_task
+from asyncio import CancelledError, Task, create_task, get_running_loop, sleep
+from collections import Counter
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta
-from typing import cast
+from os import getenv
+from sys import stderr
+from time import monotonic
+from typing import Literal, cast
 
 from loguru import logger
 
-from ..models.events import EventModel
-from .deduplication_store import DeduplicationStoreService
-from .event_queue import EventQueueService
+from ..models.event_cursor import EventCursorModel
+from ..models.events import EVENTS_ADAPTER, EventModel
+from .event_queue import EventQueueService, PublishAck, QueuedEvent, QueueFullError
+from .ingest_log import IngestLogService
+from .metrics import MetricsService, MetricsSnapshot
+from .sharded_deduplication_store import ShardedDeduplicationStoreService
+
+
+def configure_log_sink() -> None:
+    if getenv(key="CONSUMER_LOG_MODE", default="verbose") in ("sampled", "off"):
+        logger.remove()
+        _ = logger.add(stderr, enqueue=True)
 
 
 class ConsumerService:
     def __init__(self) -> None:
         self.__event_queue: EventQueueService = EventQueueService()
-        self.__deduplication_store: DeduplicationStoreService = (
-            DeduplicationStoreService()
+        self.__metrics: MetricsService = MetricsService()
+        self.__deduplication_store: ShardedDeduplicationStoreService = (
+            ShardedDeduplicationStoreService()
+        )
+        ingest_log_dir: str = getenv(key="INGEST_LOG_DIR", default="")
+        self.__ingest_log: IngestLogService | None = (
+            IngestLogService(
+                ingest_log_dir,
+                int(getenv(key="INGEST_LOG_SEGMENT_BYTES", default="67108864")),
+            )
+            if ingest_log_dir
+            else None
         )
         self.__start_time: datetime = datetime.now()
         self.__running: bool = False
-        self.__task: "Task[None] | None" = None
+        self.__tasks: list[Task[None]] = []
+        self.__checkpoint_task: "Task[None] | None" = None
+        self.__wal_checkpoint_task: "Task[None] | None" = None
+        self.__workers: int = self.__event_queue.partitions
+        self.__active_batches: int = 0
+        self.__batch_size: int = max(
+            1, int(getenv(key="CONSUMER_BATCH_SIZE", default="500"))
+        )
+        self.__batch_timeout: float = (
+            max(0, int(getenv(key="CONSUMER_BATCH_TIMEOUT_MS", default="10"))) / 1000
+        )
+        self.__ack_timeout: float = (
+            max(1, int(getenv(key="PUBLISH_ACK_TIMEOUT_MS", default="30000"))) / 1000
+        )
+        self.__stats_flush_interval: float = (
+            max(1, int(getenv(key="STATS_FLUSH_INTERVAL_MS", default="1000"))) / 1000
+        )
+        self.__drain_timeout: float = (
+            max(0, int(getenv(key="CONSUMER_DRAIN_TIMEOUT_MS", default="5000"))) / 1000
+        )
+        log_mode: str = getenv(key="CONSUMER_LOG_MODE", default="verbose")
+        self.__log_mode: Literal["verbose", "sampled", "off"] = (
+            log_mode if log_mode in ("sampled", "off") else "verbose"
+        )
+        log_sample_rate: float = float(
+            getenv(key="CONSUMER_LOG_SAMPLE_RATE", default="0.01")
+        )
+        self.__log_sample_every: int = (
+            max(1, round(1 / min(1.0, log_sample_rate))) if log_sample_rate > 0 else 0
+        )
+        self.__log_summary_interval: float = (
+            max(
+                1,
+                int(getenv(key="CONSUMER_LOG_SUMMARY_INTERVAL_MS", default="5000")),
+            )
+            / 1000
+        )
+        self.__log_summary_task: "Task[None] | None" = None
+        self.__logged_events: int = 0
+        self.__duplicate_counts: Counter[str] = Counter()
 
     async def initialize(self) -> None:
         await self.__deduplication_store.initialize()
 
+        if self.__ingest_log:
+            await self.__replay_ingest_log(self.__ingest_log)
+
+    async def __replay_ingest_log(self, ingest_log: IngestLogService) -> None:
+        records: list[tuple[int, bytes]] = ingest_log.open()
+        events: list[EventModel] = []
+        replayed: int = 0
+
+        for i, (offset, record) in enumerate(records):
+            events.extend(EVENTS_ADAPTER.validate_json(record))
+
+            if len(events) >= self.__batch_size or i == len(records) - 1:
+                processed, _ = await self.__deduplication_store.check_and_mark(events)
+                replayed += len(events)
+                logger.info(
+                    f"Replayed {len(events)} events from ingest log, {len(processed)} were not yet committed"
+                )
+
+                ingest_log.commit_through(offset)
+                events = []
+
+        if replayed:
+            await ingest_log.checkpoint()
+
     async def start(self) -> None:
         if self.__running:
             return
 
         self.__running = True
-        self.__task = create_task(coro=self.__consume_loop())
+        self.__metrics.start()
+        self.__tasks = [
+            create_task(coro=self.__consume_loop(partition))
+            for partition in range(self.__workers)
+        ]
+        self.__checkpoint_task = create_task(coro=self.__checkpoint_loop())
+        if self.__deduplication_store.get_wal_checkpoint_interval() > 0:
+            self.__wal_checkpoint_task = create_task(coro=self.__wal_checkpoint_loop())
+        if self.__log_mode == "sampled":
+            self.__log_summary_task = create_task(coro=self.__log_summary_loop())
 
     async def stop(self) -> None:
+        if self.__running:
+            await self.__drain()
+
         self.__running = False
-        if self.__task:
-            _ = self.__task.cancel()
+        for task in (
+            *self.__tasks,
+            self.__checkpoint_task,
+            self.__wal_checkpoint_task,
+            self.__log_summary_task,
+        ):
+            if task:
+                _ = task.cancel()
 
-            try:
-                await self.__task
-            except CancelledError:
-                pass
+                try:
+                    await task
+                except CancelledError:
+                    pass
+
+        await self.__metrics.stop()
+
+    async def __drain(self) -> None:
+        deadline: float = get_running_loop().time() + self.__drain_timeout
 
-    async def __consume_loop(self) -> None:
+        while (
+            self.__event_queue.get_stats()["depth"] > 0 or self.__active_batches > 0
+        ) and get_running_loop().time() < deadline:
+            await sleep(0.01)
+
+    async def __consume_loop(self, partition: int) -> None:
         while self.__running:
             try:
-                event: EventModel = await self.__event_queue.get()
+                queued: list[QueuedEvent] = await self.__event_queue.get_batch(
+                    self.__batch_size, self.__batch_timeout, partition
+                )
+
+                self.__metrics.observe("batch_events", len(queued))
 
-                await self.__deduplication_store.update_received()
-                await self.__deduplication_store.add_topic(event.topic)
+                self.__active_batches += 1
+                try:
+                    processed, duplicates = await self.__check_and_mark(queued)
+                finally:
+                    self.__active_batches -= 1
 
-                if await self.__deduplication_store.is_processed(
-                    event.event_id, event.topic
-                ):
-                    await self.__deduplication_store.update_duplicated_dropped()
+                self.__log_batch(processed, duplicates)
+            except Exception as e:
+                logger.error(f"Error processing event batch: {e}")
+
+    def __log_batch(
+        self, processed: list[EventModel], duplicates: list[EventModel]
+    ) -> None:
+        match self.__log_mode:
+            case "verbose":
+                for event in duplicates:
                     logger.warning(
                         f"Duplicate event detected and dropped: event_id={event.event_id}, topic={event.topic}"
                     )
-                else:
-                    await self.__deduplication_store.mark_processed(event)
 
+                for event in processed:
                     logger.info(
                         f"Processed unique event: event_id={event.event_id}, topic={event.topic}"
                     )
+            case "sampled":
+                self.__duplicate_counts.update(event.topic for event in duplicates)
+
+                if self.__log_sample_every:
+                    every: int = self.__log_sample_every
+                    for event in processed[-self.__logged_events % every :: every]:
+                        logger.info(
+                            f"Processed unique event (sampled 1/{every}): event_id={event.event_id}, topic={event.topic}"
+                        )
+
+                    self.__logged_events += len(processed)
+            case "off":
+                pass
+
+    async def __log_summary_loop(self) -> None:
+        while self.__running:
+            await sleep(self.__log_summary_interval)
+
+            self.__log_duplicate_summary()
+
+    def __log_duplicate_summary(self) -> None:
+        if not self.__duplicate_counts:
+            return
+
+        counts: Counter[str] = self.__duplicate_counts
+        self.__duplicate_counts = Counter()
+
+        logger.warning(
+            f"Dropped {counts.total()} duplicate events: "
+            + ", ".join(f"{topic}={count}" for topic, count in counts.most_common())
+        )
+
+    async def __check_and_mark(
+        self, queued: list[QueuedEvent]
+    ) -> tuple[list[EventModel], list[EventModel]]:
+        try:
+            processed, duplicates = await self.__deduplication_store.check_and_mark(
+                [event for event, *_ in queued]
+            )
+        except Exception as e:
+            for _, ack_slot, *_ in queued:
+                if ack_slot:
+                    ack_slot[0].fail(e)
+
+            raise
+        finally:
+            if self.__ingest_log:
+                self.__ingest_log.commit(
+                    [log_offset for _, _, log_offset, _ in queued if log_offset]
+                )
+
+        self.__observe_commit(queued, processed, duplicates)
+
+        if any(ack_slot for _, ack_slot, *_ in queued):
+            accepted: set[int] = {id(event) for event in processed}
+            for event, ack_slot, *_ in queued:
+                if ack_slot:
+                    ack_slot[0].resolve(
+                        ack_slot[1],
+                        "accepted" if id(event) in accepted else "duplicate",
+                    )
+
+        return processed, duplicates
+
+    def __observe_commit(
+        self,
+        queued: list[QueuedEvent],
+        processed: list[EventModel],
+        duplicates: list[EventModel],
+    ) -> None:
+        committed_at: float = monotonic()
+        enqueued_at: float = queued[0][3]
+        count: int = 0
+
+        for *_, event_enqueued_at in queued:
+            if event_enqueued_at != enqueued_at:
+                self.__metrics.observe(
+                    "enqueue_commit_lag_seconds", committed_at - enqueued_at, count
+                )
+                enqueued_at, count = event_enqueued_at, 0
+
+            count += 1
+
+        self.__metrics.observe(
+            "enqueue_commit_lag_seconds", committed_at - enqueued_at, count
+        )
+        self.__metrics.count_topics(
+            "events_processed_total", (event.topic for event in processed)
+        )
+        self.__metrics.count_topics(
+            "events_duplicated_total", (event.topic for event in duplicates)
+        )
+
+    async def __checkpoint_loop(self) -> None:
+        while self.__running:
+            await sleep(self.__stats_flush_interval)
+
+            try:
+                await self.__deduplication_store.flush_stats()
+
+                if self.__ingest_log:
+                    await self.__ingest_log.checkpoint()
+            except Exception as e:
+                logger.error(f"Error flushing stats checkpoint: {e}")
+
+    async def __wal_checkpoint_loop(self) -> None:
+        interval: float = self.__deduplication_store.get_wal_checkpoint_interval()
+
+        while self.__running:
+            await sleep(interval)
+
+            try:
+                await self.__deduplication_store.checkpoint_wal()
             except Exception as e:
-                logger.error(f"Error processing event: {e}")
+                logger.error(f"Error running WAL checkpoint: {e}")
+
+    async def get_version(self, topic: str | None = None) -> int:
+        return self.__deduplication_store.get_version(topic)
+
+    async def get_events_page(
+        self,
+        topic: str | None,
+        cursor: EventCursorModel,
+        limit: int,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> tuple[list[bytes], EventCursorModel | None]:
+        return await self.__deduplication_store.get_events_page(
+            topic, cursor, limit, since, until
+        )
+
+    async def publish(
+        self, events: list["EventModel"], size: int, durable: bool = False
+    ) -> list[str] | None:
+        if not events:
+            return [] if durable else None
+
+        log_offset: int = 0
+        if self.__ingest_log:
+            log_offset = await self.__ingest_log.append(
+                EVENTS_ADAPTER.dump_json(events), len(events)
+            )
+
+        ack: PublishAck | None = PublishAck(len(events)) if durable else None
+
+        try:
+            await self.__event_queue.put_many(events, size, ack, log_offset)
+        except QueueFullError:
+            if self.__ingest_log:
+                self.__ingest_log.commit([log_offset] * len(events))
 
-    def get_events_by_topic(self, topic: str) -> list["EventModel"]:
-        return self.__deduplication_store.get_events_by_topic(topic)
+            raise
 
-    def get_all_events(self) -> list["EventModel"]:
-        return self.__deduplication_store.get_all_events()
+        return await ack.wait(self.__ack_timeout) if ack else None
 
-    def get_stats(self) -> dict[str, object]:
+    async def get_stats(self) -> dict[str, object]:
         stats: dict[str, object] = self.__deduplication_store.get_stats()
         uptime: timedelta = datetime.now() - self.__start_time
         duplicated_dropped: int = cast(int, stats["duplicated_dropped"])
 
-        if duplicated_dropped > 0:
+        if duplicated_dropped > 0 and self.__log_mode == "verbose":
             logger.warning(
                 f"Total duplicate events detected and dropped: {duplicated_dropped}"
             )
@@ -83,10 +356,45 @@ class ConsumerService:
             "received": stats["received"],
             "unique_processed": self.__deduplication_store.get_unique_processed(),
             "duplicated_dropped": duplicated_dropped,
+            "reaccepted": stats["reaccepted"],
             "topics": list[str](cast(set[str], stats["topics"])),
             "uptime": int(uptime.total_seconds()),
+            "queue": self.__event_queue.get_stats(),
+            "index": self.__deduplication_store.get_index_stats(),
         }
 
+    async def get_metrics(self) -> MetricsSnapshot:
+        stats: dict[str, object] = self.__deduplication_store.get_stats()
+        queue: dict[str, int] = self.__event_queue.get_stats()
+        event_cache: dict[str, int] = self.__deduplication_store.get_event_cache_stats()
+
+        return self.__metrics.snapshot(
+            {
+                "queue_depth": queue["depth"],
+                "queue_depth_bytes": queue["depth_bytes"],
+                "events_received_total": cast(int, stats["received"]),
+                "events_unique_total": self.__deduplication_store.get_unique_processed(),
+                "events_dropped_total": cast(int, stats["duplicated_dropped"]),
+                "event_cache_bytes": event_cache["bytes"],
+                "event_cache_hits_total": event_cache["hits"],
+                "event_cache_misses_total": event_cache["misses"],
+            }
+        )
+
+    def iter_events_ndjson(
+        self,
+        topic: str | None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> AsyncIterator[bytes]:
+        return self.__deduplication_store.iter_events_ndjson(topic, since, until)
+
     async def close(self) -> None:
         await self.stop()
         await self.__deduplication_store.close()
+
+        if self.__ingest_log:
+            await self.__ingest_log.close()
+
+        self.__log_duplicate_summary()
+        await logger.complete()
@@ -0,0 +1,381 @@
+from array import array
+from collections import deque
+from hashlib import blake2b
+from math import ceil, inf, log, log2
+from os import fsync, replace
+from os.path import exists
+from struct import Struct
+from struct import error as StructError
+from sys import getsizeof
+from time import time
+from typing import TypeAlias
+
+
+class DigestTable:
+    def __init__(self, capacity: int = 1024) -> None:
+        self.__slots: array[int] = array("Q", bytes(8 * capacity))
+        self.__mask: int = capacity - 1
+        self.__size: int = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @property
+    def nbytes(self) -> int:
+        return self.__slots.itemsize * len(self.__slots)
+
+    def contains(self, digest: int) -> bool:
+        slots: array[int] = self.__slots
+        mask: int = self.__mask
+        index: int = digest & mask
+
+        while (slot := slots[index]) != 0:
+            if slot == digest:
+                return True
+
+            index = (index + 1) & mask
+
+        return False
+
+    def add(self, digest: int) -> bool:
+        if (self.__size + 1) * 10 > len(self.__slots) * 7:
+            self.__resize(len(self.__slots) * 2)
+
+        if not self.__insert(self.__slots, self.__mask, digest):
+            return False
+
+        self.__size += 1
+
+        return True
+
+    def __resize(self, capacity: int) -> None:
+        slots: array[int] = array("Q", bytes(8 * capacity))
+        mask: int = capacity - 1
+
+        for digest in self.__slots:
+            if digest != 0:
+                _ = self.__insert(slots, mask, digest)
+
+        self.__slots = slots
+        self.__mask = mask
+
+    @staticmethod
+    def __insert(slots: array[int], mask: int, digest: int) -> bool:
+        index: int = digest & mask
+
+        while (slot := slots[index]) != 0:
+            if slot == digest:
+                return False
+
+            index = (index + 1) & mask
+
+        slots[index] = digest
+
+        return True
+
+
+class CompactDeduplicationIndex:
+    def __init__(self) -> None:
+        self.__topic_ids: dict[str, int] = {}
+        self.__tables: list[DigestTable] = []
+        self.__collisions: set[tuple[int, int]] = set()
+        self.__size: int = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(table.nbytes for table in self.__tables)
+
+    def contains(self, event_id: str, topic: str) -> bool:
+        topic_id: int | None = self.__topic_ids.get(topic)
+        if topic_id is None:
+            return False
+
+        return self.__tables[topic_id].contains(self.digest(event_id))
+
+    def is_exact(self, event_id: str, topic: str) -> bool:
+        if not self.__collisions:
+            return True
+
+        topic_id: int | None = self.__topic_ids.get(topic)
+
+        return (
+            topic_id is None
+            or (topic_id, self.digest(event_id)) not in self.__collisions
+        )
+
+    def add(self, event_id: str, topic: str) -> None:
+        topic_id: int | None = self.__topic_ids.get(topic)
+        if topic_id is None:
+            topic_id = len(self.__tables)
+            self.__topic_ids[topic] = topic_id
+            self.__tables.append(DigestTable())
+
+        digest: int = self.digest(event_id)
+        if not self.__tables[topic_id].add(digest):
+            self.__collisions.add((topic_id, digest))
+
+        self.__size += 1
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "keys": self.__size,
+            "topics": len(self.__topic_ids),
+            "collisions": len(self.__collisions),
+            "bytes": self.nbytes,
+        }
+
+    @staticmethod
+    def digest(event_id: str) -> int:
+        return int.from_bytes(blake2b(event_id.encode(), digest_size=8).digest()) or 1
+
+
+class BloomFilterSlice:
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity: int = capacity
+        self.error_rate: float = error_rate
+        self.hash_count: int = max(1, ceil(log2(1 / error_rate)))
+        self.bit_count: int = max(8, ceil(capacity * log(error_rate) / -(log(2) ** 2)))
+        self.bits: bytearray = bytearray((self.bit_count + 7) // 8)
+        self.count: int = 0
+
+    def contains(self, first: int, second: int) -> bool:
+        bits: bytearray = self.bits
+        bit_count: int = self.bit_count
+
+        for i in range(self.hash_count):
+            position: int = (first + i * second) % bit_count
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+
+        return True
+
+    def add(self, first: int, second: int) -> None:
+        bits: bytearray = self.bits
+        bit_count: int = self.bit_count
+
+        for i in range(self.hash_count):
+            position: int = (first + i * second) % bit_count
+            bits[position >> 3] |= 1 << (position & 7)
+
+        self.count += 1
+
+
+class ScalableBloomFilter:
+    HEADER: Struct = Struct("<4sHdQQQI")
+    SLICE_HEADER: Struct = Struct("<QdQ")
+    MAGIC: bytes = b"CWBF"
+    VERSION: int = 1
+    GROWTH: int = 2
+    TIGHTENING: float = 0.5
+
+    def __init__(self, error_rate: float, initial_capacity: int) -> None:
+        self.__error_rate: float = error_rate
+        self.__initial_capacity: int = initial_capacity
+        self.__slices: list[BloomFilterSlice] = []
+        self.__size: int = 0
+        self.__add_slice()
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(bloom_slice.bits) for bloom_slice in self.__slices)
+
+    def contains(self, event_id: str, topic: str) -> bool:
+        first, second = self.__hashes(event_id, topic)
+
+        return any(bloom_slice.contains(first, second) for bloom_slice in self.__slices)
+
+    def is_exact(self, event_id: str, topic: str) -> bool:
+        return False
+
+    def add(self, event_id: str, topic: str) -> None:
+        bloom_slice: BloomFilterSlice = self.__slices[-1]
+        if bloom_slice.count >= bloom_slice.capacity:
+            bloom_slice = self.__add_slice()
+
+        bloom_slice.add(*self.__hashes(event_id, topic))
+        self.__size += 1
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "keys": self.__size,
+            "slices": len(self.__slices),
+            "bytes": self.nbytes,
+        }
+
+    def save(self, path: str, covered_rowid: int) -> None:
+        temporary_path: str = f"{path}.tmp"
+
+        with open(temporary_path, "wb") as file:
+            _ = file.write(
+                self.HEADER.pack(
+                    self.MAGIC,
+                    self.VERSION,
+                    self.__error_rate,
+                    self.__initial_capacity,
+                    self.__size,
+                    covered_rowid,
+                    len(self.__slices),
+                )
+            )
+
+            for bloom_slice in self.__slices:
+                _ = file.write(
+                    self.SLICE_HEADER.pack(
+                        bloom_slice.capacity, bloom_slice.error_rate, bloom_slice.count
+                    )
+                )
+                _ = file.write(bloom_slice.bits)
+
+            file.flush()
+            fsync(file.fileno())
+
+        replace(temporary_path, path)
+
+    @classmethod
+    def load(
+        cls, path: str, error_rate: float, initial_capacity: int
+    ) -> "tuple[ScalableBloomFilter, int] | None":
+        if not exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as file:
+                magic, version, saved_error_rate, saved_capacity, size, rowid, count = (
+                    cls.HEADER.unpack(file.read(cls.HEADER.size))
+                )
+                if (
+                    magic != cls.MAGIC
+                    or version != cls.VERSION
+                    or saved_error_rate != error_rate
+                    or saved_capacity != initial_capacity
+                ):
+                    return None
+
+                bloom_filter: ScalableBloomFilter = cls(error_rate, initial_capacity)
+                bloom_filter.__slices = []
+
+                for _ in range(count):
+                    capacity, slice_error_rate, slice_count = cls.SLICE_HEADER.unpack(
+                        file.read(cls.SLICE_HEADER.size)
+                    )
+                    bloom_slice: BloomFilterSlice = BloomFilterSlice(
+                        capacity, slice_error_rate
+                    )
+                    bits: bytes = file.read(len(bloom_slice.bits))
+                    if len(bits) != len(bloom_slice.bits):
+                        return None
+
+                    bloom_slice.bits = bytearray(bits)
+                    bloom_slice.count = slice_count
+                    bloom_filter.__slices.append(bloom_slice)
+
+                bloom_filter.__size = size
+        except StructError:
+            return None
+
+        return bloom_filter, rowid
+
+    def __add_slice(self) -> BloomFilterSlice:
+        index: int = len(self.__slices)
+        bloom_slice: BloomFilterSlice = BloomFilterSlice(
+            self.__initial_capacity * self.GROWTH**index,
+            self.__error_rate * (1 - self.TIGHTENING) * self.TIGHTENING**index,
+        )
+        self.__slices.append(bloom_slice)
+
+        return bloom_slice
+
+    @staticmethod
+    def __hashes(event_id: str, topic: str) -> tuple[int, int]:
+        digest: bytes = blake2b(
+            f"{topic}\0{event_id}".encode(), digest_size=16
+        ).digest()
+
+        return int.from_bytes(digest[:8]), int.from_bytes(digest[8:]) | 1
+
+
+class WindowedDeduplicationIndex:
+    def __init__(self, default_ttl: float, topic_ttls: dict[str, float]) -> None:
+        self.__default_ttl: float = default_ttl
+        self.__topic_ttls: dict[str, float] = topic_ttls
+        self.__expiries: dict[str, dict[str, float]] = {}
+        self.__queues: dict[str, deque[tuple[float, str]]] = {}
+        self.__size: int = 0
+        self.__evicted: int = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getsizeof(expiries) for expiries in self.__expiries.values()) + sum(
+            getsizeof(queue) for queue in self.__queues.values()
+        )
+
+    def ttl(self, topic: str) -> float:
+        return self.__topic_ttls.get(topic, self.__default_ttl)
+
+    def contains(self, event_id: str, topic: str) -> bool:
+        expiries: dict[str, float] | None = self.__expiries.get(topic)
+        if expiries is None:
+            return False
+
+        expires_at: float | None = expiries.get(event_id)
+
+        return expires_at is not None and expires_at > time()
+
+    def is_exact(self, event_id: str, topic: str) -> bool:
+        return True
+
+    def add(self, event_id: str, topic: str, seen_at: float | None = None) -> None:
+        ttl: float = self.ttl(topic)
+        expires_at: float = (seen_at or time()) + ttl if ttl > 0 else inf
+        if expires_at <= time():
+            return
+
+        expiries: dict[str, float] = self.__expiries.setdefault(topic, {})
+        if event_id not in expiries:
+            self.__size += 1
+
+        expiries[event_id] = expires_at
+        if expires_at != inf:
+            self.__queues.setdefault(topic, deque[tuple[float, str]]()).append(
+                (expires_at, event_id)
+            )
+
+    def evict_expired(self) -> int:
+        now: float = time()
+        evicted: int = 0
+
+        for topic, queue in self.__queues.items():
+            expiries: dict[str, float] = self.__expiries[topic]
+
+            while queue and queue[0][0] <= now:
+                expires_at, event_id = queue.popleft()
+                if expiries.get(event_id) == expires_at:
+                    del expiries[event_id]
+                    evicted += 1
+
+        self.__size -= evicted
+        self.__evicted += evicted
+
+        return evicted
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "keys": self.__size,
+            "topics": len(self.__expiries),
+            "evicted": self.__evicted,
+            "bytes": self.nbytes,
+        }
+
+
+DeduplicationIndex: TypeAlias = (
+    CompactDeduplicationIndex | ScalableBloomFilter | WindowedDeduplicationIndex
+)
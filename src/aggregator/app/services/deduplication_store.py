@@ -1,80 +1,279 @@
-from collections.abc import Iterable
+from asyncio import (
+    CancelledError,
+    Event,
+    Future,
+    Lock,
+    Task,
+    create_task,
+    get_running_loop,
+    sleep,
+)
+from collections.abc import AsyncIterator, Iterable, Sequence
 from datetime import datetime
 from os import getenv
-from typing import cast
+from resource import RUSAGE_SELF, getrusage
+from time import perf_counter, time, time_ns
+from typing import Literal, TypeAlias, cast
 
 from aiosqlite import Connection, Cursor, Row, connect
-from orjson import dumps, loads
+from loguru import logger
+from orjson import Fragment, dumps, loads
 
+from ..models.event_cursor import EventCursorModel
 from ..models.events import EventModel, EventPayloadModel
+from .deduplication_index import (
+    CompactDeduplicationIndex,
+    DeduplicationIndex,
+    ScalableBloomFilter,
+    WindowedDeduplicationIndex,
+)
+from .event_cache import EventBytesCache, event_json
+from .event_codec import (
+    NameTable,
+    PayloadCodec,
+    build_dictionary,
+    from_epoch_us,
+    to_epoch_us,
+)
+from .metrics import MetricsService
+from .partition import partition_for
+
+PendingWrite: TypeAlias = tuple[list[EventModel], int, int, set[str], Future[None]]
+
+DICTIONARY_SAMPLE_ROWS: int = 1000
+
+
+SQLITE_PROFILES: dict[str, dict[str, str | int]] = {
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "wal_checkpoint_ms": 0,
+        "crash_loss": "none, every commit is fsynced through the rollback journal",
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -65536,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "wal_checkpoint_ms": 0,
+        "crash_loss": "none, every commit is fsynced to the WAL",
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "wal_checkpoint_ms": 1000,
+        "crash_loss": "none on process crash, commits since the last WAL checkpoint (about 1s) on power loss",
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 1073741824,
+        "temp_store": "MEMORY",
+        "wal_checkpoint_ms": 10000,
+        "crash_loss": "none on process crash, any commit not yet written back by the OS on power loss, which may also corrupt the database",
+    },
+}
 
 
 class DeduplicationStoreService:
-    def __new__(cls) -> "DeduplicationStoreService":
+    def __new__(cls, db_path: str | None = None) -> "DeduplicationStoreService":
         return super().__new__(cls)
 
-    def __init__(self) -> None:
+    def __init__(self, db_path: str | None = None) -> None:
         self.__connection: "Connection | None" = None
-        self.__processed_set: set[tuple[str, str]] = set()
-        self.__processed_events: dict[str, list[EventModel]] = {}
+        self.__db_path: str = db_path or getenv(
+            key="DEDUPLICATION_DB_PATH", default=".chronicle.db"
+        )
+        self.__partitions: int = max(
+            1, int(getenv(key="DEDUPLICATION_PARTITIONS", default="1"))
+        )
+        self.__partition: int = min(
+            self.__partitions - 1,
+            max(0, int(getenv(key="DEDUPLICATION_PARTITION", default="0"))),
+        )
+        profile: str = getenv(key="DEDUPLICATION_DB_PROFILE", default="durable")
+        if profile not in SQLITE_PROFILES:
+            logger.warning(f"Unknown SQLite profile {profile}, using durable")
+
+        self.__profile_name: str = profile if profile in SQLITE_PROFILES else "durable"
+        self.__profile: dict[str, str | int] = SQLITE_PROFILES[self.__profile_name]
+        self.__bloom_path: str = (
+            f"{self.__db_path}.bloom"
+            if self.__partitions == 1
+            else f"{self.__db_path}.{self.__partition}.bloom"
+        )
+        index_kind: str = getenv(key="DEDUPLICATION_INDEX", default="compact")
+        self.__index_kind: Literal["compact", "bloom", "windowed"] = (
+            index_kind if index_kind in ("bloom", "windowed") else "compact"
+        )
+        self.__bloom_error_rate: float = float(
+            getenv(key="DEDUPLICATION_BLOOM_FP_RATE", default="0.001")
+        )
+        self.__bloom_capacity: int = int(
+            getenv(key="DEDUPLICATION_BLOOM_CAPACITY", default="1000000")
+        )
+        self.__default_ttl: float = float(
+            getenv(key="DEDUPLICATION_TTL_SECONDS", default="3600")
+        )
+        self.__topic_ttls: dict[str, float] = {
+            topic.strip(): float(ttl)
+            for topic, _, ttl in (
+                entry.partition("=")
+                for entry in getenv(key="DEDUPLICATION_TTL_TOPICS", default="").split(
+                    ","
+                )
+                if "=" in entry
+            )
+        }
+        self.__processed_index: DeduplicationIndex = self.__create_index()
+        self.__index_stats: dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "db_fallbacks": 0,
+        }
+        self.__unique_processed: int = 0
+        self.__initial_version: int = time_ns() // 1000
+        self.__version: int = self.__initial_version
+        self.__topic_versions: dict[str, int] = {}
         self.__stats: dict[str, object] = {}
+        self.__stats_dirty: bool = False
+        self.__topics_json: bytes = b"[]"
+        self.__write_lock: Lock = Lock()
+        self.__in_flight: set[tuple[str, str]] = set()
+        self.__pending_writes: list[PendingWrite] = []
+        self.__metrics: MetricsService = MetricsService()
+        self.__storage_format: Literal["text", "compact"] = (
+            "compact"
+            if getenv(key="DEDUPLICATION_STORAGE_FORMAT", default="text") == "compact"
+            else "text"
+        )
+        self.__compact: bool = False
+        self.__payload_codec: PayloadCodec = PayloadCodec(
+            getenv(key="DEDUPLICATION_PAYLOAD_COMPRESSION", default="none")
+        )
+        self.__event_bytes: EventBytesCache = EventBytesCache(
+            int(getenv(key="DEDUPLICATION_EVENT_CACHE_BYTES", default="67108864"))
+        )
+        self.__topic_names: NameTable = NameTable("topics")
+        self.__source_names: NameTable = NameTable("sources")
+        self.__migration: "Task[None] | None" = None
+        self.__active_reads: int = 0
+        self.__reads_idle: Event = Event()
+        self.__reads_idle.set()
+        self.__tables_ready: Event = Event()
+        self.__tables_ready.set()
 
     async def initialize(self) -> None:
-        self.__connection = await connect(
-            database=getenv(key="DEDUPLICATION_DB_PATH", default=".chronicle.db")
-        )
+        started_at: float = perf_counter()
 
-        _: Cursor = await self.__connection.execute("""
-            CREATE TABLE IF NOT EXISTS processed_events (
-                event_id TEXT NOT NULL,
-                topic TEXT NOT NULL,
-                source TEXT NOT NULL,
-                payload TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                PRIMARY KEY (event_id, topic)
+        self.__connection = await connect(database=self.__db_path)
+
+        journal_mode: str | int = (
+            "WAL" if self.__partitions > 1 else self.__profile["journal_mode"]
+        )
+        _ = await self.__connection.execute(f"PRAGMA journal_mode={journal_mode}")
+        for pragma in ("synchronous", "cache_size", "mmap_size", "temp_store"):
+            _ = await self.__connection.execute(
+                f"PRAGMA {pragma}={self.__profile[pragma]}"
             )
-        """)
+
+        logger.info(
+            f"SQLite profile {self.__profile_name} (journal_mode={journal_mode}, synchronous={self.__profile['synchronous']}), "
+            f"crash-loss window: {self.__profile['crash_loss']}"
+        )
+
+        if (
+            not await self.__column_types("processed_events")
+            and self.__storage_format == "compact"
+        ):
+            await self.__create_compact_table("processed_events")
+        else:
+            _: Cursor = await self.__connection.execute("""
+                CREATE TABLE IF NOT EXISTS processed_events (
+                    event_id TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    processed_at INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (event_id, topic)
+                )
+            """)
 
         _: Cursor = await self.__connection.execute("""
             CREATE TABLE IF NOT EXISTS stats (
                 id INTEGER PRIMARY KEY,
                 received INTEGER NOT NULL DEFAULT 0,
                 duplicated_dropped INTEGER NOT NULL DEFAULT 0,
-                topics TEXT NOT NULL DEFAULT '[]'
+                topics TEXT NOT NULL DEFAULT '[]',
+                checkpoint_rowid INTEGER NOT NULL DEFAULT 0,
+                reaccepted INTEGER NOT NULL DEFAULT 0
             )
         """)
 
-        await self.__connection.commit()
-
         cursor: Cursor = await self.__connection.execute(
-            "SELECT event_id, topic, source, payload, timestamp FROM processed_events"
+            "PRAGMA table_info(processed_events)"
         )
-        rows: Iterable[Row] = await cursor.fetchall()
+        columns: set[str] = {cast(str, row[1]) for row in await cursor.fetchall()}
+        await cursor.close()
+
+        if "processed_at" not in columns:
+            _ = await self.__connection.execute(
+                f"ALTER TABLE processed_events ADD COLUMN processed_at INTEGER NOT NULL DEFAULT {int(time() * 1000)}"
+            )
+
+        await self.__connection.commit()
+        await self.__migrate_timestamps()
 
+        self.__compact = await self.__is_compact()
+        if self.__compact or self.__storage_format == "compact":
+            await self.__load_names()
+
+        if self.__compact and self.__storage_format == "text":
+            logger.info("processed_events already uses the compact storage format")
+
+        if not self.__compact and self.__storage_format == "compact":
+            if self.__partitions > 1:
+                await self.__migrate_storage()
+            else:
+                logger.info(
+                    "processed_events will be migrated to the compact storage format in the background"
+                )
+
+        await self.__create_indexes("processed_events", self.__index_prefix())
+
+        cursor = await self.__connection.execute("PRAGMA table_info(stats)")
+        columns = {cast(str, row[1]) for row in await cursor.fetchall()}
         await cursor.close()
 
-        self.__processed_set = {(cast(str, row[0]), cast(str, row[1])) for row in rows}
-        self.__processed_events = {}
-        for row in rows:
-            event_payload: EventPayloadModel = EventPayloadModel.model_validate_json(
-                json_data=cast(str, row[3])
+        if "checkpoint_rowid" not in columns:
+            _ = await self.__connection.execute(
+                "ALTER TABLE stats ADD COLUMN checkpoint_rowid INTEGER NOT NULL DEFAULT 0"
+            )
+            _ = await self.__connection.execute(
+                "UPDATE stats SET checkpoint_rowid = (SELECT COALESCE(MAX(rowid), 0) FROM processed_events)"
             )
-            event = EventModel(
-                event_id=cast(str, row[0]),
-                topic=cast(str, row[1]),
-                source=cast(str, row[2]),
-                payload=event_payload,
-                timestamp=datetime.fromisoformat(cast(str, row[4])),
+
+        if "reaccepted" not in columns:
+            _ = await self.__connection.execute(
+                "ALTER TABLE stats ADD COLUMN reaccepted INTEGER NOT NULL DEFAULT 0"
             )
 
-            topic = cast(str, row[1])
-            if topic not in self.__processed_events:
-                self.__processed_events[topic] = []
+        await self.__connection.commit()
 
-            self.__processed_events[topic].append(event)
+        await self.__recover_keys()
 
         cursor = await self.__connection.execute(
-            "SELECT received, duplicated_dropped, topics FROM stats WHERE id=1"
+            "SELECT received, duplicated_dropped, topics, checkpoint_rowid, reaccepted FROM stats WHERE id = ?",
+            (self.__partition + 1,),
         )
         stats = await cursor.fetchone()
         await cursor.close()
@@ -83,95 +282,1169 @@ class DeduplicationStoreService:
             self.__stats = {
                 "received": cast(int, stats[0]),
                 "duplicated_dropped": cast(int, stats[1]),
+                "reaccepted": cast(int, stats[4]),
                 "topics": set[str](cast(list[str], loads(cast(str, stats[2])))),
             }
+            checkpoint_rowid: int = cast(int, stats[3])
         else:
             self.__stats = {
                 "received": 0,
                 "duplicated_dropped": 0,
+                "reaccepted": 0,
                 "topics": set[str](),
             }
+            checkpoint_rowid = 0
+
+        await self.__rebuild_stats(checkpoint_rowid)
+
+        logger.info(
+            f"Deduplication store recovered {len(self.__processed_index)} keys in {perf_counter() - started_at:.3f}s "
+            f"({self.__index_kind} index {self.__processed_index.nbytes / 1024 / 1024:.1f} MB, "
+            f"peak RSS {getrusage(RUSAGE_SELF).ru_maxrss / 1024:.1f} MB)"
+        )
+
+        if not self.__compact and self.__storage_format == "compact":
+            self.__migration = create_task(coro=self.__run_migration())
 
-    async def mark_processed(self, event: EventModel) -> None:
+    async def __column_types(self, table: str) -> dict[str, str]:
         if self.__connection is None:
             raise RuntimeError("Connection not initialized")
 
-        key: tuple[str, str] = (event.event_id, event.topic)
-        if key not in self.__processed_set:
-            self.__processed_set.add(key)
+        cursor: Cursor = await self.__connection.execute(f"PRAGMA table_info({table})")
+        column_types: dict[str, str] = {
+            cast(str, row[1]): cast(str, row[2]) for row in await cursor.fetchall()
+        }
+        await cursor.close()
+
+        return column_types
+
+    async def __timestamp_type(self) -> str:
+        return (await self.__column_types("processed_events")).get("timestamp", "")
+
+    async def __is_compact(self) -> bool:
+        return (await self.__column_types("processed_events")).get("topic") == "INTEGER"
+
+    def __index_prefix(self) -> str:
+        return "compact_events" if self.__compact else "processed_events"
 
+    async def __create_compact_table(self, table: str) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        _: Cursor = await self.__connection.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                event_id TEXT NOT NULL,
+                topic INTEGER NOT NULL,
+                source INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                timestamp INTEGER NOT NULL,
+                processed_at INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (event_id, topic)
+            )
+        """)
+
+    async def __create_indexes(self, table: str, prefix: str) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        _ = await self.__connection.execute(
+            f"CREATE INDEX IF NOT EXISTS {prefix}_topic ON {table} (topic)"
+        )
+        _ = await self.__connection.execute(
+            f"CREATE INDEX IF NOT EXISTS {prefix}_topic_timestamp ON {table} (topic, timestamp)"
+        )
+
+        if self.__index_kind == "windowed":
             _ = await self.__connection.execute(
-                "INSERT OR IGNORE INTO processed_events (event_id, topic, source, payload, timestamp) VALUES (?, ?, ?, ?, ?)",
+                f"CREATE INDEX IF NOT EXISTS {prefix}_processed_at ON {table} (processed_at)"
+            )
+
+    async def __load_names(self) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        for table in (self.__topic_names, self.__source_names):
+            _ = await self.__connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table.table} (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)"
+            )
+
+        _ = await self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS payload_dictionaries (id INTEGER PRIMARY KEY, dictionary BLOB NOT NULL)"
+        )
+        await self.__connection.commit()
+
+        for table in (self.__topic_names, self.__source_names):
+            table.clear()
+            cursor: Cursor = await self.__connection.execute(
+                f"SELECT id, name FROM {table.table}"
+            )
+            for row in await cursor.fetchall():
+                table.add(cast(int, row[0]), cast(str, row[1]))
+
+            await cursor.close()
+
+        cursor = await self.__connection.execute(
+            "SELECT id, dictionary FROM payload_dictionaries"
+        )
+        for row in await cursor.fetchall():
+            self.__payload_codec.add_dictionary(cast(int, row[0]), cast(bytes, row[1]))
+
+        await cursor.close()
+
+        if (
+            self.__payload_codec.compression == "dictionary"
+            and not self.__payload_codec.has_dictionary()
+            and self.__partitions == 1
+        ):
+            await self.__train_dictionary()
+
+    async def __train_dictionary(self) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        cursor: Cursor = await self.__connection.execute(
+            "SELECT payload FROM processed_events ORDER BY rowid DESC LIMIT ?",
+            (DICTIONARY_SAMPLE_ROWS,),
+        )
+        rows: list[Row] = list(await cursor.fetchall())
+        await cursor.close()
+
+        if len(rows) < DICTIONARY_SAMPLE_ROWS:
+            return
+
+        messages: list[str] = [
+            self.__payload_codec.decode_fields(cast(bytes, row[0]))[0]
+            if self.__compact
+            else cast(str, loads(cast(str, row[0]))["message"])
+            for row in reversed(rows)
+        ]
+        dictionary: bytes = build_dictionary(messages)
+
+        cursor = await self.__connection.execute(
+            "INSERT INTO payload_dictionaries (dictionary) VALUES (?)", (dictionary,)
+        )
+        dictionary_id: int = cast(int, cursor.lastrowid)
+        await cursor.close()
+        await self.__connection.commit()
+
+        self.__payload_codec.add_dictionary(dictionary_id, dictionary)
+        logger.info(
+            f"Trained a {len(dictionary)} byte payload dictionary from {len(rows)} events"
+        )
+
+    async def __intern(self, table: NameTable, names: set[str]) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        missing: list[str] = [name for name in names if name not in table.ids]
+        if not missing:
+            return
+
+        _ = await self.__connection.executemany(
+            f"INSERT OR IGNORE INTO {table.table} (name) VALUES (?)",
+            [(name,) for name in missing],
+        )
+        for i in range(0, len(missing), 500):
+            chunk: list[str] = missing[i : i + 500]
+            cursor: Cursor = await self.__connection.execute(
+                f"SELECT id, name FROM {table.table} WHERE name IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            for row in await cursor.fetchall():
+                table.add(cast(int, row[0]), cast(str, row[1]))
+
+            await cursor.close()
+
+    async def __topic_key(self, topic: str) -> str | int | None:
+        if not self.__compact:
+            return topic
+
+        if topic not in self.__topic_names.ids and self.__partitions > 1:
+            await self.__load_names()
+
+        return self.__topic_names.ids.get(topic)
+
+    async def __resolve_names(
+        self, rows: Iterable[Row], with_source: bool = False
+    ) -> Sequence[Sequence[object]]:
+        rows = list(rows)
+        if not self.__compact:
+            return rows
+
+        topics: dict[int, str] = self.__topic_names.names
+        sources: dict[int, str] = self.__source_names.names
+
+        if any(
+            row[1] not in topics or (with_source and row[2] not in sources)
+            for row in rows
+        ):
+            await self.__load_names()
+
+        if with_source:
+            return [
+                (row[0], topics[row[1]], sources[row[2]], *tuple(row)[3:])
+                for row in rows
+            ]
+
+        return [(row[0], topics[row[1]], *tuple(row)[2:]) for row in rows]
+
+    async def __migrate_timestamps(self, batch_size: int = 10000) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        if await self.__timestamp_type() == "INTEGER":
+            return
+
+        if self.__partition > 0:
+            while await self.__timestamp_type() != "INTEGER":
+                await sleep(0.1)
+
+            return
+
+        started_at: float = perf_counter()
+        columns: dict[str, str] = await self.__column_types("processed_events")
+
+        if "timestamp" not in columns:
+            await self.__swap_timestamp_column(drop=False)
+            logger.info("Finished interrupted processed_events timestamp migration")
+
+            return
+
+        if "timestamp_us" not in columns:
+            _ = await self.__connection.execute(
+                "ALTER TABLE processed_events ADD COLUMN timestamp_us INTEGER"
+            )
+            await self.__connection.commit()
+
+        migrated: int = 0
+        after: int = 0
+        while True:
+            cursor: Cursor = await self.__connection.execute(
+                "SELECT rowid, timestamp FROM processed_events WHERE rowid > ? AND timestamp_us IS NULL ORDER BY rowid LIMIT ?",
+                (after, batch_size),
+            )
+            rows: list[Row] = list(await cursor.fetchall())
+            await cursor.close()
+
+            if not rows:
+                break
+
+            _ = await self.__connection.executemany(
+                "UPDATE processed_events SET timestamp_us = ? WHERE rowid = ?",
+                [
+                    (
+                        to_epoch_us(datetime.fromisoformat(cast(str, row[1]))),
+                        row[0],
+                    )
+                    for row in rows
+                ],
+            )
+            await self.__connection.commit()
+
+            migrated += len(rows)
+            after = cast(int, rows[-1][0])
+
+        await self.__swap_timestamp_column(drop=True)
+
+        logger.info(
+            f"Migrated {migrated} processed_events timestamps to epoch microseconds in {perf_counter() - started_at:.3f}s"
+        )
+
+    async def __swap_timestamp_column(self, drop: bool) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        drop_column: str = (
+            "ALTER TABLE processed_events DROP COLUMN timestamp;" if drop else ""
+        )
+        try:
+            await self.__connection.executescript(f"""
+                BEGIN;
+                DROP INDEX IF EXISTS processed_events_topic_timestamp;
+                {drop_column}
+                ALTER TABLE processed_events RENAME COLUMN timestamp_us TO timestamp;
+                COMMIT;
+            """)
+        except Exception:
+            await self.__connection.rollback()
+            raise
+
+    async def __run_migration(self) -> None:
+        try:
+            await self.__migrate_storage()
+        except Exception as e:
+            logger.error(
+                f"Compact storage migration failed, will resume on restart: {e}"
+            )
+
+    async def __migrate_storage(self, batch_size: int = 10000) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        if self.__partition > 0:
+            while not await self.__is_compact():
+                await sleep(0.1)
+
+            self.__compact = True
+            await self.__load_names()
+
+            return
+
+        started_at: float = perf_counter()
+
+        async with self.__write_lock:
+            await self.__create_compact_table("processed_events_compact")
+            await self.__create_indexes("processed_events_compact", "compact_events")
+            await self.__connection.commit()
+
+            cursor: Cursor = await self.__connection.execute(
+                "SELECT COALESCE(MAX(rowid), 0) FROM processed_events_compact"
+            )
+            row: Row | None = await cursor.fetchone()
+            await cursor.close()
+
+        copied: int = cast(int, row[0]) if row else 0
+        migrated: int = 0
+        while True:
+            async with self.__write_lock:
+                count, copied = await self.__copy_rows(copied, batch_size)
+                migrated += count
+
+                if count < batch_size:
+                    await self.__swap_tables()
+                    break
+
+            await sleep(0)
+
+        logger.info(
+            f"Migrated {migrated} processed_events rows to the compact storage format in {perf_counter() - started_at:.3f}s"
+        )
+
+    async def __copy_rows(self, after: int, limit: int) -> tuple[int, int]:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        cursor: Cursor = await self.__connection.execute(
+            "SELECT rowid, event_id, topic, source, payload, timestamp, processed_at FROM processed_events WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (after, limit),
+        )
+        rows: list[Row] = list(await cursor.fetchall())
+        await cursor.close()
+
+        if not rows:
+            return 0, after
+
+        try:
+            await self.__intern(self.__topic_names, {cast(str, row[2]) for row in rows})
+            await self.__intern(
+                self.__source_names, {cast(str, row[3]) for row in rows}
+            )
+            _ = await self.__connection.executemany(
+                "INSERT INTO processed_events_compact (rowid, event_id, topic, source, payload, timestamp, processed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        row[0],
+                        row[1],
+                        self.__topic_names.ids[cast(str, row[2])],
+                        self.__source_names.ids[cast(str, row[3])],
+                        self.__payload_codec.encode(
+                            EventPayloadModel.model_validate_json(
+                                json_data=cast(str, row[4])
+                            )
+                        ),
+                        row[5],
+                        row[6],
+                    )
+                    for row in rows
+                ],
+            )
+            await self.__connection.commit()
+        except Exception:
+            await self.__connection.rollback()
+            await self.__load_names()
+            raise
+
+        return len(rows), cast(int, rows[-1][0])
+
+    async def __swap_tables(self) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        self.__tables_ready.clear()
+        try:
+            _ = await self.__reads_idle.wait()
+
+            sync_processed_at: str = (
+                "UPDATE processed_events_compact SET processed_at = (SELECT processed_at FROM processed_events WHERE processed_events.rowid = processed_events_compact.rowid);"
+                if self.__index_kind == "windowed"
+                else ""
+            )
+            await self.__connection.executescript(f"""
+                BEGIN;
+                {sync_processed_at}
+                DROP TABLE processed_events;
+                ALTER TABLE processed_events_compact RENAME TO processed_events;
+                COMMIT;
+            """)
+            self.__compact = True
+        except Exception:
+            await self.__connection.rollback()
+            raise
+        finally:
+            self.__tables_ready.set()
+
+    async def __begin_read(self) -> None:
+        while not self.__tables_ready.is_set():
+            _ = await self.__tables_ready.wait()
+
+        self.__active_reads += 1
+        self.__reads_idle.clear()
+
+    def __end_read(self) -> None:
+        self.__active_reads -= 1
+        if not self.__active_reads:
+            self.__reads_idle.set()
+
+    async def __recover_keys(self) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        self.__processed_index = self.__create_index()
+        covered_rowid: int = 0
+
+        if isinstance(self.__processed_index, WindowedDeduplicationIndex):
+            await self.__recover_window(self.__processed_index)
+
+            return
+
+        if self.__index_kind == "bloom":
+            cursor: Cursor = await self.__connection.execute(
+                "SELECT COALESCE(MAX(rowid), 0) FROM processed_events"
+            )
+            row: Row | None = await cursor.fetchone()
+            await cursor.close()
+
+            loaded: tuple[ScalableBloomFilter, int] | None = ScalableBloomFilter.load(
+                self.__bloom_path,
+                self.__bloom_error_rate,
+                self.__bloom_capacity,
+            )
+            if loaded and row and loaded[1] <= cast(int, row[0]):
+                self.__processed_index, covered_rowid = loaded
+                logger.info(
+                    f"Loaded persisted bloom filter covering rowid {covered_rowid}"
+                )
+
+        cursor = await self.__connection.execute(
+            "SELECT event_id, topic FROM processed_events WHERE rowid > ?",
+            (covered_rowid,),
+        )
+        while rows := await cursor.fetchmany(10000):
+            for key in await self.__resolve_names(rows):
+                if self.__owns(cast(str, key[0]), cast(str, key[1])):
+                    self.__processed_index.add(cast(str, key[0]), cast(str, key[1]))
+
+        await cursor.close()
+
+        self.__unique_processed = len(self.__processed_index)
+
+    async def __recover_window(self, index: WindowedDeduplicationIndex) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        ttls: list[float] = [self.__default_ttl, *self.__topic_ttls.values()]
+        cutoff: float = 0 if min(ttls) <= 0 else time() - max(ttls)
+
+        cursor: Cursor = await self.__connection.execute(
+            "SELECT event_id, topic, processed_at FROM processed_events WHERE processed_at >= ? ORDER BY processed_at",
+            (int(cutoff * 1000),),
+        )
+        while rows := await cursor.fetchmany(10000):
+            for row in await self.__resolve_names(rows):
+                if self.__owns(cast(str, row[0]), cast(str, row[1])):
+                    index.add(
+                        cast(str, row[0]), cast(str, row[1]), cast(int, row[2]) / 1000
+                    )
+
+        await cursor.close()
+
+        self.__unique_processed = await self.__count_events()
+
+    async def __count_events(self) -> int:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        if self.__partitions > 1:
+            return len(await self.__owned_keys(0))
+
+        cursor: Cursor = await self.__connection.execute(
+            "SELECT COUNT(*) FROM processed_events"
+        )
+        row: Row | None = await cursor.fetchone()
+        await cursor.close()
+
+        return cast(int, row[0]) if row else 0
+
+    async def __owned_keys(self, after_rowid: int) -> list[tuple[str, str]]:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        keys: list[tuple[str, str]] = []
+        cursor: Cursor = await self.__connection.execute(
+            "SELECT event_id, topic FROM processed_events WHERE rowid > ?",
+            (after_rowid,),
+        )
+        while rows := await cursor.fetchmany(10000):
+            keys.extend(
+                (cast(str, row[0]), cast(str, row[1]))
+                for row in await self.__resolve_names(rows)
+                if self.__owns(cast(str, row[0]), cast(str, row[1]))
+            )
+
+        await cursor.close()
+
+        return keys
+
+    def __owns(self, event_id: str, topic: str) -> bool:
+        return (
+            self.__partitions == 1
+            or partition_for(event_id, topic, self.__partitions) == self.__partition
+        )
+
+    def __create_index(self) -> DeduplicationIndex:
+        if self.__index_kind == "bloom":
+            return ScalableBloomFilter(self.__bloom_error_rate, self.__bloom_capacity)
+
+        if self.__index_kind == "windowed":
+            return WindowedDeduplicationIndex(self.__default_ttl, self.__topic_ttls)
+
+        return CompactDeduplicationIndex()
+
+    async def __rebuild_stats(self, checkpoint_rowid: int) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        if self.__partitions > 1:
+            keys: list[tuple[str, str]] = await self.__owned_keys(checkpoint_rowid)
+            missing: int = len(keys)
+            topics: set[str] = {topic for _, topic in keys}
+        else:
+            cursor: Cursor = await self.__connection.execute(
+                "SELECT COUNT(*) FROM processed_events WHERE rowid > ?",
+                (checkpoint_rowid,),
+            )
+            row: Row | None = await cursor.fetchone()
+            await cursor.close()
+
+            missing = cast(int, row[0]) if row else 0
+            topics = set[str]()
+
+            if missing > 0:
+                cursor = await self.__connection.execute(
+                    "SELECT DISTINCT topics.name FROM processed_events JOIN topics ON topics.id = processed_events.topic WHERE processed_events.rowid > ?"
+                    if self.__compact
+                    else "SELECT DISTINCT topic FROM processed_events WHERE rowid > ?",
+                    (checkpoint_rowid,),
+                )
+                topics = {cast(str, row[0]) for row in await cursor.fetchall()}
+                await cursor.close()
+
+        if missing > 0:
+            logger.warning(
+                f"Stats checkpoint is {missing} events behind processed_events, rebuilding counters"
+            )
+
+            self.__stats["received"] = cast(int, self.__stats["received"]) + missing
+            cast(set[str], self.__stats["topics"]).update(topics)
+            self.__stats_dirty = True
+
+        self.__topics_json = dumps(list[str](cast(set[str], self.__stats["topics"])))
+
+    async def mark_processed(self, event: EventModel) -> bool:
+        processed, _ = await self.check_and_mark([event])
+
+        return bool(processed)
+
+    async def check_and_mark(
+        self, events: list[EventModel]
+    ) -> tuple[list[EventModel], list[EventModel]]:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        if isinstance(self.__processed_index, WindowedDeduplicationIndex):
+            _ = self.__processed_index.evict_expired()
+
+        unique: list[EventModel] = []
+        duplicates: list[EventModel] = []
+        reserved: set[tuple[str, str]] = set()
+
+        for event in events:
+            key: tuple[str, str] = (event.event_id, event.topic)
+            if key in reserved or key in self.__in_flight:
+                duplicates.append(event)
+            else:
+                reserved.add(key)
+                unique.append(event)
+
+        self.__in_flight.update(reserved)
+
+        try:
+            existing: set[tuple[str, str]] = await self.__lookup(
+                [(event.event_id, event.topic) for event in unique]
+            )
+
+            processed: list[EventModel] = []
+            for event in unique:
+                if (event.event_id, event.topic) in existing:
+                    duplicates.append(event)
+                else:
+                    processed.append(event)
+
+            topics: set[str] = {event.topic for event in events}
+
+            if not processed:
+                self.__apply_stats(len(events), len(duplicates), topics)
+
+                return processed, duplicates
+
+            write: Future[None] = get_running_loop().create_future()
+            self.__pending_writes.append(
+                (processed, len(events), len(duplicates), topics, write)
+            )
+
+            async with self.__write_lock:
+                if not write.done():
+                    pending: list[PendingWrite] = self.__pending_writes
+                    self.__pending_writes = []
+
+                    try:
+                        await self.__commit_writes(pending)
+                    except Exception as e:
+                        for *_, pending_write in pending:
+                            pending_write.set_exception(e)
+                    else:
+                        for *_, pending_write in pending:
+                            pending_write.set_result(None)
+
+            await write
+        finally:
+            self.__in_flight.difference_update(reserved)
+
+        return processed, duplicates
+
+    async def __commit_writes(self, pending: list[PendingWrite]) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        processed: list[EventModel] = [
+            event for events, *_ in pending for event in events
+        ]
+        received: int = sum(write[1] for write in pending)
+        duplicated: int = sum(write[2] for write in pending)
+        topics: set[str] = set[str]().union(*(write[3] for write in pending))
+
+        stats: dict[str, object] = self.__stats.copy()
+        new_topics: set[str] = topics - cast(set[str], stats["topics"])
+        stats["received"] = cast(int, stats["received"]) + received
+        stats["duplicated_dropped"] = (
+            cast(int, stats["duplicated_dropped"]) + duplicated
+        )
+        if new_topics:
+            stats["topics"] = cast(set[str], stats["topics"]) | new_topics
+
+        try:
+            started_at: float = perf_counter()
+            inserted: int = await self.__insert_events(processed)
+            reaccepted: int = len(processed) - inserted
+            stats["reaccepted"] = cast(int, stats["reaccepted"]) + reaccepted
+            await self.__write_stats(
+                stats,
+                dumps(list[str](cast(set[str], stats["topics"])))
+                if new_topics
+                else self.__topics_json,
+            )
+            executed_at: float = perf_counter()
+            await self.__connection.commit()
+
+            self.__metrics.observe("sqlite_execute_seconds", executed_at - started_at)
+            self.__metrics.observe(
+                "sqlite_commit_seconds", perf_counter() - executed_at
+            )
+        except Exception:
+            await self.__connection.rollback()
+            if self.__compact:
+                await self.__load_names()
+            raise
+
+        for event in processed:
+            self.__processed_index.add(event.event_id, event.topic)
+
+        if self.__event_bytes.max_bytes and inserted == len(processed):
+            for event in processed:
+                self.__event_bytes.put(
+                    event.topic,
+                    event.event_id,
+                    event_json(
+                        event.event_id,
+                        event.topic,
+                        event.source,
+                        Fragment(event.payload.model_dump_json()),
+                        from_epoch_us(to_epoch_us(event.timestamp)),
+                    ),
+                )
+
+        if (
+            self.__compact
+            and self.__payload_codec.compression == "dictionary"
+            and not self.__payload_codec.has_dictionary()
+            and self.__partitions == 1
+            and self.__unique_processed >= DICTIONARY_SAMPLE_ROWS
+        ):
+            await self.__train_dictionary()
+
+        self.__apply_stats(received, duplicated, topics, reaccepted)
+        self.__stats_dirty = self.__stats != stats
+
+        for topic in {event.topic for event in processed}:
+            self.__topic_versions[topic] = self.__version
+
+    def __apply_stats(
+        self, received: int, duplicated: int, topics: set[str], reaccepted: int = 0
+    ) -> None:
+        self.__stats["received"] = cast(int, self.__stats["received"]) + received
+        self.__stats["duplicated_dropped"] = (
+            cast(int, self.__stats["duplicated_dropped"]) + duplicated
+        )
+        self.__stats["reaccepted"] = cast(int, self.__stats["reaccepted"]) + reaccepted
+
+        new_topics: set[str] = topics - cast(set[str], self.__stats["topics"])
+        if new_topics:
+            self.__stats["topics"] = cast(set[str], self.__stats["topics"]) | new_topics
+            self.__topics_json = dumps(
+                list[str](cast(set[str], self.__stats["topics"]))
+            )
+
+        if received or duplicated or new_topics:
+            self.__stats_dirty = True
+            self.__version += 1
+
+    async def __insert_events(self, events: list[EventModel]) -> int:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        processed_at: int = int(time() * 1000)
+        rows: list[tuple[str, str | int, str | int, str | bytes, int, int]]
+        if self.__compact:
+            await self.__intern(self.__topic_names, {event.topic for event in events})
+            await self.__intern(self.__source_names, {event.source for event in events})
+            rows = [
+                (
+                    event.event_id,
+                    self.__topic_names.ids[event.topic],
+                    self.__source_names.ids[event.source],
+                    self.__payload_codec.encode(event.payload),
+                    to_epoch_us(event.timestamp),
+                    processed_at,
+                )
+                for event in events
+            ]
+        else:
+            rows = [
                 (
                     event.event_id,
                     event.topic,
                     event.source,
                     event.payload.model_dump_json(),
-                    event.timestamp.isoformat(),
-                ),
-            )
+                    to_epoch_us(event.timestamp),
+                    processed_at,
+                )
+                for event in events
+            ]
 
-            await self.__connection.commit()
+        cursor: Cursor = await self.__connection.executemany(
+            "INSERT OR IGNORE INTO processed_events (event_id, topic, source, payload, timestamp, processed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        inserted: int = cursor.rowcount
+        await cursor.close()
+
+        if inserted < len(events):
+            _ = await self.__connection.executemany(
+                "UPDATE processed_events SET processed_at = ? WHERE event_id = ? AND topic = ?",
+                [(processed_at, row[0], row[1]) for row in rows],
+            )
 
-            if event.topic not in self.__processed_events:
-                self.__processed_events[event.topic] = []
+        self.__unique_processed += inserted
 
-            self.__processed_events[event.topic].append(event)
+        return inserted
 
     async def is_processed(self, event_id: str, topic: str) -> bool:
         if self.__connection is None:
             raise RuntimeError("Connection not initialized")
 
-        return (event_id, topic) in self.__processed_set
+        return bool(await self.__lookup([(event_id, topic)]))
+
+    async def __lookup(self, keys: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        started_at: float = perf_counter()
+        candidates: list[tuple[str, str]] = [
+            (event_id, topic)
+            for event_id, topic in keys
+            if self.__processed_index.contains(event_id, topic)
+        ]
+        unverified: list[tuple[str, str]] = [
+            (event_id, topic)
+            for event_id, topic in candidates
+            if not self.__processed_index.is_exact(event_id, topic)
+        ]
+        existing: set[tuple[str, str]] = set(candidates).difference(unverified)
+        if unverified:
+            existing |= await self.__find_existing(unverified)
+
+        self.__index_stats["misses"] += len(keys) - len(candidates)
+        self.__index_stats["db_fallbacks"] += len(unverified)
+        self.__index_stats["hits"] += len(existing)
+        self.__metrics.observe("dedup_lookup_seconds", perf_counter() - started_at)
+
+        return existing
+
+    async def __find_existing(
+        self, keys: list[tuple[str, str]]
+    ) -> set[tuple[str, str]]:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        event_ids_by_topic: dict[str, list[str]] = {}
+        for event_id, topic in keys:
+            event_ids_by_topic.setdefault(topic, []).append(event_id)
+
+        existing: set[tuple[str, str]] = set()
+        await self.__begin_read()
+        try:
+            for topic, event_ids in event_ids_by_topic.items():
+                topic_key: str | int | None = await self.__topic_key(topic)
+                if topic_key is None:
+                    continue
+
+                for i in range(0, len(event_ids), 500):
+                    chunk: list[str] = event_ids[i : i + 500]
+                    cursor: Cursor = await self.__connection.execute(
+                        f"SELECT event_id FROM processed_events WHERE topic = ? AND event_id IN ({', '.join('?' * len(chunk))})",
+                        (topic_key, *chunk),
+                    )
+                    existing.update(
+                        (cast(str, row[0]), topic) for row in await cursor.fetchall()
+                    )
+                    await cursor.close()
+        finally:
+            self.__end_read()
+
+        return existing
 
     async def update_received(self) -> None:
         self.__stats["received"] = cast(int, self.__stats["received"]) + 1
-
-        await self.__save_stats()
+        self.__stats_dirty = True
+        self.__version += 1
 
     async def update_duplicated_dropped(self) -> None:
         self.__stats["duplicated_dropped"] = (
             cast(int, self.__stats["duplicated_dropped"]) + 1
         )
-
-        await self.__save_stats()
+        self.__stats_dirty = True
+        self.__version += 1
 
     async def add_topic(self, topic: str) -> None:
-        cast(set[str], self.__stats["topics"]).add(topic)
+        self.__apply_stats(0, 0, {topic})
 
-        await self.__save_stats()
+    async def flush_stats(self) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        if not self.__stats_dirty:
+            return
 
-    async def __save_stats(self) -> None:
+        async with self.__write_lock:
+            self.__stats_dirty = False
+
+            try:
+                await self.__write_stats(self.__stats, self.__topics_json)
+                await self.__connection.commit()
+            except Exception:
+                self.__stats_dirty = True
+                await self.__connection.rollback()
+                raise
+
+    async def __write_stats(self, stats: dict[str, object], topics_json: bytes) -> None:
         if self.__connection is None:
             raise RuntimeError("Connection not initialized")
 
         _ = await self.__connection.execute(
-            "INSERT OR REPLACE INTO stats (id, received, duplicated_dropped, topics) VALUES (1, ?, ?, ?)",
+            "INSERT OR REPLACE INTO stats (id, received, duplicated_dropped, topics, checkpoint_rowid, reaccepted) VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(rowid), 0) FROM processed_events), ?)",
             (
-                self.__stats["received"],
-                self.__stats["duplicated_dropped"],
-                dumps(list[str](cast(set[str], self.__stats["topics"]))),
+                self.__partition + 1,
+                stats["received"],
+                stats["duplicated_dropped"],
+                topics_json.decode(),
+                stats["reaccepted"],
             ),
         )
 
-        await self.__connection.commit()
+    def get_wal_checkpoint_interval(self) -> float:
+        return cast(int, self.__profile["wal_checkpoint_ms"]) / 1000
+
+    async def checkpoint_wal(self) -> None:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        async with self.__write_lock:
+            cursor: Cursor = await self.__connection.execute(
+                "PRAGMA wal_checkpoint(PASSIVE)"
+            )
+            _ = await cursor.fetchone()
+            await cursor.close()
 
     def get_stats(self) -> dict[str, object]:
         return self.__stats.copy()
 
+    def get_index_stats(self) -> dict[str, object]:
+        return {
+            "kind": self.__index_kind,
+            "keys": len(self.__processed_index),
+            "bytes": self.__processed_index.nbytes,
+            "evicted": self.__processed_index.get_stats().get("evicted", 0),
+            **self.__index_stats,
+        }
+
     def get_unique_processed(self) -> int:
-        return len(self.__processed_set)
+        return self.__unique_processed
 
-    def get_all_events(self) -> list[EventModel]:
-        events: list[EventModel] = []
-        for events_list in self.__processed_events.values():
-            events.extend(events_list)
+    def get_version(self, topic: str | None = None) -> int:
+        if topic is None:
+            return self.__version
 
-        return events
+        return self.__topic_versions.get(topic, self.__initial_version)
+
+    async def get_events_page(
+        self,
+        topic: str | None,
+        cursor: EventCursorModel,
+        limit: int,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> tuple[list[bytes], EventCursorModel | None]:
+        rows: list[tuple[int, int, bytes]] = await self.get_events_after(
+            topic, cursor, limit + 1, since, until
+        )
+        next_cursor: EventCursorModel | None = (
+            EventCursorModel(after=rows[limit - 1][0], timestamp=rows[limit - 1][1])
+            if len(rows) > limit
+            else None
+        )
+
+        return [event for *_, event in rows[:limit]], next_cursor
+
+    async def get_events_after(
+        self,
+        topic: str | None,
+        cursor: EventCursorModel,
+        limit: int,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[tuple[int, int, bytes]]:
+        if not self.__event_bytes.max_bytes:
+            rows: Sequence[Sequence[object]] = await self.__query_events(
+                topic, cursor, limit, since, until
+            )
 
-    def get_events_by_topic(self, topic: str) -> list[EventModel]:
-        return self.__processed_events.get(topic, [])
+            return [
+                (cast(int, row[5]), cast(int, row[4]), self.__row_json(row))
+                for row in rows
+            ]
+
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        await self.__begin_read()
+        try:
+            keys: Sequence[Sequence[object]] = await self.__select_events(
+                topic, cursor, limit, since, until, keys_only=True
+            )
+            events: dict[int, bytes] = {}
+            missing: list[int] = []
+
+            for event_id, event_topic, _, rowid in keys:
+                data: bytes | None = self.__event_bytes.get(
+                    cast(str, event_topic), cast(str, event_id)
+                )
+                if data is None:
+                    missing.append(cast(int, rowid))
+                else:
+                    events[cast(int, rowid)] = data
+
+            for row in await self.__select_rowids(missing):
+                data = self.__row_json(row)
+                self.__event_bytes.put(cast(str, row[1]), cast(str, row[0]), data)
+                events[cast(int, row[5])] = data
+        finally:
+            self.__end_read()
+
+        return [
+            (cast(int, rowid), cast(int, timestamp), events[cast(int, rowid)])
+            for *_, timestamp, rowid in keys
+            if rowid in events
+        ]
+
+    def get_event_cache_stats(self) -> dict[str, int]:
+        return self.__event_bytes.get_stats()
+
+    async def iter_events_ndjson(
+        self,
+        topic: str | None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[bytes]:
+        cursor: EventCursorModel = EventCursorModel(after=0)
+
+        while rows := await self.__query_events(
+            topic, cursor, chunk_size, since, until
+        ):
+            yield b"".join(self.__row_json(row) + b"\n" for row in rows)
+
+            cursor = EventCursorModel(
+                after=cast(int, rows[-1][5]), timestamp=cast(int, rows[-1][4])
+            )
+
+    def __row_json(self, row: Sequence[object]) -> bytes:
+        return event_json(
+            cast(str, row[0]),
+            cast(str, row[1]),
+            cast(str, row[2]),
+            self.__payload_json(row[3]),
+            from_epoch_us(cast(int, row[4])),
+        )
+
+    def __payload_json(self, payload: object) -> Fragment | dict[str, object]:
+        if not self.__compact:
+            return Fragment(cast(str, payload))
+
+        message, timestamp = self.__payload_codec.decode_fields(cast(bytes, payload))
+
+        return {"message": message, "timestamp": timestamp}
+
+    async def __query_events(
+        self,
+        topic: str | None,
+        cursor: EventCursorModel,
+        limit: int,
+        since: datetime | None,
+        until: datetime | None,
+    ) -> Sequence[Sequence[object]]:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        await self.__begin_read()
+        try:
+            return await self.__select_events(topic, cursor, limit, since, until)
+        finally:
+            self.__end_read()
+
+    async def __select_events(
+        self,
+        topic: str | None,
+        cursor: EventCursorModel,
+        limit: int,
+        since: datetime | None,
+        until: datetime | None,
+        keys_only: bool = False,
+    ) -> Sequence[Sequence[object]]:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        by_timestamp: bool = topic is not None and (
+            since is not None or until is not None
+        )
+        conditions: list[str] = []
+        parameters: list[object] = []
+
+        if topic is not None:
+            conditions.append("topic = ?")
+            parameters.append(await self.__topic_key(topic))
+
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            parameters.append(to_epoch_us(since))
+
+        if until is not None:
+            conditions.append("timestamp < ?")
+            parameters.append(to_epoch_us(until))
+
+        if by_timestamp and cursor.timestamp is not None:
+            conditions.extend(["timestamp >= ?", "(timestamp, rowid) > (?, ?)"])
+            parameters.extend([cursor.timestamp, cursor.timestamp, cursor.after])
+        else:
+            conditions.append("rowid > ?")
+            parameters.append(cursor.after)
+
+        index: str = (
+            f"INDEXED BY {self.__index_prefix()}_topic_timestamp"
+            if by_timestamp
+            else ""
+        )
+        columns: str = (
+            "event_id, topic, timestamp, rowid"
+            if keys_only
+            else "event_id, topic, source, payload, timestamp, rowid"
+        )
+        order: str = "timestamp, rowid" if by_timestamp else "rowid"
+        rows_cursor: Cursor = await self.__connection.execute(
+            f"SELECT {columns} FROM processed_events {index} WHERE {' AND '.join(conditions)} ORDER BY {order} LIMIT ?",
+            (*parameters, limit),
+        )
+        rows: list[Row] = list(await rows_cursor.fetchall())
+        await rows_cursor.close()
+
+        return await self.__resolve_names(rows, with_source=not keys_only)
+
+    async def __select_rowids(
+        self, rowids: list[int], chunk_size: int = 500
+    ) -> Sequence[Sequence[object]]:
+        if self.__connection is None:
+            raise RuntimeError("Connection not initialized")
+
+        rows: list[Row] = []
+        for i in range(0, len(rowids), chunk_size):
+            chunk: list[int] = rowids[i : i + chunk_size]
+            cursor: Cursor = await self.__connection.execute(
+                f"SELECT event_id, topic, source, payload, timestamp, rowid FROM processed_events WHERE rowid IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            rows.extend(await cursor.fetchall())
+            await cursor.close()
+
+        return await self.__resolve_names(rows, with_source=True)
 
     async def close(self) -> None:
+        if self.__migration:
+            _ = self.__migration.cancel()
+            try:
+                await self.__migration
+            except CancelledError:
+                pass
+
+            self.__migration = None
+
         if self.__connection:
+            await self.flush_stats()
+
+            if isinstance(self.__processed_index, ScalableBloomFilter):
+                cursor: Cursor = await self.__connection.execute(
+                    "SELECT COALESCE(MAX(rowid), 0) FROM processed_events"
+                )
+                row: Row | None = await cursor.fetchone()
+                await cursor.close()
+
+                self.__processed_index.save(
+                    self.__bloom_path, cast(int, row[0]) if row else 0
+                )
+
             await self.__connection.close()
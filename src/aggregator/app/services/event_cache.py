@@ -0,0 +1,93 @@
+from collections import OrderedDict
+from datetime import datetime
+
+from orjson import OPT_UTC_Z, Fragment, dumps
+
+ENTRY_OVERHEAD: int = 160
+
+
+def event_json(
+    event_id: str,
+    topic: str,
+    source: str,
+    payload: Fragment | dict[str, object],
+    timestamp: datetime,
+) -> bytes:
+    return dumps(
+        {
+            "event_id": event_id,
+            "topic": topic,
+            "source": source,
+            "payload": payload,
+            "timestamp": timestamp,
+        },
+        option=OPT_UTC_Z,
+    )
+
+
+class EventBytesCache:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes: int = max(0, max_bytes)
+        self.__topics: OrderedDict[str, OrderedDict[str, bytes]] = OrderedDict()
+        self.__bytes: int = 0
+        self.__entries: int = 0
+        self.__stats: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, topic: str, event_id: str) -> bytes | None:
+        entries: OrderedDict[str, bytes] | None = self.__topics.get(topic)
+        data: bytes | None = entries.get(event_id) if entries is not None else None
+
+        if data is None:
+            self.__stats["misses"] += 1
+            return None
+
+        self.__topics.move_to_end(topic)
+        self.__stats["hits"] += 1
+
+        return data
+
+    def put(self, topic: str, event_id: str, data: bytes) -> None:
+        size: int = len(data) + len(event_id) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+
+        entries: OrderedDict[str, bytes] | None = self.__topics.get(topic)
+        if entries is None:
+            entries = self.__topics[topic] = OrderedDict()
+        else:
+            self.__topics.move_to_end(topic)
+
+        previous: bytes | None = entries.get(event_id)
+        if previous is not None:
+            self.__bytes -= len(previous) + len(event_id) + ENTRY_OVERHEAD
+            self.__entries -= 1
+
+        entries[event_id] = memoryview(data).tobytes()
+        self.__bytes += size
+        self.__entries += 1
+
+        while self.__bytes > self.max_bytes:
+            self.__evict()
+
+    def clear(self) -> None:
+        self.__topics.clear()
+        self.__bytes = 0
+        self.__entries = 0
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "entries": self.__entries,
+            "bytes": self.__bytes,
+            "max_bytes": self.max_bytes,
+            **self.__stats,
+        }
+
+    def __evict(self) -> None:
+        topic, entries = next(iter(self.__topics.items()))
+        event_id, data = entries.popitem(last=False)
+        if not entries:
+            del self.__topics[topic]
+
+        self.__bytes -= len(data) + len(event_id) + ENTRY_OVERHEAD
+        self.__entries -= 1
+        self.__stats["evictions"] += 1
@@ -0,0 +1,142 @@
+from datetime import UTC, datetime, timedelta, timezone
+from struct import Struct
+from typing import TYPE_CHECKING
+from zlib import DEFLATED, compress, compressobj, decompress, decompressobj
+
+from ..models.events import EventPayloadModel
+
+if TYPE_CHECKING:
+    from zlib import _Compress
+
+EPOCH: datetime = datetime(1970, 1, 1, tzinfo=UTC)
+EXACT_FLOAT_US: int = 2**52
+
+PAYLOAD_HEADER: Struct = Struct("<qhB")
+DICTIONARY_ID: Struct = Struct("<H")
+NAIVE_OFFSET: int = -32768
+
+RAW: int = 0
+DEFLATE: int = 1
+DICTIONARY: int = 2
+
+MIN_COMPRESSED_LENGTH: int = 64
+MAX_DICTIONARY_BYTES: int = 32768
+COMPRESSION_LEVEL: int = 6
+COMPRESSION_MEMORY_LEVEL: int = 4
+
+
+def to_epoch_us(value: datetime) -> int:
+    return (
+        (value if value.tzinfo else value.replace(tzinfo=UTC)) - EPOCH
+    ) // timedelta(microseconds=1)
+
+
+def from_epoch_us(value: int) -> datetime:
+    if -EXACT_FLOAT_US < value < EXACT_FLOAT_US:
+        return datetime.fromtimestamp(value / 1_000_000, UTC)
+
+    return EPOCH + timedelta(microseconds=value)
+
+
+def build_dictionary(messages: list[str]) -> bytes:
+    dictionary: bytes = b""
+    for message in reversed(messages):
+        encoded: bytes = message.encode()
+        if encoded in dictionary:
+            continue
+
+        dictionary = encoded + dictionary
+        if len(dictionary) >= MAX_DICTIONARY_BYTES:
+            break
+
+    return dictionary[-MAX_DICTIONARY_BYTES:]
+
+
+class NameTable:
+    def __init__(self, table: str) -> None:
+        self.table: str = table
+        self.ids: dict[str, int] = {}
+        self.names: dict[int, str] = {}
+
+    def add(self, name_id: int, name: str) -> None:
+        self.ids[name] = name_id
+        self.names[name_id] = name
+
+    def clear(self) -> None:
+        self.ids.clear()
+        self.names.clear()
+
+
+class PayloadCodec:
+    def __init__(self, compression: str) -> None:
+        self.compression: str = (
+            compression if compression in ("zlib", "dictionary") else "none"
+        )
+        self.__dictionaries: dict[int, bytes] = {}
+        self.__dictionary_id: int = 0
+        self.__compressor: _Compress | None = None
+
+    def add_dictionary(self, dictionary_id: int, dictionary: bytes) -> None:
+        self.__dictionaries[dictionary_id] = dictionary
+        if self.compression == "dictionary" and dictionary_id > self.__dictionary_id:
+            self.__dictionary_id = dictionary_id
+            self.__compressor = compressobj(
+                COMPRESSION_LEVEL,
+                DEFLATED,
+                -15,
+                COMPRESSION_MEMORY_LEVEL,
+                zdict=dictionary,
+            )
+
+    def has_dictionary(self) -> bool:
+        return bool(self.__dictionaries)
+
+    def encode(self, payload: EventPayloadModel) -> bytes:
+        offset: timedelta | None = payload.timestamp.utcoffset()
+        header: tuple[int, int] = (
+            to_epoch_us(payload.timestamp),
+            NAIVE_OFFSET if offset is None else offset // timedelta(minutes=1),
+        )
+        message: bytes = payload.message.encode()
+
+        if self.compression != "none" and len(message) >= MIN_COMPRESSED_LENGTH:
+            if self.__compressor:
+                compressor = self.__compressor.copy()
+                compressed: bytes = compressor.compress(message) + compressor.flush()
+                if len(compressed) + DICTIONARY_ID.size < len(message):
+                    return (
+                        PAYLOAD_HEADER.pack(*header, DICTIONARY)
+                        + DICTIONARY_ID.pack(self.__dictionary_id)
+                        + compressed
+                    )
+            else:
+                compressed = compress(message, COMPRESSION_LEVEL, -15)
+                if len(compressed) < len(message):
+                    return PAYLOAD_HEADER.pack(*header, DEFLATE) + compressed
+
+        return PAYLOAD_HEADER.pack(*header, RAW) + message
+
+    def decode_fields(self, data: bytes) -> tuple[str, datetime]:
+        timestamp_us, offset, encoding = PAYLOAD_HEADER.unpack_from(data)
+        body: bytes = data[PAYLOAD_HEADER.size :]
+
+        if encoding == DEFLATE:
+            body = decompress(body, wbits=-15)
+        elif encoding == DICTIONARY:
+            (dictionary_id,) = DICTIONARY_ID.unpack_from(body)
+            body = decompressobj(
+                wbits=-15, zdict=self.__dictionaries[dictionary_id]
+            ).decompress(body[DICTIONARY_ID.size :])
+
+        timestamp: datetime = from_epoch_us(timestamp_us)
+        if offset == NAIVE_OFFSET:
+            timestamp = timestamp.replace(tzinfo=None)
+        elif offset:
+            timestamp = timestamp.astimezone(timezone(timedelta(minutes=offset)))
+
+        return body.decode(), timestamp
+
+    def decode(self, data: bytes) -> EventPayloadModel:
+        message, timestamp = self.decode_fields(data)
+
+        return EventPayloadModel(message=message, timestamp=timestamp)
@@ -1,27 +1,236 @@
-from asyncio import Queue
+from asyncio import Condition, Future, get_running_loop, wait_for
+from collections import deque
+from math import ceil
+from os import getenv
+from time import monotonic
+from typing import TypeAlias
 
 from ..models.events import EventModel
 
 
+class QueueFullError(Exception):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Event queue is full, retry after {retry_after}s")
+        self.retry_after: int = retry_after
+
+
+class PublishAck:
+    def __init__(self, count: int) -> None:
+        self.__future: Future[list[str]] = get_running_loop().create_future()
+        self.__results: list[str] = ["" for _ in range(count)]
+        self.__pending: int = count
+
+    def resolve(self, index: int, result: str) -> None:
+        if self.__future.done():
+            return
+
+        self.__results[index] = result
+        self.__pending -= 1
+        if self.__pending == 0:
+            self.__future.set_result(self.__results)
+
+    def fail(self, error: BaseException) -> None:
+        if not self.__future.done():
+            self.__future.set_exception(error)
+
+    async def wait(self, timeout: float) -> list[str]:
+        return await wait_for(self.__future, timeout)
+
+
+AckSlot: TypeAlias = tuple[PublishAck, int]
+QueuedEvent: TypeAlias = tuple[EventModel, AckSlot | None, int, float]
+QueueSlot: TypeAlias = tuple[EventModel, int, AckSlot | None, int, float]
+
+
 class EventQueueService:
     __instance: "EventQueueService | None" = None
-    __queue: "Queue[EventModel] | None" = None
+    __events: "list[deque[QueueSlot]] | None" = None
+    __condition: "Condition | None" = None
 
     def __new__(cls) -> "EventQueueService":
         if cls.__instance is None:
             cls.__instance = super().__new__(cls)
-            cls.__queue = Queue[EventModel]()
+            cls.__events = [
+                deque[QueueSlot]()
+                for _ in range(max(1, int(getenv(key="CONSUMER_WORKERS", default="1"))))
+            ]
+            cls.__condition = Condition()
+            cls.__instance.__configure()
 
         return cls.__instance
 
+    @property
+    def partitions(self) -> int:
+        return len(self.__events or ())
+
+    def __configure(self) -> None:
+        self.__max_events: int = max(
+            0, int(getenv(key="EVENT_QUEUE_MAX_EVENTS", default="0"))
+        )
+        self.__max_bytes: int = max(
+            0, int(getenv(key="EVENT_QUEUE_MAX_BYTES", default="0"))
+        )
+        self.__put_timeout: float = (
+            max(0, int(getenv(key="EVENT_QUEUE_PUT_TIMEOUT_MS", default="0"))) / 1000
+        )
+        self.__depth: int = 0
+        self.__depth_bytes: int = 0
+        self.__high_water_mark: int = 0
+        self.__drained: deque[tuple[float, int]] = deque[tuple[float, int]]()
+
     async def get(self) -> "EventModel":
-        if self.__queue is None:
+        return (await self.get_batch(1, 0))[0][0]
+
+    async def get_batch(
+        self, max_size: int, timeout: float, partition: int = 0
+    ) -> list[QueuedEvent]:
+        if self.__events is None or self.__condition is None:
             raise RuntimeError("Queue not initialized")
 
-        return await self.__queue.get()
+        events: deque[QueueSlot] = self.__events[partition]
+
+        async with self.__condition:
+            _ = await self.__condition.wait_for(lambda: len(events) > 0)
+            deadline: float = get_running_loop().time() + timeout
+
+            while len(events) < max_size:
+                remaining: float = deadline - get_running_loop().time()
+                if remaining <= 0:
+                    break
+
+                try:
+                    _ = await wait_for(self.__condition.wait(), remaining)
+                except TimeoutError:
+                    break
+
+            batch: list[QueuedEvent] = []
+            while events and len(batch) < max_size:
+                event, size, ack_slot, log_offset, enqueued_at = events.popleft()
+                self.__depth_bytes -= size
+                batch.append((event, ack_slot, log_offset, enqueued_at))
+
+            self.__depth -= len(batch)
+
+            self.__record_drain(len(batch))
+            self.__condition.notify_all()
+
+        return batch
 
     async def put(self, event: "EventModel") -> None:
-        if self.__queue is None:
+        await self.put_many([event])
+
+    async def put_many(
+        self,
+        events: list["EventModel"],
+        size: int | None = None,
+        ack: PublishAck | None = None,
+        log_offset: int = 0,
+    ) -> None:
+        if self.__events is None or self.__condition is None:
             raise RuntimeError("Queue not initialized")
 
-        await self.__queue.put(event)
+        if not events:
+            return
+
+        enqueued_at: float = monotonic()
+        if size is None:
+            sized_events: list[QueueSlot] = [
+                (
+                    event,
+                    self.__event_size(event),
+                    (ack, i) if ack else None,
+                    log_offset,
+                    enqueued_at,
+                )
+                for i, event in enumerate(events)
+            ]
+        else:
+            event_size: int = max(1, size // len(events))
+            sized_events = [
+                (event, event_size, (ack, i) if ack else None, log_offset, enqueued_at)
+                for i, event in enumerate(events)
+            ]
+
+        batch_bytes: int = sum(event_size for _, event_size, *_ in sized_events)
+        partitions: int = len(self.__events)
+
+        async with self.__condition:
+            if not self.__has_room(len(events), batch_bytes):
+                if self.__put_timeout <= 0:
+                    raise QueueFullError(self.__retry_after(len(events)))
+
+                try:
+                    _ = await wait_for(
+                        self.__condition.wait_for(
+                            lambda: self.__has_room(len(events), batch_bytes)
+                        ),
+                        self.__put_timeout,
+                    )
+                except TimeoutError:
+                    raise QueueFullError(self.__retry_after(len(events))) from None
+
+            if partitions == 1:
+                self.__events[0].extend(sized_events)
+            else:
+                for sized_event in sized_events:
+                    self.__events[
+                        hash((sized_event[0].topic, sized_event[0].event_id))
+                        % partitions
+                    ].append(sized_event)
+
+            self.__depth += len(sized_events)
+            self.__depth_bytes += batch_bytes
+            self.__high_water_mark = max(self.__high_water_mark, self.__depth)
+            self.__condition.notify_all()
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "depth": self.__depth,
+            "depth_bytes": self.__depth_bytes,
+            "high_water_mark": self.__high_water_mark,
+            "max_events": self.__max_events,
+            "max_bytes": self.__max_bytes,
+            "partitions": self.partitions,
+        }
+
+    def __has_room(self, count: int, size: int) -> bool:
+        if self.__depth == 0:
+            return True
+
+        if self.__max_events and self.__depth + count > self.__max_events:
+            return False
+
+        return not self.__max_bytes or self.__depth_bytes + size <= self.__max_bytes
+
+    def __record_drain(self, count: int) -> None:
+        now: float = monotonic()
+        self.__drained.append((now, count))
+
+        while self.__drained and now - self.__drained[0][0] > 10:
+            _ = self.__drained.popleft()
+
+    def __retry_after(self, count: int) -> int:
+        now: float = monotonic()
+        while self.__drained and now - self.__drained[0][0] > 10:
+            _ = self.__drained.popleft()
+
+        if not self.__drained:
+            return 1
+
+        drained: int = sum(drained_count for _, drained_count in self.__drained)
+        drain_rate: float = drained / max(1.0, now - self.__drained[0][0])
+        excess: int = self.__depth + count
+        if self.__max_events:
+            excess -= self.__max_events
+
+        return min(60, max(1, ceil(excess / drain_rate)))
+
+    @staticmethod
+    def __event_size(event: "EventModel") -> int:
+        return (
+            len(event.event_id)
+            + len(event.topic)
+            + len(event.source)
+            + len(event.payload.message)
+            + 128
+        )
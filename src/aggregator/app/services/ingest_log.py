@@ -0,0 +1,219 @@
+from asyncio import Task, create_task, shield, to_thread
+from os import O_RDONLY, close, fsync, listdir, makedirs, remove, replace
+from os import open as open_fd
+from os.path import exists, join
+from struct import Struct
+from typing import BinaryIO
+from zlib import crc32
+
+from loguru import logger
+
+RECORD_HEADER: Struct = Struct(">II")
+
+
+class IngestLogService:
+    def __init__(self, directory: str, segment_bytes: int) -> None:
+        self.__directory: str = directory
+        self.__segment_bytes: int = max(RECORD_HEADER.size, segment_bytes)
+        self.__segments: list[int] = []
+        self.__file: BinaryIO | None = None
+        self.__retired_files: list[BinaryIO] = []
+        self.__end_offset: int = 0
+        self.__synced_offset: int = 0
+        self.__committed_offset: int = 0
+        self.__checkpointed_offset: int = 0
+        self.__pending: dict[int, int] = {}
+        self.__sync_task: "Task[None] | None" = None
+
+    def open(self) -> list[tuple[int, bytes]]:
+        makedirs(self.__directory, exist_ok=True)
+
+        checkpoint_path: str = join(self.__directory, "checkpoint")
+        if exists(path=checkpoint_path):
+            with open(checkpoint_path, "rb") as file:
+                self.__checkpointed_offset = int(file.read() or b"0")
+
+        self.__committed_offset = self.__checkpointed_offset
+        self.__segments = sorted(
+            int(name.removesuffix(".log"))
+            for name in listdir(self.__directory)
+            if name.endswith(".log")
+        )
+        if not self.__segments:
+            self.__segments = [self.__checkpointed_offset]
+
+        records: list[tuple[int, bytes]] = []
+        for start in self.__segments:
+            records.extend(self.__read_segment(start))
+
+        self.__end_offset = self.__synced_offset = self.__segment_end(
+            self.__segments[-1]
+        )
+        self.__file = open(self.__segment_path(self.__segments[-1]), "ab")  # noqa: SIM115
+
+        return records
+
+    async def append(self, record: bytes, count: int) -> int:
+        if self.__file is None:
+            raise RuntimeError("Ingest log not opened")
+
+        if self.__end_offset - self.__segments[-1] >= self.__segment_bytes:
+            self.__roll()
+
+        _ = self.__file.write(RECORD_HEADER.pack(len(record), crc32(record)))
+        _ = self.__file.write(record)
+        self.__end_offset += RECORD_HEADER.size + len(record)
+
+        offset: int = self.__end_offset
+        self.__pending[offset] = count
+
+        while self.__synced_offset < offset:
+            if self.__sync_task is None:
+                self.__sync_task = create_task(coro=self.__sync())
+
+            await shield(self.__sync_task)
+
+        return offset
+
+    def commit(self, offsets: list[int]) -> None:
+        for offset in offsets:
+            self.__pending[offset] -= 1
+
+        while self.__pending:
+            offset = next(iter(self.__pending))
+            if self.__pending[offset] > 0:
+                break
+
+            del self.__pending[offset]
+            self.__committed_offset = offset
+
+    def commit_through(self, offset: int) -> None:
+        self.__committed_offset = max(self.__committed_offset, offset)
+
+    async def checkpoint(self) -> None:
+        if self.__committed_offset == self.__checkpointed_offset:
+            return
+
+        committed_offset: int = self.__committed_offset
+        await to_thread(self.__write_checkpoint, committed_offset)
+        self.__checkpointed_offset = committed_offset
+
+        while len(self.__segments) > 1 and self.__segments[1] <= committed_offset:
+            remove(path=self.__segment_path(self.__segments.pop(0)))
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "segments": len(self.__segments),
+            "end_offset": self.__end_offset,
+            "committed_offset": self.__committed_offset,
+            "checkpointed_offset": self.__checkpointed_offset,
+        }
+
+    async def close(self) -> None:
+        if self.__file is None:
+            return
+
+        if self.__sync_task:
+            await shield(self.__sync_task)
+
+        self.__file.flush()
+        fsync(self.__file.fileno())
+        self.__file.close()
+        self.__file = None
+
+        await self.checkpoint()
+
+    async def __sync(self) -> None:
+        try:
+            if self.__file is None:
+                return
+
+            offset: int = self.__end_offset
+            self.__file.flush()
+            await to_thread(fsync, self.__file.fileno())
+            self.__synced_offset = max(self.__synced_offset, offset)
+        finally:
+            self.__sync_task = None
+
+            for file in self.__retired_files:
+                file.close()
+
+            self.__retired_files.clear()
+
+    def __roll(self) -> None:
+        if self.__file is None:
+            return
+
+        self.__file.flush()
+        fsync(self.__file.fileno())
+        self.__synced_offset = self.__end_offset
+
+        if self.__sync_task is None:
+            self.__file.close()
+        else:
+            self.__retired_files.append(self.__file)
+
+        self.__segments.append(self.__end_offset)
+        self.__file = open(self.__segment_path(self.__end_offset), "ab")  # noqa: SIM115
+        self.__sync_directory()
+
+    def __read_segment(self, start: int) -> list[tuple[int, bytes]]:
+        path: str = self.__segment_path(start)
+        if not exists(path=path):
+            return []
+
+        with open(path, "rb") as file:
+            data: bytes = file.read()
+
+        records: list[tuple[int, bytes]] = []
+        position: int = 0
+        while position + RECORD_HEADER.size <= len(data):
+            length, checksum = RECORD_HEADER.unpack_from(data, position)
+            end: int = position + RECORD_HEADER.size + length
+            record: bytes = data[position + RECORD_HEADER.size : end]
+            if end > len(data) or crc32(record) != checksum:
+                break
+
+            if start + end > self.__checkpointed_offset:
+                records.append((start + end, record))
+
+            position = end
+
+        if position < len(data):
+            logger.warning(
+                f"Truncating {len(data) - position} bytes of torn ingest log records in {path}"
+            )
+
+            with open(path, "r+b") as file:
+                _ = file.truncate(position)
+
+        return records
+
+    def __segment_end(self, start: int) -> int:
+        path: str = self.__segment_path(start)
+        if not exists(path=path):
+            return start
+
+        with open(path, "rb") as file:
+            return start + file.seek(0, 2)
+
+    def __segment_path(self, start: int) -> str:
+        return join(self.__directory, f"{start:020d}.log")
+
+    def __write_checkpoint(self, offset: int) -> None:
+        path: str = join(self.__directory, "checkpoint")
+
+        with open(f"{path}.tmp", "wb") as file:
+            _ = file.write(str(offset).encode())
+            file.flush()
+            fsync(file.fileno())
+
+        replace(f"{path}.tmp", path)
+        self.__sync_directory()
+
+    def __sync_directory(self) -> None:
+        descriptor: int = open_fd(self.__directory, O_RDONLY)
+        try:
+            fsync(descriptor)
+        finally:
+            close(descriptor)
@@ -0,0 +1,17 @@
+from asyncio import IncompleteReadError, StreamReader, StreamWriter
+from struct import Struct
+
+FRAME_HEADER: Struct = Struct(">I")
+
+
+async def read_frame(reader: StreamReader) -> bytes | None:
+    try:
+        header: bytes = await reader.readexactly(FRAME_HEADER.size)
+        return await reader.readexactly(FRAME_HEADER.unpack(header)[0])
+    except IncompleteReadError:
+        return None
+
+
+def write_frame(writer: StreamWriter, frame: bytes) -> None:
+    writer.write(FRAME_HEADER.pack(len(frame)))
+    writer.write(frame)
@@ -0,0 +1,231 @@
+from asyncio import CancelledError, Task, create_task, get_running_loop, sleep
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable
+from typing import TypeAlias, cast
+
+MetricsSnapshot: TypeAlias = dict[str, dict[str, object]]
+
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS: tuple[float, ...] = (1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+HISTOGRAMS: dict[str, tuple[str, tuple[float, ...]]] = {
+    "publish_seconds": ("Time spent handling a /publish request", LATENCY_BUCKETS),
+    "publish_events": ("Events per /publish request", SIZE_BUCKETS),
+    "enqueue_commit_lag_seconds": (
+        "Time from enqueue to SQLite commit per event",
+        LATENCY_BUCKETS,
+    ),
+    "batch_events": ("Events per consumer batch", SIZE_BUCKETS),
+    "dedup_lookup_seconds": ("Time spent in dedup index lookups", LATENCY_BUCKETS),
+    "sqlite_execute_seconds": (
+        "Time spent executing SQLite statements per group commit",
+        LATENCY_BUCKETS,
+    ),
+    "sqlite_commit_seconds": ("Time spent in SQLite COMMIT", LATENCY_BUCKETS),
+    "event_loop_lag_seconds": (
+        "Delay between a scheduled event loop wakeup and its execution",
+        LATENCY_BUCKETS,
+    ),
+}
+TOPIC_COUNTERS: dict[str, str] = {
+    "events_processed_total": "Unique events committed per topic",
+    "events_duplicated_total": "Duplicate events dropped per topic",
+}
+SCALARS: dict[str, tuple[str, str]] = {
+    "queue_depth": ("gauge", "Events waiting in the in-memory queue"),
+    "queue_depth_bytes": ("gauge", "Estimated bytes waiting in the in-memory queue"),
+    "events_received_total": ("counter", "Events received by the consumer"),
+    "events_unique_total": ("counter", "Unique events stored"),
+    "events_dropped_total": ("counter", "Duplicate events dropped"),
+    "event_cache_bytes": ("gauge", "Estimated bytes held by the event bytes cache"),
+    "event_cache_hits_total": ("counter", "Read endpoint lookups served from cache"),
+    "event_cache_misses_total": (
+        "counter",
+        "Read endpoint lookups serialized from SQLite",
+    ),
+}
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.__buckets: tuple[float, ...] = buckets
+        self.__counts: list[int] = [0] * (len(buckets) + 1)
+        self.__sum: float = 0.0
+
+    def observe(self, value: float, count: int = 1) -> None:
+        self.__counts[bisect_left(self.__buckets, value)] += count
+        self.__sum += value * count
+
+    def snapshot(self) -> dict[str, object]:
+        return {"counts": self.__counts.copy(), "sum": self.__sum}
+
+
+class MetricsService:
+    __instance: "MetricsService | None" = None
+
+    def __new__(cls) -> "MetricsService":
+        if cls.__instance is None:
+            cls.__instance = super().__new__(cls)
+            cls.__instance.__configure()
+
+        return cls.__instance
+
+    def __configure(self) -> None:
+        self.__histograms: dict[str, Histogram] = {
+            name: Histogram(buckets) for name, (_, buckets) in HISTOGRAMS.items()
+        }
+        self.__topic_counters: dict[str, Counter[str]] = {
+            name: Counter[str]() for name in TOPIC_COUNTERS
+        }
+        self.__loop_monitor: "Task[None] | None" = None
+        self.__loop_monitor_interval: float = 0.1
+
+    def observe(self, name: str, value: float, count: int = 1) -> None:
+        self.__histograms[name].observe(value, count)
+
+    def count_topics(self, name: str, topics: Iterable[str]) -> None:
+        self.__topic_counters[name].update(topics)
+
+    def start(self) -> None:
+        if self.__loop_monitor is None:
+            self.__loop_monitor = create_task(coro=self.__monitor_loop())
+
+    async def stop(self) -> None:
+        if self.__loop_monitor is None:
+            return
+
+        _ = self.__loop_monitor.cancel()
+        try:
+            await self.__loop_monitor
+        except CancelledError:
+            pass
+
+        self.__loop_monitor = None
+
+    async def __monitor_loop(self) -> None:
+        histogram: Histogram = self.__histograms["event_loop_lag_seconds"]
+
+        while True:
+            scheduled_at: float = get_running_loop().time()
+            await sleep(self.__loop_monitor_interval)
+            histogram.observe(
+                max(
+                    0.0,
+                    get_running_loop().time()
+                    - scheduled_at
+                    - self.__loop_monitor_interval,
+                )
+            )
+
+    def snapshot(self, scalars: dict[str, float]) -> MetricsSnapshot:
+        return {
+            "scalars": cast(dict[str, object], scalars),
+            "counters": {
+                name: dict(counter) for name, counter in self.__topic_counters.items()
+            },
+            "histograms": {
+                name: histogram.snapshot()
+                for name, histogram in self.__histograms.items()
+            },
+        }
+
+
+def merge_snapshots(snapshots: list[MetricsSnapshot]) -> MetricsSnapshot:
+    scalars: Counter[str] = Counter[str]()
+    counters: dict[str, Counter[str]] = {
+        name: Counter[str]() for name in TOPIC_COUNTERS
+    }
+    histograms: dict[str, dict[str, object]] = {}
+
+    for snapshot in snapshots:
+        scalars.update(cast(dict[str, int], snapshot["scalars"]))
+
+        for name, values in snapshot["counters"].items():
+            counters[name].update(cast(dict[str, int], values))
+
+        for name, values in snapshot["histograms"].items():
+            histogram: dict[str, object] = cast(dict[str, object], values)
+            merged: dict[str, object] | None = histograms.get(name)
+            histograms[name] = (
+                {
+                    "counts": [
+                        a + b
+                        for a, b in zip(
+                            cast(list[int], merged["counts"]),
+                            cast(list[int], histogram["counts"]),
+                            strict=True,
+                        )
+                    ],
+                    "sum": cast(float, merged["sum"]) + cast(float, histogram["sum"]),
+                }
+                if merged
+                else histogram
+            )
+
+    return {
+        "scalars": cast(dict[str, object], dict(scalars)),
+        "counters": cast(
+            dict[str, object], {name: dict(c) for name, c in counters.items()}
+        ),
+        "histograms": cast(dict[str, object], histograms),
+    }
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_metrics(snapshot: MetricsSnapshot, prefix: str = "chronicle") -> str:
+    lines: list[str] = []
+
+    for name, (kind, description) in SCALARS.items():
+        lines.append(f"# HELP {prefix}_{name} {description}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        lines.append(f"{prefix}_{name} {snapshot['scalars'].get(name, 0)}")
+
+    for name, description in TOPIC_COUNTERS.items():
+        lines.append(f"# HELP {prefix}_{name} {description}")
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        for topic, count in sorted(
+            cast(dict[str, int], snapshot["counters"].get(name, {})).items()
+        ):
+            lines.append(f'{prefix}_{name}{{topic="{escape_label(topic)}"}} {count}')
+
+    for name, (description, buckets) in HISTOGRAMS.items():
+        histogram: dict[str, object] = cast(
+            dict[str, object],
+            snapshot["histograms"].get(
+                name, {"counts": [0] * (len(buckets) + 1), "sum": 0.0}
+            ),
+        )
+        counts: list[int] = cast(list[int], histogram["counts"])
+
+        lines.append(f"# HELP {prefix}_{name} {description}")
+        lines.append(f"# TYPE {prefix}_{name} histogram")
+
+        cumulative: int = 0
+        for bound, count in zip((*buckets, "+Inf"), counts, strict=True):
+            cumulative += count
+            lines.append(f'{prefix}_{name}_bucket{{le="{bound}"}} {cumulative}')
+
+        lines.append(f"{prefix}_{name}_sum {histogram['sum']}")
+        lines.append(f"{prefix}_{name}_count {cumulative}")
+
+    return "\n".join(lines) + "\n"
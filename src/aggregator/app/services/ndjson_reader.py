@@ -0,0 +1,72 @@
+from collections.abc import AsyncIterator
+from zlib import MAX_WBITS, decompressobj
+from zlib import error as ZlibError
+
+DECOMPRESS_CHUNK_BYTES: int = 1024 * 1024
+
+
+class InvalidStreamError(Exception):
+    pass
+
+
+async def decompress_gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    decompressor = decompressobj(wbits=16 + MAX_WBITS)
+
+    try:
+        async for chunk in chunks:
+            data: bytes = chunk
+            while data:
+                if decompressor.eof:
+                    decompressor = decompressobj(wbits=16 + MAX_WBITS)
+
+                if output := decompressor.decompress(data, DECOMPRESS_CHUNK_BYTES):
+                    yield output
+
+                data = (
+                    decompressor.unused_data
+                    if decompressor.eof
+                    else decompressor.unconsumed_tail
+                )
+
+        if output := decompressor.flush():
+            yield output
+    except ZlibError as e:
+        raise InvalidStreamError(f"Invalid gzip body: {e}") from e
+
+    if not decompressor.eof:
+        raise InvalidStreamError("Invalid gzip body: truncated stream")
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[tuple[int, bytes | None]]:
+    buffer: bytearray = bytearray()
+    line_number: int = 0
+    oversized: bool = False
+
+    async for chunk in chunks:
+        start: int = 0
+
+        while (end := chunk.find(b"\n", start)) != -1:
+            line_number += 1
+            if oversized or len(buffer) + end - start > max_line_bytes:
+                yield line_number, None
+            else:
+                buffer += chunk[start:end]
+                if buffer.strip():
+                    yield line_number, bytes(buffer)
+
+            buffer.clear()
+            oversized = False
+            start = end + 1
+
+        if not oversized:
+            buffer += chunk[start:]
+            if len(buffer) > max_line_bytes:
+                buffer.clear()
+                oversized = True
+
+    if oversized:
+        yield line_number + 1, None
+    elif buffer.strip():
+        yield line_number + 1, bytes(buffer)
@@ -0,0 +1,15 @@
+from zlib import crc32
+
+
+def partition_for(event_id: str, topic: str, partitions: int) -> int:
+    if partitions <= 1:
+        return 0
+
+    return crc32(f"{topic}\x00{event_id}".encode()) % partitions
+
+
+def shard_for(topic: str, shards: int) -> int:
+    if shards <= 1:
+        return 0
+
+    return crc32(topic.encode()) % shards
@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+ENTRY_OVERHEAD: int = 200
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return any(
+        tag.strip().removeprefix("W/") == etag.removeprefix("W/")
+        for tag in if_none_match.split(",")
+    )
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes: int = max(0, max_bytes)
+        self.__entries: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+        self.__bytes: int = 0
+
+    def get(self, key: str, version: int) -> bytes | None:
+        entry: tuple[int, bytes] | None = self.__entries.get(key)
+
+        if entry is None or entry[0] != version:
+            return None
+
+        self.__entries.move_to_end(key)
+
+        return entry[1]
+
+    def put(self, key: str, version: int, body: bytes) -> None:
+        size: int = len(body) + len(key) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+
+        previous: tuple[int, bytes] | None = self.__entries.pop(key, None)
+        if previous is not None:
+            self.__bytes -= len(previous[1]) + len(key) + ENTRY_OVERHEAD
+
+        self.__entries[key] = (version, body)
+        self.__bytes += size
+
+        while self.__bytes > self.max_bytes:
+            evicted_key, (_, evicted) = self.__entries.popitem(last=False)
+            self.__bytes -= len(evicted) + len(evicted_key) + ENTRY_OVERHEAD
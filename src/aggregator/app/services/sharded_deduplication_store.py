@@ -0,0 +1,233 @@
+from asyncio import gather, to_thread
+from collections.abc import AsyncIterator
+from datetime import datetime
+from glob import escape, glob
+from heapq import merge
+from os import getenv, getpid, replace
+from os.path import exists
+from re import fullmatch
+from typing import cast
+
+from ..models.event_cursor import EventCursorModel
+from ..models.events import EventModel
+from .deduplication_store import DeduplicationStoreService
+from .partition import shard_for
+
+
+class ShardedDeduplicationStoreService:
+    def __init__(self) -> None:
+        self.__db_path: str = getenv(
+            key="DEDUPLICATION_DB_PATH", default=".chronicle.db"
+        )
+        self.__shard_count: int = max(
+            1, int(getenv(key="DEDUPLICATION_SHARDS", default="1"))
+        )
+        self.__marker_path: str = f"{self.__db_path}.shards"
+        self.__shards: list[DeduplicationStoreService] = (
+            [DeduplicationStoreService(self.__db_path)]
+            if self.__shard_count == 1
+            else [
+                DeduplicationStoreService(f"{self.__db_path}.shard-{shard}")
+                for shard in range(self.__shard_count)
+            ]
+        )
+
+    async def initialize(self) -> None:
+        recorded_count: int | None = await to_thread(self.__check_layout)
+
+        _ = await gather(*(shard.initialize() for shard in self.__shards))
+
+        if self.__shard_count > 1 and recorded_count is None:
+            await to_thread(self.__write_marker)
+
+    def __check_layout(self) -> int | None:
+        existing_shards: set[int] = {
+            int(match.group(1))
+            for path in glob(f"{escape(self.__db_path)}.shard-*")
+            if (match := fullmatch(r".*\.shard-(\d+)", path))
+        }
+        recorded_count: int | None = None
+        if exists(path=self.__marker_path):
+            with open(self.__marker_path) as file:
+                recorded_count = int(file.read())
+
+        if (
+            (recorded_count is not None and recorded_count != self.__shard_count)
+            or (self.__shard_count == 1 and existing_shards)
+            or (
+                self.__shard_count > 1
+                and (
+                    exists(path=self.__db_path)
+                    or (
+                        existing_shards
+                        and existing_shards != set(range(self.__shard_count))
+                    )
+                )
+            )
+        ):
+            raise RuntimeError(
+                f"{self.__db_path} was written with a different DEDUPLICATION_SHARDS value"
+            )
+
+        return recorded_count
+
+    def __write_marker(self) -> None:
+        temporary_path: str = f"{self.__marker_path}.{getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            _ = file.write(f"{self.__shard_count}\n")
+
+        replace(temporary_path, self.__marker_path)
+
+    def __shard(self, topic: str) -> DeduplicationStoreService:
+        return self.__shards[shard_for(topic, self.__shard_count)]
+
+    async def check_and_mark(
+        self, events: list[EventModel]
+    ) -> tuple[list[EventModel], list[EventModel]]:
+        if self.__shard_count == 1:
+            return await self.__shards[0].check_and_mark(events)
+
+        events_by_shard: dict[int, list[EventModel]] = {}
+        for event in events:
+            events_by_shard.setdefault(
+                shard_for(event.topic, self.__shard_count), []
+            ).append(event)
+
+        results: list[tuple[list[EventModel], list[EventModel]]] = await gather(
+            *(
+                self.__shards[shard].check_and_mark(shard_events)
+                for shard, shard_events in events_by_shard.items()
+            )
+        )
+
+        return (
+            [event for processed, _ in results for event in processed],
+            [event for _, duplicates in results for event in duplicates],
+        )
+
+    async def flush_stats(self) -> None:
+        _ = await gather(*(shard.flush_stats() for shard in self.__shards))
+
+    def get_wal_checkpoint_interval(self) -> float:
+        return self.__shards[0].get_wal_checkpoint_interval()
+
+    async def checkpoint_wal(self) -> None:
+        _ = await gather(*(shard.checkpoint_wal() for shard in self.__shards))
+
+    def get_stats(self) -> dict[str, object]:
+        shard_stats: list[dict[str, object]] = [
+            shard.get_stats() for shard in self.__shards
+        ]
+
+        return {
+            "received": sum(cast(int, stats["received"]) for stats in shard_stats),
+            "duplicated_dropped": sum(
+                cast(int, stats["duplicated_dropped"]) for stats in shard_stats
+            ),
+            "reaccepted": sum(cast(int, stats["reaccepted"]) for stats in shard_stats),
+            "topics": set[str]().union(
+                *(cast(set[str], stats["topics"]) for stats in shard_stats)
+            ),
+        }
+
+    def get_index_stats(self) -> dict[str, object]:
+        shard_stats: list[dict[str, object]] = [
+            shard.get_index_stats() for shard in self.__shards
+        ]
+
+        index_stats: dict[str, object] = {
+            key: (
+                value
+                if isinstance(value, str)
+                else sum(cast(int, stats[key]) for stats in shard_stats)
+            )
+            for key, value in shard_stats[0].items()
+        }
+
+        return index_stats | {"shards": self.__shard_count}
+
+    def get_event_cache_stats(self) -> dict[str, int]:
+        shard_stats: list[dict[str, int]] = [
+            shard.get_event_cache_stats() for shard in self.__shards
+        ]
+
+        return {key: sum(stats[key] for stats in shard_stats) for key in shard_stats[0]}
+
+    def get_unique_processed(self) -> int:
+        return sum(shard.get_unique_processed() for shard in self.__shards)
+
+    def get_version(self, topic: str | None = None) -> int:
+        if topic is not None:
+            return self.__shard(topic).get_version(topic)
+
+        return sum(shard.get_version() for shard in self.__shards)
+
+    async def get_events_page(
+        self,
+        topic: str | None,
+        cursor: EventCursorModel,
+        limit: int,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> tuple[list[bytes], EventCursorModel | None]:
+        if self.__shard_count == 1:
+            return await self.__shards[0].get_events_page(
+                topic, cursor, limit, since, until
+            )
+
+        shards: list[int] = (
+            [shard_for(topic, self.__shard_count)]
+            if topic is not None
+            else list(range(self.__shard_count))
+        )
+        pages: list[list[tuple[int, int, bytes]]] = await gather(
+            *(
+                self.__shards[shard].get_events_after(
+                    topic,
+                    EventCursorModel(
+                        after=max(0, (cursor.after - shard) // self.__shard_count),
+                        timestamp=cursor.timestamp,
+                    ),
+                    limit + 1,
+                    since,
+                    until,
+                )
+                for shard in shards
+            )
+        )
+        rows: list[tuple[int, int, bytes]] = list(
+            merge(
+                *(
+                    [
+                        (rowid * self.__shard_count + shard, timestamp, event)
+                        for rowid, timestamp, event in page
+                    ]
+                    for shard, page in zip(shards, pages, strict=True)
+                ),
+                key=lambda row: row[0],
+            )
+        )[: limit + 1]
+        next_cursor: EventCursorModel | None = (
+            EventCursorModel(after=rows[limit - 1][0], timestamp=rows[limit - 1][1])
+            if len(rows) > limit
+            else None
+        )
+
+        return [event for *_, event in rows[:limit]], next_cursor
+
+    async def iter_events_ndjson(
+        self,
+        topic: str | None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> AsyncIterator[bytes]:
+        shards: list[DeduplicationStoreService] = (
+            [self.__shard(topic)] if topic is not None else self.__shards
+        )
+
+        for shard in shards:
+            async for chunk in shard.iter_events_ndjson(topic, since, until):
+                yield chunk
+
+    async def close(self) -> None:
+        _ = await gather(*(shard.close() for shard in self.__shards))
@@ -0,0 +1,318 @@
+from asyncio import (
+    CancelledError,
+    Future,
+    Lock,
+    StreamReader,
+    StreamWriter,
+    Task,
+    create_task,
+    gather,
+    get_running_loop,
+    open_unix_connection,
+)
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import TypeAlias, cast
+
+from orjson import Fragment, dumps, loads
+
+from ..models.event_cursor import EventCursorModel
+from ..models.events import EVENTS_ADAPTER, EventModel
+from .event_queue import QueueFullError
+from .ipc import read_frame, write_frame
+from .metrics import MetricsService, MetricsSnapshot, merge_snapshots
+from .partition import partition_for
+
+Connection: TypeAlias = tuple[StreamWriter, dict[int, "Future[dict[str, object]]"]]
+
+
+class WriterClient:
+    def __init__(self, socket_paths: list[str]) -> None:
+        self.__socket_paths: list[str] = socket_paths
+        self.__connections: list[Connection | None] = [None for _ in socket_paths]
+        self.__locks: list[Lock] = [Lock() for _ in socket_paths]
+        self.__readers: set[Task[None]] = set()
+        self.__next_request_id: int = 0
+        self.__next_reader: int = 0
+        self.__metrics: MetricsService = MetricsService()
+
+    async def initialize(self) -> None:
+        for partition in range(len(self.__socket_paths)):
+            _ = await self.__connect(partition)
+
+    async def start(self) -> None:
+        self.__metrics.start()
+
+    async def close(self) -> None:
+        await self.__metrics.stop()
+
+        for partition, connection in enumerate(self.__connections):
+            if connection:
+                self.__connections[partition] = None
+                connection[0].close()
+
+        for task in list(self.__readers):
+            _ = task.cancel()
+
+            try:
+                await task
+            except CancelledError:
+                pass
+
+    async def publish(
+        self, events: list["EventModel"], size: int, durable: bool = False
+    ) -> list[str] | None:
+        partitions: int = len(self.__socket_paths)
+        groups: list[list[int]] = [[] for _ in range(partitions)]
+        for i, event in enumerate(events):
+            groups[partition_for(event.event_id, event.topic, partitions)].append(i)
+
+        requests: list[tuple[int, list[int]]] = [
+            (partition, group) for partition, group in enumerate(groups) if group
+        ]
+        responses: list[dict[str, object] | BaseException] = await gather(
+            *(
+                self.__request(
+                    partition,
+                    {
+                        "op": "publish",
+                        "events": Fragment(
+                            EVENTS_ADAPTER.dump_json([events[i] for i in group])
+                        ),
+                        "size": size * len(group) // len(events),
+                        "durable": durable,
+                    },
+                )
+                for partition, group in requests
+            ),
+            return_exceptions=True,
+        )
+
+        errors: list[BaseException] = [
+            response for response in responses if isinstance(response, BaseException)
+        ]
+        queue_full: list[QueueFullError] = [
+            error for error in errors if isinstance(error, QueueFullError)
+        ]
+        if queue_full:
+            raise QueueFullError(max(error.retry_after for error in queue_full))
+
+        if errors:
+            raise errors[0]
+
+        if not durable:
+            return None
+
+        results: list[str] = ["" for _ in events]
+        for (_, group), response in zip(requests, responses, strict=True):
+            for i, result in zip(
+                group,
+                cast(list[str], cast(dict[str, object], response)["results"]),
+                strict=True,
+            ):
+                results[i] = result
+
+        return results
+
+    async def get_events_page(
+        self,
+        topic: str | None,
+        cursor: EventCursorModel,
+        limit: int,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> tuple[list[bytes], EventCursorModel | None]:
+        response: dict[str, object] = await self.__request(
+            self.__reader(),
+            {
+                "op": "events_page",
+                "topic": topic,
+                "cursor": cursor.model_dump(),
+                "limit": limit,
+                "since": since,
+                "until": until,
+            },
+        )
+
+        return [dumps(event) for event in cast(list[object], response["events"])], (
+            EventCursorModel.model_validate(response["next_cursor"])
+            if response["next_cursor"] is not None
+            else None
+        )
+
+    async def iter_events_ndjson(
+        self,
+        topic: str | None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> AsyncIterator[bytes]:
+        reader, writer = await open_unix_connection(
+            self.__socket_paths[self.__reader()]
+        )
+
+        try:
+            write_frame(
+                writer,
+                dumps(
+                    {
+                        "op": "events_stream",
+                        "topic": topic,
+                        "since": since,
+                        "until": until,
+                    }
+                ),
+            )
+            await writer.drain()
+
+            while True:
+                frame: bytes | None = await read_frame(reader)
+                if frame is None:
+                    raise ConnectionError("Writer closed the event stream")
+
+                if not frame:
+                    return
+
+                yield frame
+        finally:
+            writer.close()
+
+    async def get_stats(self) -> dict[str, object]:
+        writers: list[dict[str, object]] = await gather(
+            *(
+                self.__request(partition, {"op": "stats"})
+                for partition in range(len(self.__socket_paths))
+            )
+        )
+
+        def total(key: str) -> int:
+            return sum(cast(int, stats[key]) for stats in writers)
+
+        queues: list[dict[str, int]] = [
+            cast(dict[str, int], stats["queue"]) for stats in writers
+        ]
+        indexes: list[dict[str, object]] = [
+            cast(dict[str, object], stats["index"]) for stats in writers
+        ]
+
+        return {
+            "received": total("received"),
+            "unique_processed": total("unique_processed"),
+            "duplicated_dropped": total("duplicated_dropped"),
+            "reaccepted": total("reaccepted"),
+            "topics": sorted(
+                set[str]().union(
+                    *(cast(list[str], stats["topics"]) for stats in writers)
+                )
+            ),
+            "uptime": max(cast(int, stats["uptime"]) for stats in writers),
+            "queue": {key: sum(queue[key] for queue in queues) for key in queues[0]},
+            "index": {
+                key: indexes[0][key]
+                if key in ("kind", "shards")
+                else sum(cast(int, index[key]) for index in indexes)
+                for key in indexes[0]
+            },
+        }
+
+    async def get_version(self, topic: str | None = None) -> int:
+        writers: list[dict[str, object]] = await gather(
+            *(
+                self.__request(partition, {"op": "version", "topic": topic})
+                for partition in range(len(self.__socket_paths))
+            )
+        )
+
+        return sum(cast(int, writer["version"]) for writer in writers)
+
+    async def get_metrics(self) -> MetricsSnapshot:
+        writers: list[dict[str, object]] = await gather(
+            *(
+                self.__request(partition, {"op": "metrics"})
+                for partition in range(len(self.__socket_paths))
+            )
+        )
+
+        return merge_snapshots(
+            [
+                self.__metrics.snapshot({}),
+                *(cast(MetricsSnapshot, writer["metrics"]) for writer in writers),
+            ]
+        )
+
+    def __reader(self) -> int:
+        self.__next_reader = (self.__next_reader + 1) % len(self.__socket_paths)
+
+        return self.__next_reader
+
+    async def __connect(self, partition: int) -> Connection:
+        async with self.__locks[partition]:
+            connection: Connection | None = self.__connections[partition]
+            if connection is None:
+                reader, writer = await open_unix_connection(
+                    self.__socket_paths[partition]
+                )
+                connection = (writer, {})
+                self.__connections[partition] = connection
+
+                task: Task[None] = create_task(
+                    self.__read_responses(partition, reader, connection)
+                )
+                self.__readers.add(task)
+                task.add_done_callback(self.__readers.discard)
+
+            return connection
+
+    async def __read_responses(
+        self, partition: int, reader: StreamReader, connection: Connection
+    ) -> None:
+        writer, pending = connection
+
+        try:
+            while (frame := await read_frame(reader)) is not None:
+                response: dict[str, object] = loads(frame)
+                future: Future[dict[str, object]] | None = pending.pop(
+                    cast(int, response.pop("id")), None
+                )
+                if future and not future.done():
+                    future.set_result(response)
+        finally:
+            if self.__connections[partition] is connection:
+                self.__connections[partition] = None
+
+            writer.close()
+
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError(f"Writer {partition} closed the connection")
+                    )
+
+            pending.clear()
+
+    async def __request(
+        self, partition: int, request: dict[str, object]
+    ) -> dict[str, object]:
+        writer, pending = await self.__connect(partition)
+
+        self.__next_request_id += 1
+        request_id: int = self.__next_request_id
+        future: Future[dict[str, object]] = get_running_loop().create_future()
+        pending[request_id] = future
+
+        try:
+            write_frame(writer, dumps({**request, "id": request_id}))
+            await writer.drain()
+            response: dict[str, object] = await future
+        finally:
+            _ = pending.pop(request_id, None)
+
+        if "error" in response:
+            if "retry_after" in response:
+                raise QueueFullError(cast(int, response["retry_after"]))
+
+            if response.get("timeout"):
+                raise TimeoutError(cast(str, response["error"]))
+
+            raise RuntimeError(cast(str, response["error"]))
+
+        return response
@@ -0,0 +1,195 @@
+from asyncio import (
+    Event,
+    StreamReader,
+    StreamWriter,
+    Task,
+    create_task,
+    get_running_loop,
+    run,
+    start_unix_server,
+)
+from datetime import datetime
+from os import environ, getenv, remove
+from os.path import exists, join
+from signal import SIGINT, SIGTERM
+from subprocess import Popen, TimeoutExpired
+from sys import executable
+from time import monotonic, sleep
+from typing import cast
+
+from loguru import logger
+from orjson import Fragment, dumps, loads
+
+from .models.event_cursor import EventCursorModel
+from .models.events import EVENTS_ADAPTER
+from .services.consumer import ConsumerService, configure_log_sink
+from .services.event_queue import QueueFullError
+from .services.ipc import read_frame, write_frame
+
+consumer: ConsumerService = ConsumerService()
+
+
+def parse_datetime(value: object) -> datetime | None:
+    return datetime.fromisoformat(cast(str, value)) if value else None
+
+
+async def handle_request(request: dict[str, object]) -> dict[str, object]:
+    match request["op"]:
+        case "publish":
+            results: list[str] | None = await consumer.publish(
+                EVENTS_ADAPTER.validate_python(request["events"]),
+                cast(int, request["size"]),
+                cast(bool, request["durable"]),
+            )
+
+            return {"status": "success", "results": results}
+        case "stats":
+            return await consumer.get_stats()
+        case "metrics":
+            return {"metrics": await consumer.get_metrics()}
+        case "version":
+            return {
+                "version": await consumer.get_version(
+                    cast(str | None, request["topic"])
+                )
+            }
+        case "events_page":
+            events, next_cursor = await consumer.get_events_page(
+                cast(str | None, request["topic"]),
+                EventCursorModel.model_validate(request["cursor"]),
+                cast(int, request["limit"]),
+                parse_datetime(request["since"]),
+                parse_datetime(request["until"]),
+            )
+
+            return {
+                "events": Fragment(b"[" + b",".join(events) + b"]"),
+                "next_cursor": next_cursor.model_dump()
+                if next_cursor is not None
+                else None,
+            }
+        case op:
+            raise ValueError(f"Unknown writer operation: {op}")
+
+
+async def respond(request: dict[str, object], writer: StreamWriter) -> None:
+    try:
+        response: dict[str, object] = await handle_request(request)
+    except QueueFullError as e:
+        response = {"error": str(e), "retry_after": e.retry_after}
+    except TimeoutError:
+        response = {"error": "Timed out waiting for commit", "timeout": True}
+    except Exception as e:
+        response = {"error": str(e) or type(e).__name__}
+
+    write_frame(writer, dumps({**response, "id": request["id"]}))
+    await writer.drain()
+
+
+async def stream_events(request: dict[str, object], writer: StreamWriter) -> None:
+    async for chunk in consumer.iter_events_ndjson(
+        cast(str | None, request["topic"]),
+        parse_datetime(request["since"]),
+        parse_datetime(request["until"]),
+    ):
+        write_frame(writer, chunk)
+        await writer.drain()
+
+    write_frame(writer, b"")
+    await writer.drain()
+
+
+async def handle_connection(reader: StreamReader, writer: StreamWriter) -> None:
+    responses: set[Task[None]] = set()
+
+    try:
+        while (frame := await read_frame(reader)) is not None:
+            request: dict[str, object] = loads(frame)
+
+            if request["op"] == "events_stream":
+                await stream_events(request, writer)
+                continue
+
+            task: Task[None] = create_task(respond(request, writer))
+            responses.add(task)
+            task.add_done_callback(responses.discard)
+    except Exception as e:
+        logger.error(f"Error handling writer connection: {e}")
+    finally:
+        writer.close()
+
+
+async def serve() -> None:
+    socket_path: str = getenv(key="AGGREGATOR_WRITER_SOCKET", default="")
+
+    configure_log_sink()
+    await consumer.initialize()
+    await consumer.start()
+
+    if exists(path=socket_path):
+        remove(path=socket_path)
+
+    stopping: Event = Event()
+    for signal in (SIGINT, SIGTERM):
+        get_running_loop().add_signal_handler(signal, stopping.set)
+
+    server = await start_unix_server(handle_connection, path=socket_path)
+    logger.info(f"Writer listening on {socket_path}")
+
+    await stopping.wait()
+
+    server.close()
+    server.close_clients()
+    await consumer.close()
+
+    if exists(path=socket_path):
+        remove(path=socket_path)
+
+
+def start_writers(count: int) -> list[Popen[bytes]]:
+    db_path: str = getenv(key="DEDUPLICATION_DB_PATH", default=".chronicle.db")
+    ingest_log_dir: str = getenv(key="INGEST_LOG_DIR", default="")
+    socket_paths: list[str] = [f"{db_path}.{i}.sock" for i in range(count)]
+    writers: list[Popen[bytes]] = []
+
+    for partition, socket_path in enumerate(socket_paths):
+        if exists(path=socket_path):
+            remove(path=socket_path)
+
+        env: dict[str, str] = environ.copy()
+        env["DEDUPLICATION_PARTITION"] = str(partition)
+        env["DEDUPLICATION_PARTITIONS"] = str(count)
+        env["AGGREGATOR_WRITER_SOCKET"] = socket_path
+        if ingest_log_dir:
+            env["INGEST_LOG_DIR"] = join(ingest_log_dir, str(partition))
+        writers.append(Popen[bytes]([executable, "-m", __name__], env=env))
+
+    deadline: float = monotonic() + 300
+    while not all(exists(path=socket_path) for socket_path in socket_paths):
+        if any(writer.poll() is not None for writer in writers) or (
+            monotonic() > deadline
+        ):
+            stop_writers(writers)
+            raise RuntimeError("Writer processes failed to start")
+
+        sleep(0.05)
+
+    environ["AGGREGATOR_WRITER_SOCKETS"] = ",".join(socket_paths)
+
+    return writers
+
+
+def stop_writers(writers: list[Popen[bytes]]) -> None:
+    for writer in writers:
+        if writer.poll() is None:
+            writer.terminate()
+
+    for writer in writers:
+        try:
+            _ = writer.wait(timeout=30)
+        except TimeoutExpired:
+            writer.kill()
+
+
+if __name__ == "__main__":
+    run(serve())
@@ -0,0 +1,66 @@
+from sqlite3 import Connection, connect
+from subprocess import Popen
+from time import sleep
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    generate_test_events,
+    get_request,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def test_stats_checkpoint_recovery() -> None:
+    db_path: str = "test_stats_checkpoint.db"
+    port: str = "8006"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+
+    server01: Popen[bytes] = start_server(
+        db_path, port, extra_env={"STATS_FLUSH_INTERVAL_MS": "100"}
+    )
+
+    url: LiteralString = f"{server_url}/publish"
+
+    events: list[EventData] = generate_test_events(count=100, duplicate_ratio=0.5)
+    data: dict[str, list[EventData]] = {"events": events}
+    status, _ = post_request(url, data)
+    assert status == 200
+
+    sleep(2)
+
+    stop_server(server01)
+
+    connection: Connection = connect(f".{db_path}")
+    stats_row: tuple[int, int] = connection.execute(
+        "SELECT received, duplicated_dropped FROM stats WHERE id=1"
+    ).fetchone()
+    assert stats_row == (100, 50)
+
+    _ = connection.execute(
+        "UPDATE stats SET received = 0, duplicated_dropped = 0, topics = '[]', checkpoint_rowid = 0"
+    )
+    connection.commit()
+    connection.close()
+
+    server02: Popen[bytes] = start_server(db_path, port)
+
+    stats_url: str = f"{server_url}/stats"
+    stats_status, stats_response = get_request(stats_url)
+    assert stats_status == 200
+
+    stats: dict[str, Any] = loads(stats_response or "{}")
+    assert stats["received"] == 50
+    assert stats["unique_processed"] == 50
+    assert stats["duplicated_dropped"] == 0
+    assert stats["topics"] == ["publisher-topic"]
+
+    stop_server(server02)
+    cleanup_db(db_path)
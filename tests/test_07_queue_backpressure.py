@@ -0,0 +1,70 @@
+from subprocess import Popen
+from time import sleep
+from typing import Any, LiteralString
+
+from orjson import dumps, loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    generate_test_events,
+    get_request,
+    http_request,
+    start_server,
+    stop_server,
+)
+
+
+def test_queue_backpressure() -> None:
+    db_path: str = "test_queue_backpressure.db"
+    port: str = "8007"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+
+    server: Popen[bytes] = start_server(
+        db_path,
+        port,
+        extra_env={
+            "CONSUMER_BATCH_SIZE": "1",
+            "EVENT_QUEUE_MAX_EVENTS": "200",
+            "EVENT_QUEUE_PUT_TIMEOUT_MS": "0",
+        },
+    )
+
+    url: str = f"{server_url}/publish"
+    headers: dict[str, str] = {"Content-Type": "application/json"}
+
+    events: list[EventData] = generate_test_events(count=400, duplicate_ratio=0)
+    accepted: int = 0
+    rejected: int = 0
+
+    for i in range(0, len(events), 200):
+        body: bytes = dumps({"events": events[i : i + 200]})
+        status, response_headers, _ = http_request(
+            url, method="POST", data=body, headers=headers
+        )
+
+        if status == 200:
+            accepted += 200
+        else:
+            assert status == 429
+            assert int(response_headers["retry-after"]) >= 1
+            rejected += 200
+
+    assert rejected > 0
+
+    sleep(2)
+
+    stats_url: str = f"{server_url}/stats"
+    stats_status, stats_response = get_request(url=stats_url)
+    assert stats_status == 200
+
+    stats: dict[str, Any] = loads(stats_response or "{}")
+    assert stats["received"] == accepted
+    assert stats["queue"]["depth"] == 0
+    assert stats["queue"]["high_water_mark"] == 200
+    assert stats["queue"]["max_events"] == 200
+
+    stop_server(server)
+    cleanup_db(db_path)
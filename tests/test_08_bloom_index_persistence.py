@@ -0,0 +1,68 @@
+from os.path import exists
+from subprocess import Popen
+from time import sleep
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    generate_test_events,
+    get_request,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def test_bloom_index_persistence() -> None:
+    db_path: str = "test_bloom_index.db"
+    port: str = "8008"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+    extra_env: dict[str, str] = {
+        "DEDUPLICATION_INDEX": "bloom",
+        "DEDUPLICATION_BLOOM_CAPACITY": "1000",
+    }
+
+    server01: Popen[bytes] = start_server(db_path, port, extra_env)
+
+    url: LiteralString = f"{server_url}/publish"
+
+    events: list[EventData] = generate_test_events(count=100, duplicate_ratio=0.5)
+    data: dict[str, list[EventData]] = {"events": events}
+    status, _ = post_request(url, data)
+    assert status == 200
+
+    sleep(2)
+
+    stop_server(server01)
+    assert exists(f".{db_path}.bloom")
+
+    server02: Popen[bytes] = start_server(db_path, port, extra_env)
+
+    status, _ = post_request(url, data)
+    assert status == 200
+
+    sleep(2)
+
+    stats_url: str = f"{server_url}/stats"
+    stats_status, stats_response = get_request(stats_url)
+    assert stats_status == 200
+
+    stats: dict[str, Any] = loads(stats_response or "{}")
+    assert stats["received"] == 200
+    assert stats["unique_processed"] == 50
+    assert stats["duplicated_dropped"] == 150
+
+    index: dict[str, Any] = stats["index"]
+    assert index["kind"] == "bloom"
+    assert index["keys"] == 50
+    assert index["hits"] == 50
+    assert index["misses"] == 0
+    assert index["db_fallbacks"] == 50
+
+    stop_server(server02)
+    cleanup_db(db_path)
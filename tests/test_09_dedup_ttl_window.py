@@ -0,0 +1,94 @@
+from subprocess import Popen
+from time import sleep
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    get_request,
+    make_events,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def test_dedup_ttl_window() -> None:
+    db_path: str = "test_dedup_ttl_window.db"
+    port: str = "8009"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+
+    server: Popen[bytes] = start_server(
+        db_path,
+        port,
+        extra_env={
+            "DEDUPLICATION_INDEX": "windowed",
+            "DEDUPLICATION_TTL_SECONDS": "2",
+            "DEDUPLICATION_TTL_TOPICS": "pinned-topic=0",
+        },
+    )
+
+    url: str = f"{server_url}/publish"
+    data: dict[str, list[EventData]] = {
+        "events": make_events("retry-topic", 10) + make_events("pinned-topic", 10)
+    }
+
+    status, _ = post_request(url, data)
+    assert status == 200
+
+    sleep(0.5)
+
+    status, _ = post_request(url, data)
+    assert status == 200
+
+    events_url: str = f"{server_url}/events?topic=retry-topic"
+    events_status, events_response = get_request(url=events_url)
+    assert events_status == 200
+    assert loads(events_response or "{}")["count"] == 10
+
+    sleep(3)
+
+    status, _ = post_request(url, data)
+    assert status == 200
+
+    sleep(1)
+
+    stats_url: str = f"{server_url}/stats"
+    stats_status, stats_response = get_request(url=stats_url)
+    assert stats_status == 200
+
+    stats: dict[str, Any] = loads(stats_response or "{}")
+    assert stats["received"] == 60
+    assert stats["unique_processed"] == 20
+    assert stats["duplicated_dropped"] == 30
+    assert stats["reaccepted"] == 10
+    assert stats["received"] == (
+        stats["unique_processed"] + stats["duplicated_dropped"] + stats["reaccepted"]
+    )
+
+    index: dict[str, Any] = stats["index"]
+    assert index["kind"] == "windowed"
+    assert index["evicted"] == 10
+
+    events_status, events_response = get_request(url=events_url)
+    assert events_status == 200
+    assert loads(events_response or "{}")["count"] == 10
+
+    stop_server(server)
+
+    server = start_server(db_path, port, extra_env={"DEDUPLICATION_INDEX": "windowed"})
+
+    stats_status, stats_response = get_request(url=stats_url)
+    assert stats_status == 200
+
+    restarted: dict[str, Any] = loads(stats_response or "{}")
+    assert restarted["received"] == 60
+    assert restarted["unique_processed"] == 20
+    assert restarted["reaccepted"] == 10
+
+    stop_server(server)
+    cleanup_db(db_path)
@@ -0,0 +1,86 @@
+from subprocess import Popen
+from time import sleep
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    get_all_events,
+    get_request,
+    http_request,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def test_events_pagination() -> None:
+    db_path: str = "test_events_pagination.db"
+    port: str = "8010"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+
+    server: Popen[bytes] = start_server(db_path, port)
+
+    url: str = f"{server_url}/publish"
+
+    events: list[EventData] = [
+        {
+            "event_id": f"paged-event-{i}",
+            "topic": "paged-topic" if i % 5 else "other-topic",
+            "source": "test-source",
+            "payload": {
+                "message": f"Paged message {i}",
+                "timestamp": f"2025-01-01T00:{i:02d}:00",
+            },
+            "timestamp": f"2025-01-01T00:{i:02d}:00+00:00",
+        }
+        for i in range(25)
+    ]
+    status, _ = post_request(url, {"events": events})
+    assert status == 200
+
+    sleep(2)
+
+    events_url: str = f"{server_url}/events"
+    page_status, page_response = get_request(url=f"{events_url}?limit=10")
+    assert page_status == 200
+
+    page: dict[str, Any] = loads(page_response or "{}")
+    assert page["count"] == 10
+    assert page["next_cursor"] is not None
+
+    all_events: list[dict[str, Any]] | None = get_all_events(
+        url=f"{events_url}?limit=10"
+    )
+    assert all_events is not None
+    assert [event["event_id"] for event in all_events] == [
+        f"paged-event-{i}" for i in range(25)
+    ]
+
+    topic_events: list[dict[str, Any]] | None = get_all_events(
+        url=f"{events_url}?topic=paged-topic&limit=7"
+    )
+    assert topic_events is not None
+    assert len(topic_events) == 20
+    assert all(event["topic"] == "paged-topic" for event in topic_events)
+
+    window_status, window_response = get_request(
+        url=f"{events_url}?since=2025-01-01T00:10:00Z&until=2025-01-01T00:15:00Z"
+    )
+    assert window_status == 200
+
+    window: dict[str, Any] = loads(window_response or "{}")
+    assert [event["event_id"] for event in window["events"]] == [
+        f"paged-event-{i}" for i in range(10, 15)
+    ]
+    assert window["next_cursor"] is None
+
+    invalid_status, _, _ = http_request(url=f"{events_url}?cursor=not-a-cursor")
+    assert invalid_status == 400
+
+    stop_server(server)
+    cleanup_db(db_path)
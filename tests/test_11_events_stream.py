@@ -0,0 +1,65 @@
+from gzip import decompress
+from subprocess import Popen
+from time import sleep
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    generate_test_events,
+    http_request,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def test_events_stream() -> None:
+    db_path: str = "test_events_stream.db"
+    port: str = "8011"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+
+    server: Popen[bytes] = start_server(db_path, port)
+
+    url: str = f"{server_url}/publish"
+
+    events: list[EventData] = generate_test_events(count=100, duplicate_ratio=0.3)
+    status, _ = post_request(url, {"events": events})
+    assert status == 200
+
+    sleep(2)
+
+    stream_url: str = f"{server_url}/events/stream?topic=publisher-topic"
+    stream_status, headers, body = http_request(url=stream_url)
+    assert stream_status == 200
+    assert headers["content-type"] == "application/x-ndjson"
+
+    lines: list[bytes] = (body or b"").splitlines()
+    assert len(lines) == 70
+
+    streamed: list[dict[str, Any]] = [loads(line) for line in lines]
+    assert [event["event_id"] for event in streamed] == [
+        f"event-{i}" for i in range(70)
+    ]
+    assert all(event["topic"] == "publisher-topic" for event in streamed)
+    assert all("message" in event["payload"] for event in streamed)
+
+    gzip_status, gzip_headers, gzip_body = http_request(
+        url=stream_url, headers={"Accept-Encoding": "gzip"}
+    )
+    assert gzip_status == 200
+    assert gzip_headers["content-encoding"] == "gzip"
+    assert decompress(gzip_body or b"").splitlines() == lines
+
+    empty_status, _, empty_body = http_request(
+        url=f"{server_url}/events/stream?topic=missing-topic"
+    )
+    assert empty_status == 200
+    assert empty_body == b""
+
+    stop_server(server)
+    cleanup_db(db_path)
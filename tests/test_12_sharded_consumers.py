@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import Popen
+from time import sleep
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    get_all_events,
+    get_request,
+    make_events,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def test_sharded_consumers() -> None:
+    db_path: str = "test_sharded_consumers.db"
+    port: str = "8012"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+
+    server: Popen[bytes] = start_server(
+        db_path,
+        port,
+        extra_env={"CONSUMER_WORKERS": "4", "CONSUMER_BATCH_SIZE": "50"},
+    )
+
+    events: list[EventData] = [
+        event for i in range(5) for event in make_events(f"topic-{i}", 200)
+    ]
+    url: str = f"{server_url}/publish"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        statuses: list[int | None] = [
+            status
+            for status, _ in executor.map(
+                lambda offset: post_request(
+                    url, {"events": events[offset:] + events[:offset]}
+                ),
+                [0, 250, 500, 750],
+            )
+        ]
+
+    assert statuses == [200, 200, 200, 200]
+
+    sleep(2)
+
+    stats_status, stats_response = get_request(url=f"{server_url}/stats")
+    assert stats_status == 200
+
+    stats: dict[str, Any] = loads(stats_response or "{}")
+    assert stats["received"] == 4000
+    assert stats["unique_processed"] == 1000
+    assert stats["duplicated_dropped"] == 3000
+    assert sorted(stats["topics"]) == [f"topic-{i}" for i in range(5)]
+    assert stats["queue"]["partitions"] == 4
+    assert stats["queue"]["depth"] == 0
+
+    stored: list[dict[str, Any]] | None = get_all_events(f"{server_url}/events")
+    assert stored is not None
+    assert len(stored) == 1000
+    assert len({(event["event_id"], event["topic"]) for event in stored}) == 1000
+
+    stop_server(server)
+    cleanup_db(db_path)
@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import Popen
+from time import sleep
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    get_all_events,
+    get_request,
+    http_request,
+    make_events,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def start_multiprocess_server(db_path: str, port: str) -> Popen[bytes]:
+    server: Popen[bytes] = start_server(
+        db_path,
+        port,
+        extra_env={"AGGREGATOR_HTTP_WORKERS": "2", "AGGREGATOR_WRITERS": "2"},
+    )
+
+    for _ in range(50):
+        status, _ = get_request(url=f"http://127.0.0.1:{port}/health")
+        if status == 200:
+            break
+
+        sleep(0.2)
+
+    return server
+
+
+def publish_concurrently(url: str, events: list[EventData]) -> list[int | None]:
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        return [
+            status
+            for status, _ in executor.map(
+                lambda offset: post_request(
+                    url, {"events": events[offset:] + events[:offset]}
+                ),
+                [0, 150, 300, 450],
+            )
+        ]
+
+
+def get_stats(server_url: str) -> dict[str, Any]:
+    status, response = get_request(url=f"{server_url}/stats")
+    assert status == 200
+
+    return loads(response or "{}")
+
+
+def test_multiprocess_mode() -> None:
+    db_path: str = "test_multiprocess_mode.db"
+    port: str = "8013"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+    events: list[EventData] = [
+        event for i in range(3) for event in make_events(f"topic-{i}", 200)
+    ]
+
+    server: Popen[bytes] = start_multiprocess_server(db_path, port)
+
+    assert publish_concurrently(f"{server_url}/publish", events) == [200] * 4
+
+    sleep(2)
+
+    stats: dict[str, Any] = get_stats(server_url)
+    assert stats["received"] == 2400
+    assert stats["unique_processed"] == 600
+    assert stats["duplicated_dropped"] == 1800
+    assert sorted(stats["topics"]) == ["topic-0", "topic-1", "topic-2"]
+    assert stats["index"]["keys"] == 600
+
+    stored: list[dict[str, Any]] | None = get_all_events(
+        f"{server_url}/events?limit=250"
+    )
+    assert stored is not None
+    assert len({(event["event_id"], event["topic"]) for event in stored}) == 600
+
+    status, _, body = http_request(url=f"{server_url}/events/stream?topic=topic-1")
+    assert status == 200
+    assert body is not None
+    assert len(body.splitlines()) == 200
+
+    stop_server(server)
+
+    server = start_multiprocess_server(db_path, port)
+
+    assert publish_concurrently(f"{server_url}/publish", events) == [200] * 4
+
+    sleep(2)
+
+    stats = get_stats(server_url)
+    assert stats["received"] == 4800
+    assert stats["unique_processed"] == 600
+    assert stats["duplicated_dropped"] == 4200
+    assert stats["index"]["keys"] == 600
+    assert stats["index"]["hits"] > 0
+    assert stats["index"]["db_fallbacks"] == 0
+
+    stop_server(server)
+    cleanup_db(db_path)
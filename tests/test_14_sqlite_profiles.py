@@ -0,0 +1,56 @@
+from sqlite3 import Connection, connect
+from subprocess import Popen
+from time import sleep
+from typing import LiteralString
+
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    generate_test_events,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def read_journal_mode(db_path: str) -> tuple[str, int]:
+    connection: Connection = connect(f".{db_path}")
+
+    try:
+        journal_mode: str = connection.execute("PRAGMA journal_mode").fetchone()[0]
+        count: int = connection.execute(
+            "SELECT COUNT(*) FROM processed_events"
+        ).fetchone()[0]
+    finally:
+        connection.close()
+
+    return journal_mode, count
+
+
+def test_sqlite_profiles() -> None:
+    db_path: str = "test_sqlite_profiles.db"
+    port: str = "8014"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+    events: list[EventData] = generate_test_events(100, 0.2)
+
+    for profile, expected_mode, expected_count in (
+        ("balanced", "wal", 80),
+        ("legacy", "delete", 80),
+    ):
+        server: Popen[bytes] = start_server(
+            db_path, port, extra_env={"DEDUPLICATION_DB_PROFILE": profile}
+        )
+
+        status, _ = post_request(f"{server_url}/publish", {"events": events})
+        assert status == 200
+
+        sleep(1.5)
+
+        stop_server(server)
+
+        assert read_journal_mode(db_path) == (expected_mode, expected_count)
+
+    cleanup_db(db_path)
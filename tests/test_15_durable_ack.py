@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import Popen
+from time import sleep
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    get_request,
+    make_events,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def publish_durable(url: str, events: list[EventData]) -> dict[str, Any]:
+    status, response = post_request(url, {"events": events})
+    assert status == 200
+
+    return loads(response or "{}")
+
+
+def test_durable_ack() -> None:
+    db_path: str = "test_durable_ack.db"
+    port: str = "8015"
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+    url: str = f"{server_url}/publish?ack=durable"
+
+    for extra_env in (
+        {},
+        {"AGGREGATOR_HTTP_WORKERS": "2", "AGGREGATOR_WRITERS": "2"},
+    ):
+        cleanup_db(db_path)
+
+        server: Popen[bytes] = start_server(db_path, port, extra_env=extra_env)
+        for _ in range(50):
+            status, _ = get_request(url=f"{server_url}/health")
+            if status == 200:
+                break
+
+            sleep(0.2)
+
+        events: list[EventData] = make_events("durable-topic", 8)
+        response: dict[str, Any] = publish_durable(url, events + events[:2])
+        assert response["accepted"] == 8
+        assert response["duplicates"] == 2
+        assert response["results"] == ["accepted"] * 8 + ["duplicate"] * 2
+
+        events_status, events_response = get_request(
+            url=f"{server_url}/events?topic=durable-topic"
+        )
+        assert events_status == 200
+        assert loads(events_response or "{}")["count"] == 8
+
+        response = publish_durable(url, events)
+        assert response["results"] == ["duplicate"] * 8
+
+        response = publish_durable(url, [])
+        assert response["events_count"] == 0
+        assert response["results"] == []
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses: list[dict[str, Any]] = list(
+                executor.map(
+                    lambda i: publish_durable(url, make_events(f"topic-{i}", 50)),
+                    range(8),
+                )
+            )
+
+        assert [response["accepted"] for response in responses] == [50] * 8
+
+        stats_status, stats_response = get_request(url=f"{server_url}/stats")
+        assert stats_status == 200
+
+        stats: dict[str, Any] = loads(stats_response or "{}")
+        assert stats["received"] == 418
+        assert stats["unique_processed"] == 408
+        assert stats["duplicated_dropped"] == 10
+
+        status, _ = post_request(f"{server_url}/publish?ack=invalid", {"events": []})
+        assert status == 422
+
+        stop_server(server)
+
+    cleanup_db(db_path)
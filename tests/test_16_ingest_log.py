@@ -0,0 +1,92 @@
+from glob import glob
+from os.path import join
+from shutil import rmtree
+from subprocess import Popen
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    cleanup_db,
+    get_request,
+    make_events,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def test_ingest_log_replay() -> None:
+    db_path: str = "test_ingest_log.db"
+    port: str = "8016"
+    ingest_log_dir: str = ".test_ingest_log"
+
+    cleanup_db(db_path)
+    rmtree(ingest_log_dir, ignore_errors=True)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+    ingest_env: dict[str, str] = {
+        "INGEST_LOG_DIR": ingest_log_dir,
+        "INGEST_LOG_SEGMENT_BYTES": "4096",
+    }
+
+    server01: Popen[bytes] = start_server(
+        db_path,
+        port,
+        extra_env=ingest_env
+        | {
+            "CONSUMER_BATCH_SIZE": "100000",
+            "CONSUMER_BATCH_TIMEOUT_MS": "60000",
+            "CONSUMER_DRAIN_TIMEOUT_MS": "0",
+        },
+    )
+
+    for batch in range(20):
+        status, _ = post_request(
+            f"{server_url}/publish",
+            {"events": make_events("ingest-topic", 10, batch * 10)},
+        )
+        assert status == 200
+
+    stats_status, stats_response = get_request(f"{server_url}/stats")
+    assert stats_status == 200
+    assert loads(stats_response or "{}")["unique_processed"] == 0
+
+    stop_server(server01)
+    assert len(glob(join(ingest_log_dir, "*.log"))) > 1
+
+    server02: Popen[bytes] = start_server(db_path, port, extra_env=ingest_env)
+
+    stats_status, stats_response = get_request(f"{server_url}/stats")
+    assert stats_status == 200
+
+    stats: dict[str, Any] = loads(stats_response or "{}")
+    assert stats["received"] == 200
+    assert stats["unique_processed"] == 200
+
+    events_status, events_response = get_request(
+        f"{server_url}/events?topic=ingest-topic&limit=1000"
+    )
+    assert events_status == 200
+    assert loads(events_response or "{}")["count"] == 200
+    assert len(glob(join(ingest_log_dir, "*.log"))) == 1
+
+    status, _ = post_request(
+        f"{server_url}/publish", {"events": make_events("ingest-topic", 10)}
+    )
+    assert status == 200
+
+    stop_server(server02)
+
+    server03: Popen[bytes] = start_server(db_path, port, extra_env=ingest_env)
+
+    stats_status, stats_response = get_request(f"{server_url}/stats")
+    assert stats_status == 200
+
+    stats = loads(stats_response or "{}")
+    assert stats["received"] == 210
+    assert stats["duplicated_dropped"] == 10
+
+    stop_server(server03)
+
+    cleanup_db(db_path)
+    rmtree(ingest_log_dir, ignore_errors=True)
@@ -0,0 +1,188 @@
+from datetime import UTC, datetime
+from sqlite3 import Connection, connect
+from subprocess import Popen
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    cleanup_db,
+    get_all_events,
+    get_request,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def create_legacy_db(db_path: str, count: int) -> None:
+    connection: Connection = connect(db_path)
+    _ = connection.execute("""
+        CREATE TABLE processed_events (
+            event_id TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            source TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            processed_at INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (event_id, topic)
+        )
+    """)
+    _ = connection.executemany(
+        "INSERT INTO processed_events (event_id, topic, source, payload, timestamp) VALUES (?, ?, ?, ?, ?)",
+        [
+            (
+                f"legacy-event-{i}",
+                "legacy-topic" if i % 2 == 0 else "other-topic",
+                "test-source",
+                '{"message": "legacy", "timestamp": "2025-01-01T00:00:00"}',
+                f"2025-01-01T{i // 60:02d}:{i % 60:02d}:00",
+            )
+            for i in range(count)
+        ],
+    )
+    connection.commit()
+    connection.close()
+
+
+def interrupt_timestamp_migration(db_path: str) -> None:
+    connection: Connection = connect(db_path)
+    _ = connection.execute(
+        "ALTER TABLE processed_events ADD COLUMN timestamp_us INTEGER"
+    )
+    _ = connection.executemany(
+        "UPDATE processed_events SET timestamp_us = ? WHERE rowid = ?",
+        [
+            (
+                int(datetime.fromisoformat(timestamp).replace(tzinfo=UTC).timestamp())
+                * 1000000,
+                rowid,
+            )
+            for rowid, timestamp in connection.execute(
+                "SELECT rowid, timestamp FROM processed_events"
+            ).fetchall()
+        ],
+    )
+    _ = connection.execute("ALTER TABLE processed_events DROP COLUMN timestamp")
+    connection.commit()
+    connection.close()
+
+
+def test_timestamp_index() -> None:
+    db_path: str = "test_timestamp_index.db"
+    port: str = "8017"
+
+    cleanup_db(db_path)
+    create_legacy_db(f".{db_path}", 240)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+    server: Popen[bytes] = start_server(db_path, port)
+
+    status, response = get_request(
+        f"{server_url}/events?topic=legacy-topic&from=2025-01-01T01:00:00Z&to=2025-01-01T02:00:00Z"
+    )
+    assert status == 200
+
+    page: dict[str, Any] = loads(response or "{}")
+    assert [event["event_id"] for event in page["events"]] == [
+        f"legacy-event-{i}" for i in range(60, 120, 2)
+    ]
+    assert page["events"][0]["timestamp"] == "2025-01-01T01:00:00Z"
+
+    status, _ = post_request(
+        f"{server_url}/publish?ack=durable",
+        {
+            "events": [
+                {
+                    "event_id": "offset-event",
+                    "topic": "legacy-topic",
+                    "source": "test-source",
+                    "payload": {
+                        "message": "offset",
+                        "timestamp": "2025-01-01T00:00:00",
+                    },
+                    "timestamp": "2025-01-01T08:30:00.000123+07:00",
+                }
+            ]
+        },
+    )
+    assert status == 200
+
+    status, response = get_request(
+        f"{server_url}/events?topic=legacy-topic&from=2025-01-01T01:30:00Z&to=2025-01-01T01:31:00Z"
+    )
+    assert status == 200
+    assert [event["event_id"] for event in loads(response or "{}")["events"]] == [
+        "legacy-event-90",
+        "offset-event",
+    ]
+
+    range_events: list[dict[str, Any]] | None = get_all_events(
+        f"{server_url}/events?topic=legacy-topic&from=2025-01-01T01:00:00Z&to=2025-01-01T02:00:00Z&limit=4"
+    )
+    assert range_events is not None
+    assert [event["event_id"] for event in range_events] == [
+        *(f"legacy-event-{i}" for i in range(60, 92, 2)),
+        "offset-event",
+        *(f"legacy-event-{i}" for i in range(92, 120, 2)),
+    ]
+
+    status, response = get_request(
+        f"{server_url}/events?topic=legacy-topic&from=2025-01-01T01:30:00.000123Z&to=2025-01-01T01:30:00.000124Z"
+    )
+    assert status == 200
+    assert [event["event_id"] for event in loads(response or "{}")["events"]] == [
+        "offset-event"
+    ]
+
+    status, response = get_request(
+        f"{server_url}/events/stream?from=2025-01-01T03:58:00Z"
+    )
+    assert status == 200
+    assert [loads(line)["event_id"] for line in (response or "").splitlines()] == [
+        "legacy-event-238",
+        "legacy-event-239",
+    ]
+
+    stop_server(server)
+
+    connection: Connection = connect(f".{db_path}")
+    columns: dict[str, str] = {
+        row[1]: row[2]
+        for row in connection.execute("PRAGMA table_info(processed_events)")
+    }
+    assert columns["timestamp"] == "INTEGER"
+    assert "timestamp_us" not in columns
+
+    plan: list[tuple[Any, ...]] = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT rowid FROM processed_events INDEXED BY processed_events_topic_timestamp WHERE topic = ? AND timestamp >= ?",
+        ("legacy-topic", 0),
+    ).fetchall()
+    assert "processed_events_topic_timestamp" in str(plan)
+    connection.close()
+
+    cleanup_db(db_path)
+    create_legacy_db(f".{db_path}", 240)
+    interrupt_timestamp_migration(f".{db_path}")
+
+    server = start_server(db_path, port)
+
+    status, response = get_request(
+        f"{server_url}/events?topic=legacy-topic&from=2025-01-01T01:00:00Z&to=2025-01-01T02:00:00Z"
+    )
+    assert status == 200
+    assert [event["event_id"] for event in loads(response or "{}")["events"]] == [
+        f"legacy-event-{i}" for i in range(60, 120, 2)
+    ]
+
+    stop_server(server)
+
+    connection = connect(f".{db_path}")
+    columns = {
+        row[1]: row[2]
+        for row in connection.execute("PRAGMA table_info(processed_events)")
+    }
+    assert columns["timestamp"] == "INTEGER"
+    assert "timestamp_us" not in columns
+    connection.close()
+
+    cleanup_db(db_path)
@@ -0,0 +1,109 @@
+from glob import glob
+from subprocess import Popen
+from time import sleep
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    get_all_events,
+    get_request,
+    make_events,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def test_sharded_storage() -> None:
+    db_path: str = "test_sharded_storage.db"
+    port: str = "8018"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+    shard_env: dict[str, str] = {"DEDUPLICATION_SHARDS": "4"}
+
+    server01: Popen[bytes] = start_server(db_path, port, extra_env=shard_env)
+
+    events: list[EventData] = [
+        event for i in range(8) for event in make_events(f"sharded-topic-{i}", 25)
+    ]
+    status, _ = post_request(
+        f"{server_url}/publish?ack=durable", {"events": events + events[:50]}
+    )
+    assert status == 200
+
+    assert len(glob(f".{db_path}.shard-[0-9]")) == 4
+
+    stats_status, stats_response = get_request(f"{server_url}/stats")
+    assert stats_status == 200
+
+    stats: dict[str, Any] = loads(stats_response or "{}")
+    assert stats["received"] == 250
+    assert stats["unique_processed"] == 200
+    assert stats["duplicated_dropped"] == 50
+    assert len(stats["topics"]) == 8
+    assert stats["index"]["shards"] == 4
+
+    all_events: list[dict[str, Any]] | None = get_all_events(
+        url=f"{server_url}/events?limit=7"
+    )
+    assert all_events is not None
+    assert sorted(event["event_id"] for event in all_events) == sorted(
+        str(event["event_id"]) for event in events
+    )
+
+    topic_events: list[dict[str, Any]] | None = get_all_events(
+        url=f"{server_url}/events?topic=sharded-topic-3&limit=4"
+    )
+    assert topic_events is not None
+    assert [event["event_id"] for event in topic_events] == [
+        f"sharded-topic-3-event-{i}" for i in range(25)
+    ]
+
+    stop_server(server01)
+
+    server02: Popen[bytes] = start_server(db_path, port, extra_env=shard_env)
+
+    status, _ = post_request(f"{server_url}/publish", {"events": events[:20]})
+    assert status == 200
+
+    sleep(1)
+
+    stats_status, stats_response = get_request(f"{server_url}/stats")
+    assert stats_status == 200
+
+    stats = loads(stats_response or "{}")
+    assert stats["unique_processed"] == 200
+    assert stats["duplicated_dropped"] == 70
+
+    stop_server(server02)
+
+    server03: Popen[bytes] = start_server(
+        db_path, port, extra_env={"DEDUPLICATION_SHARDS": "2"}
+    )
+    stats_status, _ = get_request(f"{server_url}/stats")
+    assert stats_status is None
+
+    stop_server(server03)
+
+    cleanup_db(db_path)
+
+    server04: Popen[bytes] = start_server(
+        db_path, port, extra_env={"DEDUPLICATION_SHARDS": "2"}
+    )
+    status, _ = post_request(
+        f"{server_url}/publish?ack=durable", {"events": events[:20]}
+    )
+    assert status == 200
+
+    stop_server(server04)
+
+    server05: Popen[bytes] = start_server(db_path, port, extra_env=shard_env)
+    stats_status, _ = get_request(f"{server_url}/stats")
+    assert stats_status is None
+
+    stop_server(server05)
+    cleanup_db(db_path)
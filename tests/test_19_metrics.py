@@ -0,0 +1,82 @@
+from subprocess import Popen
+from time import sleep
+from typing import LiteralString
+
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    get_request,
+    make_events,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def parse_metrics(text: str) -> dict[str, float]:
+    return {
+        name: float(value)
+        for name, _, value in (
+            line.rpartition(" ")
+            for line in text.splitlines()
+            if line and not line.startswith("#")
+        )
+    }
+
+
+def test_metrics() -> None:
+    db_path: str = "test_metrics.db"
+    port: str = "8019"
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+
+    for extra_env in (
+        {},
+        {"AGGREGATOR_HTTP_WORKERS": "2", "AGGREGATOR_WRITERS": "2"},
+    ):
+        cleanup_db(db_path)
+
+        server: Popen[bytes] = start_server(db_path, port, extra_env=extra_env)
+        for _ in range(50):
+            status, _ = get_request(url=f"{server_url}/health")
+            if status == 200:
+                break
+
+            sleep(0.2)
+
+        events: list[EventData] = make_events("metrics-a", 30) + make_events(
+            "metrics-b", 10
+        )
+        status, _ = post_request(
+            f"{server_url}/publish?ack=durable", {"events": events + events[:5]}
+        )
+        assert status == 200
+
+        status, response = get_request(f"{server_url}/metrics")
+        assert status == 200
+        assert response is not None
+        assert "# TYPE chronicle_sqlite_commit_seconds histogram" in response
+        assert "# TYPE chronicle_queue_depth gauge" in response
+
+        metrics: dict[str, float] = parse_metrics(response)
+        assert metrics["chronicle_queue_depth"] == 0
+        assert metrics["chronicle_events_received_total"] == 45
+        assert metrics["chronicle_events_unique_total"] == 40
+        assert metrics['chronicle_events_processed_total{topic="metrics-a"}'] == 30
+        assert metrics['chronicle_events_processed_total{topic="metrics-b"}'] == 10
+        assert metrics['chronicle_events_duplicated_total{topic="metrics-a"}'] == 5
+        assert metrics["chronicle_enqueue_commit_lag_seconds_count"] == 45
+        assert metrics["chronicle_sqlite_commit_seconds_count"] >= 1
+        assert metrics["chronicle_dedup_lookup_seconds_count"] >= 1
+        assert metrics["chronicle_batch_events_count"] >= 1
+        if not extra_env:
+            assert metrics["chronicle_publish_events_count"] == 1
+        assert metrics["chronicle_event_loop_lag_seconds_count"] >= 1
+        assert (
+            metrics['chronicle_sqlite_commit_seconds_bucket{le="+Inf"}']
+            == metrics["chronicle_sqlite_commit_seconds_count"]
+        )
+
+        stop_server(server)
+
+    cleanup_db(db_path)
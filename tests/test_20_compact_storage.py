@@ -0,0 +1,142 @@
+from sqlite3 import Connection, connect
+from subprocess import Popen
+from time import sleep
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    get_all_events,
+    get_request,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def generate_events(start: int, count: int) -> list[EventData]:
+    return [
+        {
+            "event_id": f"compact-event-{i}",
+            "topic": f"compact-topic-{i % 3}",
+            "source": f"compact-source-{i % 2}",
+            "payload": {
+                "message": f"User {i % 7} updated resource /api/v1/items/{i} with status ok",
+                "timestamp": "2025-01-01T08:00:00.000123+07:00"
+                if i % 2
+                else "2025-01-01T00:00:00",
+            },
+            "timestamp": f"2025-01-01T00:00:{i % 60:02d}Z",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def is_compact(db_path: str) -> bool:
+    connection: Connection = connect(db_path)
+    columns: dict[str, str] = {
+        row[1]: row[2]
+        for row in connection.execute("PRAGMA table_info(processed_events)")
+    }
+    connection.close()
+
+    return columns["topic"] == "INTEGER"
+
+
+def test_compact_storage() -> None:
+    db_path: str = "test_compact_storage.db"
+    port: str = "8020"
+    compact_env: dict[str, str] = {
+        "DEDUPLICATION_STORAGE_FORMAT": "compact",
+        "DEDUPLICATION_PAYLOAD_COMPRESSION": "dictionary",
+    }
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+    server: Popen[bytes] = start_server(db_path, port)
+
+    for start in range(0, 1500, 500):
+        status, _ = post_request(
+            f"{server_url}/publish?ack=durable",
+            {"events": generate_events(start, 500)},
+        )
+        assert status == 200
+
+    events: list[dict[str, Any]] | None = get_all_events(
+        f"{server_url}/events?limit=1000"
+    )
+    assert events is not None and len(events) == 1500
+
+    status, response = get_request(f"{server_url}/events/stream?topic=compact-topic-1")
+    assert status == 200
+    stream: str = response or ""
+
+    stop_server(server)
+    assert not is_compact(f".{db_path}")
+
+    server = start_server(db_path, port, compact_env)
+
+    status, _ = post_request(
+        f"{server_url}/publish?ack=durable",
+        {"events": generate_events(1495, 10)},
+    )
+    assert status == 200
+
+    for _ in range(100):
+        if is_compact(f".{db_path}"):
+            break
+
+        sleep(0.1)
+
+    assert is_compact(f".{db_path}")
+
+    migrated: list[dict[str, Any]] | None = get_all_events(
+        f"{server_url}/events?limit=1000"
+    )
+    assert migrated is not None
+    assert migrated[:1500] == events
+    assert [event["event_id"] for event in migrated[1500:]] == [
+        f"compact-event-{i}" for i in range(1500, 1505)
+    ]
+
+    status, response = get_request(f"{server_url}/events/stream?topic=compact-topic-1")
+    assert status == 200
+    assert (response or "").startswith(stream)
+
+    stop_server(server)
+
+    server = start_server(db_path, port, compact_env)
+
+    status, response = post_request(
+        f"{server_url}/publish?ack=durable",
+        {"events": generate_events(1500, 10)},
+    )
+    assert status == 200
+
+    status, response = get_request(f"{server_url}/stats")
+    assert status == 200
+
+    stats: dict[str, Any] = loads(response or "{}")
+    assert stats["unique_processed"] == 1510
+    assert stats["duplicated_dropped"] == 10
+
+    stop_server(server)
+
+    connection: Connection = connect(f".{db_path}")
+    assert connection.execute("SELECT COUNT(*) FROM topics").fetchone()[0] == 3
+    assert connection.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 2
+    assert (
+        connection.execute("SELECT COUNT(*) FROM payload_dictionaries").fetchone()[0]
+        == 1
+    )
+    assert (
+        connection.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'processed_events_compact'"
+        ).fetchone()[0]
+        == 0
+    )
+    connection.close()
+
+    cleanup_db(db_path)
@@ -0,0 +1,110 @@
+from subprocess import Popen
+from typing import Any, LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    get_request,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def generate_events(count: int) -> list[EventData]:
+    return [
+        {
+            "event_id": f"cached-event-{i}",
+            "topic": f"cached-topic-{i % 3}",
+            "source": "cached-source-é",
+            "payload": {
+                "message": f'Cached "message" {i}\n✓',
+                "timestamp": (
+                    "2025-01-01T08:00:00.000123+07:00",
+                    "2025-01-01T00:00:00",
+                    "2025-01-01T00:00:00.5Z",
+                )[i % 3],
+            },
+            "timestamp": (
+                "2025-01-01T08:00:00+07:00",
+                "2025-01-01T00:00:00.123456",
+                f"2025-01-01T00:00:{i % 60:02d}Z",
+            )[i % 3],
+        }
+        for i in range(count)
+    ]
+
+
+def get_pages(server_url: str) -> list[str]:
+    pages: list[str] = []
+
+    for query in ("limit=7", "limit=100", "topic=cached-topic-1&limit=5"):
+        status, response = get_request(f"{server_url}/events?{query}")
+        assert status == 200
+        pages.append(response or "")
+
+    return pages
+
+
+def get_metric(server_url: str, name: str) -> float:
+    status, response = get_request(f"{server_url}/metrics")
+    assert status == 200
+
+    for line in (response or "").splitlines():
+        if line.startswith(f"chronicle_{name} "):
+            return float(line.split()[1])
+
+    raise AssertionError(f"Metric {name} not found")
+
+
+def test_event_bytes_cache() -> None:
+    db_path: str = "test_event_bytes_cache.db"
+    port: str = "8021"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+    server: Popen[bytes] = start_server(
+        db_path, port, {"DEDUPLICATION_EVENT_CACHE_BYTES": "4096"}
+    )
+
+    status, _ = post_request(
+        f"{server_url}/publish?ack=durable", {"events": generate_events(30)}
+    )
+    assert status == 200
+
+    pages: list[str] = get_pages(server_url)
+    assert get_pages(server_url) == pages
+    assert get_metric(server_url, "event_cache_hits_total") > 0
+    assert 0 < get_metric(server_url, "event_cache_bytes") <= 4096
+
+    page: dict[str, Any] = loads(pages[1])
+    assert page["count"] == 30
+    assert page["next_cursor"] is None
+    assert page["events"][0] == {
+        "event_id": "cached-event-0",
+        "topic": "cached-topic-0",
+        "source": "cached-source-é",
+        "payload": {
+            "message": 'Cached "message" 0\n✓',
+            "timestamp": "2025-01-01T08:00:00.000123+07:00",
+        },
+        "timestamp": "2025-01-01T01:00:00Z",
+    }
+    assert page["events"][1]["timestamp"] == "2025-01-01T00:00:00.123456Z"
+    assert page["events"][1]["payload"]["timestamp"] == "2025-01-01T00:00:00"
+
+    stop_server(server)
+
+    server = start_server(db_path, port, {"DEDUPLICATION_EVENT_CACHE_BYTES": "0"})
+    assert get_pages(server_url) == pages
+    assert get_metric(server_url, "event_cache_bytes") == 0
+    stop_server(server)
+
+    server = start_server(db_path, port)
+    assert get_pages(server_url) == pages
+    assert get_metric(server_url, "event_cache_misses_total") > 0
+    stop_server(server)
+
+    cleanup_db(db_path)
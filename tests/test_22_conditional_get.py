@@ -0,0 +1,125 @@
+from subprocess import Popen
+from typing import LiteralString
+
+from orjson import loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    http_request,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def generate_events(topic: str, start: int, count: int) -> list[EventData]:
+    return [
+        {
+            "event_id": f"conditional-event-{i}",
+            "topic": topic,
+            "source": "conditional-source",
+            "payload": {
+                "message": f"Conditional message {i}",
+                "timestamp": "2025-01-01T00:00:00Z",
+            },
+            "timestamp": f"2025-01-01T00:00:{i % 60:02d}Z",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def get_with_etag(url: str, etag: str = "") -> tuple[int | None, str, bytes]:
+    status, headers, body = http_request(
+        url, headers={"If-None-Match": etag} if etag else None
+    )
+
+    return status, headers.get("etag", ""), body or b""
+
+
+def check_conditional_get(server_url: str, offset: int) -> None:
+    topic_url: str = f"{server_url}/events?topic=conditional-a"
+
+    status, _ = post_request(
+        f"{server_url}/publish?ack=durable",
+        {"events": generate_events("conditional-a", offset, 5)},
+    )
+    assert status == 200
+
+    status, topic_etag, body = get_with_etag(topic_url)
+    assert status == 200 and topic_etag.startswith('"')
+    assert loads(body)["count"] == 5
+
+    status, etag, body = get_with_etag(topic_url, topic_etag)
+    assert status == 304 and etag == topic_etag and body == b""
+
+    status, events_etag, _ = get_with_etag(f"{server_url}/events")
+    assert status == 200
+
+    status, stats_etag, _ = get_with_etag(f"{server_url}/stats")
+    assert status == 200 and stats_etag.startswith('W/"')
+
+    status, _, _ = get_with_etag(f"{server_url}/stats", stats_etag)
+    assert status == 304
+
+    status, _ = post_request(
+        f"{server_url}/publish?ack=durable",
+        {"events": generate_events("conditional-b", offset + 5, 5)},
+    )
+    assert status == 200
+
+    status, _, _ = get_with_etag(topic_url, topic_etag)
+    assert status == 304
+
+    status, etag, _ = get_with_etag(f"{server_url}/events", events_etag)
+    assert status == 200 and etag != events_etag
+
+    status, etag, _ = get_with_etag(f"{server_url}/stats", stats_etag)
+    assert status == 200 and etag != stats_etag
+
+    status, _ = post_request(
+        f"{server_url}/publish?ack=durable",
+        {"events": generate_events("conditional-a", offset + 10, 5)},
+    )
+    assert status == 200
+
+    status, etag, body = get_with_etag(topic_url, topic_etag)
+    assert status == 200
+    assert int(etag.strip('"')) > int(topic_etag.strip('"'))
+    assert loads(body)["count"] == 10
+
+
+def test_conditional_get() -> None:
+    db_path: str = "test_conditional_get.db"
+    port: str = "8022"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+    server: Popen[bytes] = start_server(db_path, port)
+
+    check_conditional_get(server_url, 0)
+
+    status, etag, _ = get_with_etag(f"{server_url}/events?topic=conditional-a")
+    assert status == 200
+
+    stop_server(server)
+
+    server = start_server(db_path, port)
+
+    status, restarted_etag, _ = get_with_etag(
+        f"{server_url}/events?topic=conditional-a", etag
+    )
+    assert status == 200
+    assert int(restarted_etag.strip('"')) > int(etag.strip('"'))
+
+    stop_server(server)
+
+    cleanup_db(db_path)
+
+    server = start_server(db_path, port, {"AGGREGATOR_WRITERS": "2"})
+
+    check_conditional_get(server_url, 100)
+
+    stop_server(server)
+
+    cleanup_db(db_path)
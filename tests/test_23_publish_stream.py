@@ -0,0 +1,147 @@
+from gzip import compress
+from subprocess import Popen
+from typing import Any, LiteralString
+
+from orjson import dumps, loads
+from utils.testing import (
+    EventData,
+    cleanup_db,
+    get_request,
+    http_request,
+    start_server,
+    stop_server,
+)
+
+
+def generate_events(count: int) -> list[EventData]:
+    return [
+        {
+            "event_id": f"stream-event-{i}",
+            "topic": f"stream-topic-{i % 4}",
+            "source": "stream-source",
+            "payload": {
+                "message": f"Streamed message {i}",
+                "timestamp": "2025-01-01T00:00:00Z",
+            },
+            "timestamp": f"2025-01-01T00:00:{i % 60:02d}Z",
+        }
+        for i in range(count)
+    ]
+
+
+def to_ndjson(events: list[EventData]) -> bytes:
+    return b"".join(dumps(event) + b"\n" for event in events)
+
+
+def publish_stream(
+    url: str, body: bytes, gzip: bool = False
+) -> tuple[int | None, dict[str, Any]]:
+    headers: dict[str, str] = {"Content-Type": "application/x-ndjson"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+        body = compress(body)
+
+    status, _, response = http_request(url, "POST", body, headers)
+
+    return status, loads(response or b"{}")
+
+
+def test_publish_stream() -> None:
+    db_path: str = "test_publish_stream.db"
+    port: str = "8023"
+
+    cleanup_db(db_path)
+
+    server_url: LiteralString = f"http://127.0.0.1:{port}"
+    server: Popen[bytes] = start_server(
+        db_path, port, {"PUBLISH_STREAM_BATCH_SIZE": "100"}
+    )
+
+    events: list[EventData] = generate_events(2000)
+    body: bytes = (
+        to_ndjson(events[:1000])
+        + b'{"event_id": "broken"\n'
+        + b"\n"
+        + dumps({**events[0], "event_id": "missing-topic", "topic": None})
+        + b"\n"
+        + to_ndjson(events[1000:])[:-1]
+    )
+
+    status, response = publish_stream(
+        f"{server_url}/publish/stream?ack=durable", body, gzip=True
+    )
+    assert status == 200
+    assert response["status"] == "partial"
+    assert response["events_count"] == 2000
+    assert response["accepted"] == 2000
+    assert response["duplicates"] == 0
+    assert response["rejected"] == 2
+    assert [error["line"] for error in response["errors"]] == [1001, 1003]
+    assert response["errors"][0]["errors"][0]["type"] == "json_invalid"
+    assert response["errors"][1]["errors"][0]["loc"] == ["topic"]
+
+    oversized: bytes = dumps(
+        {
+            **events[0],
+            "payload": {
+                "message": "x" * 1100000,
+                "timestamp": "2025-01-01T00:00:00Z",
+            },
+        }
+    )
+    status, response = publish_stream(
+        f"{server_url}/publish/stream?ack=durable",
+        to_ndjson(events[:10]) + oversized + b"\n" + to_ndjson(events[10:20]),
+    )
+    assert status == 200
+    assert response["events_count"] == 20
+    assert response["duplicates"] == 20
+    assert response["rejected"] == 1
+    assert response["errors"][0]["line"] == 11
+    assert response["errors"][0]["errors"][0]["type"] == "line_too_long"
+
+    status, _, multi_member = http_request(
+        f"{server_url}/publish/stream?ack=durable",
+        "POST",
+        compress(to_ndjson(events[:10])) + compress(to_ndjson(events[10:25])),
+        {"Content-Encoding": "gzip"},
+    )
+    assert status == 200
+    assert loads(multi_member or b"{}")["events_count"] == 25
+    assert loads(multi_member or b"{}")["duplicates"] == 25
+
+    status, response = publish_stream(
+        f"{server_url}/publish/stream", to_ndjson(generate_events(2100)[2000:])
+    )
+    assert status == 200
+    assert response["status"] == "success"
+    assert response["events_count"] == 100
+
+    status, response = publish_stream(
+        f"{server_url}/publish/stream",
+        compress(to_ndjson(events[:10]))[:-8],
+        gzip=False,
+    )
+    assert status == 200
+    assert response["events_count"] == 0
+    assert response["rejected"] >= 1
+
+    status, _, _ = http_request(
+        f"{server_url}/publish/stream",
+        "POST",
+        compress(to_ndjson(events[:10]))[:-20],
+        {"Content-Encoding": "gzip"},
+    )
+    assert status == 400
+
+    stop_server(server)
+
+    server = start_server(db_path, port)
+
+    status, stats_response = get_request(f"{server_url}/stats")
+    assert status == 200
+    assert loads(stats_response or "{}")["unique_processed"] == 2100
+
+    stop_server(server)
+
+    cleanup_db(db_path)
@@ -1,206 +1,378 @@
+from argparse import ArgumentParser, Namespace
+from asyncio import (
+    StreamReader,
+    StreamWriter,
+    gather,
+    get_running_loop,
+    open_connection,
+    run,
+    sleep,
+)
+from random import Random
 from subprocess import Popen
-from time import sleep, time
-from typing import Any, Literal, LiteralString
+from typing import Any
+from urllib.parse import urlsplit
 
-from orjson import loads
+from orjson import dumps, loads
 
-from utils.testing import EventData
+from .benchmark_report import compare_results, make_results, summarize, write_results
+from .testing import EventData, cleanup_db, start_server, stop_server
 
-from .testing import (
-    cleanup_db,
-    generate_test_events,
-    get_request,
-    post_request,
-    start_server,
-    stop_server,
-)
 
+class HttpConnection:
+    def __init__(self, host: str, port: int) -> None:
+        self.__host: str = host
+        self.__port: int = port
+        self.__reader: StreamReader | None = None
+        self.__writer: StreamWriter | None = None
 
-def run_benchmark() -> None:
-    port: str = "8001"
-    base_url: LiteralString = f"http://localhost:{port}"
+    async def request(
+        self, method: str, path: str, body: bytes = b""
+    ) -> tuple[int, bytes]:
+        if self.__reader is None or self.__writer is None:
+            self.__reader, self.__writer = await open_connection(
+                self.__host, self.__port
+            )
 
-    db_path: str = "benchmark.db"
+        self.__writer.write(
+            (
+                f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {self.__host}:{self.__port}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode()
+            + body
+        )
+        await self.__writer.drain()
+
+        try:
+            return await self.__read_response(self.__reader)
+        except Exception:
+            self.close()
+            raise
+
+    async def __read_response(self, reader: StreamReader) -> tuple[int, bytes]:
+        status: int = int((await reader.readuntil(b"\r\n")).split(b" ", 2)[1])
+        headers: dict[bytes, bytes] = {}
 
-    total_events: int = 5000
-    duplicate_ratio: float = 0.2
+        while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+            name, _, value = line.partition(b":")
+            headers[name.strip().lower()] = value.strip()
 
-    cleanup_db(db_path)
-    server: Popen[bytes] = start_server(db_path, port)
+        if headers.get(b"transfer-encoding") == b"chunked":
+            chunks: list[bytes] = []
+            while size := int((await reader.readuntil(b"\r\n")).strip(), 16):
+                chunks.append(await reader.readexactly(size + 2))
 
-    events: list[EventData] = generate_test_events(total_events, duplicate_ratio)
-    expected_unique: int = int(total_events * (1 - duplicate_ratio))
-    batch_size: int = 10
+            _ = await reader.readuntil(b"\r\n")
+            body: bytes = b"".join(chunk[:-2] for chunk in chunks)
+        else:
+            body = await reader.readexactly(int(headers.get(b"content-length", b"0")))
+
+        if headers.get(b"connection") == b"close":
+            self.close()
+
+        return status, body
+
+    def close(self) -> None:
+        if self.__writer:
+            self.__writer.close()
+
+        self.__reader = self.__writer = None
+
+
+def generate_batches(
+    total_events: int,
+    batch_size: int,
+    duplicate_ratio: float,
+    topics: int,
+    seed: int,
+) -> list[bytes]:
+    random: Random = Random(seed)
+    unique: list[EventData] = []
+    events: list[EventData] = []
+
+    for i in range(total_events):
+        if unique and random.random() < duplicate_ratio:
+            events.append(random.choice(unique))
+            continue
+
+        event: EventData = {
+            "event_id": f"load-event-{seed}-{i}",
+            "topic": f"load-topic-{i % topics}",
+            "source": "load-generator",
+            "payload": {
+                "message": f"Load generator event {i}",
+                "timestamp": "2025-01-01T00:00:00+00:00",
+            },
+            "timestamp": "2025-01-01T00:00:00+00:00",
+        }
+        unique.append(event)
+        events.append(event)
+
+    return [
+        dumps({"events": events[i : i + batch_size]})
+        for i in range(0, len(events), batch_size)
+    ]
+
+
+async def publish_open_loop(
+    host: str,
+    port: int,
+    batches: list[bytes],
+    concurrency: int,
+    rate: float,
+    e2e_every: int,
+) -> tuple[list[float], list[float], int, float]:
+    publish_latencies: list[float] = []
+    e2e_latencies: list[float] = []
+    errors: int = 0
+    next_request: int = 0
+    started_at: float = get_running_loop().time()
+
+    async def worker() -> None:
+        nonlocal errors, next_request
+
+        connection: HttpConnection = HttpConnection(host, port)
+        try:
+            while next_request < len(batches):
+                request: int = next_request
+                next_request += 1
+
+                intended_at: float = (
+                    started_at + request / rate
+                    if rate > 0
+                    else get_running_loop().time()
+                )
+                delay: float = intended_at - get_running_loop().time()
+                if delay > 0:
+                    await sleep(delay)
+
+                durable: bool = e2e_every > 0 and request % e2e_every == 0
+                try:
+                    status, _ = await connection.request(
+                        "POST",
+                        "/publish?ack=durable" if durable else "/publish",
+                        batches[request],
+                    )
+                except OSError:
+                    status = 0
+                except EOFError:
+                    status = 0
+
+                latency: float = get_running_loop().time() - intended_at
+                if status != 200:
+                    errors += 1
+                elif durable:
+                    e2e_latencies.append(latency)
+                else:
+                    publish_latencies.append(latency)
+        finally:
+            connection.close()
+
+    _ = await gather(*(worker() for _ in range(concurrency)))
+
+    return (
+        publish_latencies,
+        e2e_latencies,
+        errors,
+        get_running_loop().time() - started_at,
+    )
+
+
+async def wait_until_drained(
+    host: str, port: int, total_events: int, timeout: float = 300
+) -> dict[str, Any]:
+    connection: HttpConnection = HttpConnection(host, port)
+    deadline: float = get_running_loop().time() + timeout
+    stats: dict[str, Any] = {}
+
+    try:
+        while get_running_loop().time() < deadline:
+            status, body = await connection.request("GET", "/stats")
+            if status == 200:
+                stats = loads(body)
+                if stats["received"] >= total_events:
+                    break
+
+            await sleep(0.01)
+    finally:
+        connection.close()
+
+    return stats
+
+
+async def run_load(arguments: Namespace, url: str) -> dict[str, object]:
+    target = urlsplit(url)
+    host: str = target.hostname or "localhost"
+    port: int = target.port or 80
+
+    batches: list[bytes] = generate_batches(
+        arguments.events,
+        arguments.batch_size,
+        arguments.duplicate_ratio,
+        arguments.topics,
+        arguments.seed,
+    )
+    e2e_every: int = (
+        max(1, round(1 / arguments.e2e_sample)) if arguments.e2e_sample > 0 else 0
+    )
+
+    started_at: float = get_running_loop().time()
+    publish_latencies, e2e_latencies, errors, publish_seconds = await publish_open_loop(
+        host, port, batches, arguments.concurrency, arguments.rate, e2e_every
+    )
+    stats: dict[str, Any] = await wait_until_drained(host, port, arguments.events)
+    total_seconds: float = get_running_loop().time() - started_at
+
+    return make_results(
+        "load",
+        {
+            "url": url,
+            "events": arguments.events,
+            "batch_size": arguments.batch_size,
+            "concurrency": arguments.concurrency,
+            "rate": arguments.rate,
+            "duplicate_ratio": arguments.duplicate_ratio,
+            "topics": arguments.topics,
+            "e2e_sample": arguments.e2e_sample,
+        },
+        publish={
+            "requests": len(batches),
+            "errors": errors,
+            "seconds": publish_seconds,
+            "events_per_second": arguments.events / publish_seconds
+            if publish_seconds > 0
+            else 0,
+            "latency_ms": summarize(publish_latencies, 1000),
+        },
+        end_to_end={"latency_ms": summarize(e2e_latencies, 1000)},
+        server={
+            "received": stats.get("received", 0),
+            "unique_processed": stats.get("unique_processed", 0),
+            "duplicated_dropped": stats.get("duplicated_dropped", 0),
+            "drained": stats.get("received", 0) >= arguments.events,
+            "seconds": total_seconds,
+            "events_per_second": arguments.events / total_seconds
+            if total_seconds > 0
+            else 0,
+        },
+    )
+
+
+def print_results(results: dict[str, Any]) -> None:
+    config: dict[str, Any] = results["config"]
+    publish: dict[str, Any] = results["publish"]
+    server: dict[str, Any] = results["server"]
 
     print("\n" + "=" * 70)
-    print("BENCHMARK CONFIGURATION".center(70))
+    print("OPEN-LOOP LOAD GENERATOR".center(70))
     print("=" * 70)
-    print(f"  Total Events        : {total_events:,}")
-    print(f"  Duplicate Ratio     : {duplicate_ratio:.1%}")
-    print(f"  Expected Unique     : {expected_unique:,}")
-    print(f"  Batch Size          : {batch_size}")
+    print(f"  Target              : {config['url']}")
+    print(f"  Total Events        : {config['events']:,}")
+    print(f"  Batch Size          : {config['batch_size']}")
+    print(f"  Concurrency         : {config['concurrency']}")
+    print(
+        f"  Target Rate         : {f'{config["rate"]:.0f} req/s' if config['rate'] > 0 else 'unbounded'}"
+    )
+    print(f"  Duplicate Ratio     : {config['duplicate_ratio']:.1%}")
+    print(f"  Topics              : {config['topics']}")
     print("=" * 70 + "\n")
 
-    publish_start: float = time()
-
-    total_batches: int = (len(events) + batch_size - 1) // batch_size
-
-    print("Phase 1: Publishing Events")
+    print(
+        f"  Publish             : {publish['requests']:,} requests, {publish['errors']} errors, "
+        f"{publish['events_per_second']:.2f} events/s"
+    )
+    print(
+        f"  Server              : {server['received']:,} received, {server['unique_processed']:,} unique, "
+        f"{server['duplicated_dropped']:,} duplicates, {server['events_per_second']:.2f} events/s end-to-end"
+    )
+    print()
+
+    print(
+        f"  {'Latency (ms)':<14}  {'count':>8}  {'p50':>9}  {'p95':>9}  {'p99':>9}  {'p999':>9}  {'max':>9}"
+    )
     print("-" * 70)
-    for i in range(0, len(events), batch_size):
-        batch: list[EventData] = events[i : i + batch_size]
-        status_code, _ = post_request(url=f"{base_url}/publish", data={"events": batch})
-
-        if status_code != 200:
-            print(
-                f"\n[ERROR] Failed to publish batch {i // batch_size + 1}: Status {status_code}"
-            )
-            stop_server(server)
-            cleanup_db(db_path)
-            return
+    for name, section in (
+        ("publish", publish),
+        ("end-to-end", results["end_to_end"]),
+    ):
+        latency: dict[str, float] = section["latency_ms"]
+        if not latency["count"]:
+            continue
 
-        current_batch: int = i // batch_size + 1
-        progress: float = (current_batch / total_batches) * 100
-        bar_length: int = 40
-        filled: int = int(bar_length * current_batch / total_batches)
-        bar: LiteralString = "█" * filled + "░" * (bar_length - filled)
         print(
-            f"\r  [{bar}] {progress:.1f}% ({current_batch}/{total_batches} batches)",
-            end="",
-            flush=True,
+            f"  {name:<14}  {latency['count']:>8.0f}  {latency['p50']:>9.3f}  {latency['p95']:>9.3f}  "
+            f"{latency['p99']:>9.3f}  {latency['p999']:>9.3f}  {latency['max']:>9.3f}"
         )
 
-    publish_end: float = time()
-    publish_time: float = publish_end - publish_start
-    publish_throughput: float = total_events / publish_time if publish_time > 0 else 0
-    print(f"\n  Completed in {publish_time:.3f}s ({publish_throughput:.2f} events/s)\n")
-
-    previous_processed: int = 0
-    processing_start: float = time()
-
-    print("Phase 2: Processing Events")
-    print("-" * 70)
-    while True:
-        status, stats_response = get_request(url=f"{base_url}/stats")
-
-        if status == 200 and stats_response:
-            stats: dict = loads(stats_response)
-            current_processed: int = stats["received"]
-
-            progress = (current_processed / total_events) * 100
-            bar_length = 40
-            filled = int(bar_length * current_processed / total_events)
-            bar = "█" * filled + "░" * (bar_length - filled)
-            print(
-                f"\r  [{bar}] {progress:.1f}% ({current_processed}/{total_events} events)",
-                end="",
-                flush=True,
-            )
+    print("\n" + "=" * 70 + "\n")
+
+
+def parse_arguments() -> Namespace:
+    parser: ArgumentParser = ArgumentParser(
+        description="Open-loop load generator for the aggregator"
+    )
+    _ = parser.add_argument(
+        "--url", default="", help="Target aggregator; starts a local one if empty"
+    )
+    _ = parser.add_argument("--events", type=int, default=50000)
+    _ = parser.add_argument("--batch-size", type=int, default=10)
+    _ = parser.add_argument("--concurrency", type=int, default=32)
+    _ = parser.add_argument(
+        "--rate",
+        type=float,
+        default=0,
+        help="Target requests/s; 0 sends as fast as the connections allow",
+    )
+    _ = parser.add_argument("--duplicate-ratio", type=float, default=0.2)
+    _ = parser.add_argument("--topics", type=int, default=10)
+    _ = parser.add_argument(
+        "--e2e-sample",
+        type=float,
+        default=0.1,
+        help="Fraction of requests sent with ack=durable to measure end-to-end latency",
+    )
+    _ = parser.add_argument("--seed", type=int, default=1)
+    _ = parser.add_argument("--output", default="", help="Write JSON results here")
+    _ = parser.add_argument(
+        "--baseline", default="", help="Compare against a previous JSON result"
+    )
+
+    return parser.parse_args()
 
-            if current_processed == total_events:
-                break
 
-            if current_processed == previous_processed:
-                sleep(0.5)
-            else:
-                previous_processed = current_processed
-                sleep(0.1)
-        else:
-            sleep(0.5)
+def run_benchmark() -> None:
+    arguments: Namespace = parse_arguments()
 
-    processing_end: float = time()
-    processing_time: float = processing_end - processing_start
-    total_time: float = publish_time + processing_time
-    print(f"\n  Completed in {processing_time:.3f}s\n")
+    port: str = "8001"
+    db_path: str = "benchmark.db"
+    server: Popen[bytes] | None = None
+    url: str = arguments.url
+
+    if not url:
+        cleanup_db(db_path)
+        server = start_server(db_path, port)
+        url = f"http://127.0.0.1:{port}"
+
+    try:
+        results: dict[str, object] = run(run_load(arguments, url))
+    finally:
+        if server:
+            stop_server(server)
+            cleanup_db(db_path)
 
-    status, stats_response = get_request(url=f"{base_url}/stats")
-    if status == 200 and stats_response:
-        stats = loads(stats_response)
+    print_results(results)
 
-        received: int = stats["received"]
-        unique_processed: int = stats["unique_processed"]
-        duplicated_dropped: int = stats["duplicated_dropped"]
+    if arguments.output:
+        write_results(arguments.output, results)
 
-        status, events_response = get_request(
-            url=f"{base_url}/events?topic=publisher-topic"
+    if arguments.baseline:
+        compare_results(
+            results,
+            arguments.baseline,
+            ("p50", "p99", "p999", "events_per_second"),
         )
-        if status == 200 and events_response:
-            events_data = loads(events_response)
-            actual_unique: int = events_data["count"]
-
-            throughput: float | Literal[0] = (
-                total_events / total_time if total_time > 0 else 0
-            )
-            processing_rate: float | Literal[0] = (
-                unique_processed / processing_time if processing_time > 0 else 0
-            )
-            duplicate_rate: Any | Literal[0] = (
-                duplicated_dropped / received if received > 0 else 0
-            )
-            avg_latency: float | Literal[0] = (
-                processing_time / unique_processed if unique_processed > 0 else 0
-            )
-            accuracy: bool = (unique_processed == expected_unique) and (
-                actual_unique == expected_unique
-            )
-
-            width = 70
-            print("\n" + "=" * width)
-            print("EVALUATION METRICS".center(width))
-            print("=" * width)
-
-            print("\n" + "─" * width)
-            print("THROUGHPUT ANALYSIS")
-            print("─" * width)
-            print(f"  Total Events Sent          : {total_events:,}")
-            print(f"  Events Received            : {received:,}")
-            print(f"  Unique Events Processed    : {unique_processed:,}")
-            print(f"  Duplicate Events Dropped   : {duplicated_dropped:,}")
-            print(f"  Overall Throughput         : {throughput:.2f} events/s")
-            print(f"  Processing Throughput      : {processing_rate:.2f} events/s")
-            print(f"  Publishing Throughput      : {publish_throughput:.2f} events/s")
-
-            print("\n" + "─" * width)
-            print("LATENCY ANALYSIS")
-            print("─" * width)
-            print(f"  Publish Latency            : {publish_time:.3f}s")
-            print(f"  Processing Latency         : {processing_time:.3f}s")
-            print(f"  Total Latency              : {total_time:.3f}s")
-            print(f"  Average Per-Event Latency  : {avg_latency * 1000:.2f}ms")
-
-            print("\n" + "─" * width)
-            print("DUPLICATE RATE ANALYSIS")
-            print("─" * width)
-            print(f"  Input Duplicate Ratio      : {duplicate_ratio:.2%}")
-            print(f"  Detected Duplicate Rate    : {duplicate_rate:.2%}")
-            print(f"  Expected Unique Events     : {expected_unique:,}")
-            print(f"  Actual Unique Events       : {actual_unique:,}")
-            print(
-                f"  Deduplication Accuracy     : {(1 - abs(actual_unique - expected_unique) / expected_unique) * 100:.2f}%"
-            )
-
-            print("\n" + "─" * width)
-            print("DATA INTEGRITY")
-            print("─" * width)
-            accuracy_symbol = "[PASS]" if accuracy else "[FAIL]"
-            print(f"  Validation Status          : {accuracy_symbol}")
-            if accuracy:
-                print(
-                    f"  All {expected_unique:,} unique events processed without data loss"
-                )
-            else:
-                print(
-                    f"  Data loss detected: Expected {expected_unique:,}, Got {actual_unique:,}"
-                )
-
-            print("\n" + "=" * width + "\n")
-        else:
-            print("\n[ERROR] Failed to retrieve events from aggregator")
-    else:
-        print("\n[ERROR] Failed to retrieve statistics from aggregator")
-
-    stop_server(server)
-    cleanup_db(db_path)
 
 
 if __name__ == "__main__":
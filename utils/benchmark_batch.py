@@ -0,0 +1,104 @@
+from subprocess import Popen
+from time import sleep, time
+
+from orjson import loads
+
+from .testing import (
+    EventData,
+    cleanup_db,
+    generate_test_events,
+    get_request,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def wait_until_received(base_url: str, total_events: int) -> bool:
+    previous_received: int = -1
+    stalled_polls: int = 0
+
+    while stalled_polls < 100:
+        status, stats_response = get_request(url=f"{base_url}/stats")
+
+        if status == 200 and stats_response:
+            received: int = loads(stats_response)["received"]
+            if received >= total_events:
+                return True
+
+            if received == previous_received:
+                stalled_polls += 1
+            else:
+                previous_received = received
+                stalled_polls = 0
+
+        sleep(0.05)
+
+    return False
+
+
+def measure_batch_size(
+    batch_size: int, events: list[EventData], port: str
+) -> tuple[float, float]:
+    base_url: str = f"http://localhost:{port}"
+    db_path: str = f"benchmark_batch_{batch_size}.db"
+
+    cleanup_db(db_path)
+    server: Popen[bytes] = start_server(
+        db_path,
+        port,
+        extra_env={
+            "CONSUMER_BATCH_SIZE": str(batch_size),
+            "CONSUMER_BATCH_TIMEOUT_MS": "10",
+        },
+    )
+
+    try:
+        start: float = time()
+
+        for i in range(0, len(events), 1000):
+            status_code, _ = post_request(
+                url=f"{base_url}/publish", data={"events": events[i : i + 1000]}
+            )
+            if status_code != 200:
+                raise RuntimeError(f"Publish failed with status {status_code}")
+
+        if not wait_until_received(base_url, len(events)):
+            raise RuntimeError("Consumer stalled before draining the queue")
+
+        elapsed: float = time() - start
+    finally:
+        stop_server(server)
+        cleanup_db(db_path)
+
+    return elapsed, len(events) / elapsed if elapsed > 0 else 0
+
+
+def run_benchmark() -> None:
+    port: str = "8001"
+    total_events: int = 20000
+    duplicate_ratio: float = 0.2
+    batch_sizes: list[int] = [1, 10, 50, 100, 500, 1000]
+
+    events: list[EventData] = generate_test_events(total_events, duplicate_ratio)
+
+    print("\n" + "=" * 70)
+    print("CONSUMER BATCH SIZE BENCHMARK".center(70))
+    print("=" * 70)
+    print(f"  Total Events        : {len(events):,}")
+    print(f"  Duplicate Ratio     : {duplicate_ratio:.1%}")
+    print(f"  Batch Sizes         : {', '.join(str(size) for size in batch_sizes)}")
+    print("=" * 70 + "\n")
+
+    print(f"  {'Batch Size':>10}  {'Elapsed (s)':>12}  {'Throughput (events/s)':>22}")
+    print("-" * 70)
+
+    for batch_size in batch_sizes:
+        elapsed, throughput = measure_batch_size(batch_size, events, port)
+        print(f"  {batch_size:>10}  {elapsed:>12.3f}  {throughput:>22.2f}")
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,257 @@
+from argparse import ArgumentParser, Namespace
+from asyncio import run
+from glob import glob
+from os import environ, listdir, remove
+from os.path import getsize, join
+from sqlite3 import Connection, connect
+from subprocess import DEVNULL, Popen
+from sys import executable
+from tempfile import TemporaryDirectory
+from time import perf_counter, sleep, time
+from typing import cast
+from urllib.request import urlopen
+
+from orjson import dumps
+from src.aggregator.app.services.deduplication_store import DeduplicationStoreService
+
+from .benchmark_report import compare_results, make_results, summarize, write_results
+
+TOPICS: int = 10
+INSERT_CHUNK: int = 100_000
+HEALTHCHECK_START_PERIOD: float = 30.0
+
+
+def create_schema(db_path: str) -> None:
+    async def initialize() -> None:
+        store: DeduplicationStoreService = DeduplicationStoreService(db_path)
+        await store.initialize()
+        await store.close()
+
+    run(initialize())
+
+
+def populate(db_path: str, size: int) -> float:
+    started_at: float = perf_counter()
+    create_schema(db_path)
+
+    timestamp_us: int = int(time() * 1_000_000)
+    processed_at: int = int(time() * 1000)
+
+    connection: Connection = connect(db_path)
+    _ = connection.execute("PRAGMA journal_mode=WAL")
+    _ = connection.execute("PRAGMA synchronous=OFF")
+    _ = connection.execute("PRAGMA cache_size=-262144")
+
+    for start in range(0, size, INSERT_CHUNK):
+        _ = connection.executemany(
+            "INSERT INTO processed_events (event_id, topic, source, payload, timestamp, processed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    f"cold-start-{i:012d}",
+                    f"topic-{i % TOPICS}",
+                    "benchmark",
+                    f'{{"message":"Cold start event {i}","timestamp":"2025-01-01T00:00:00Z"}}',
+                    timestamp_us + i,
+                    processed_at,
+                )
+                for i in range(start, min(size, start + INSERT_CHUNK))
+            ),
+        )
+        connection.commit()
+
+    _ = connection.execute(
+        "INSERT OR REPLACE INTO stats (id, received, duplicated_dropped, topics, checkpoint_rowid) VALUES (1, ?, 0, ?, ?)",
+        (
+            size,
+            dumps([f"topic-{topic}" for topic in range(min(size, TOPICS))]).decode(),
+            size,
+        ),
+    )
+    connection.commit()
+    _ = connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    connection.close()
+
+    return perf_counter() - started_at
+
+
+def process_tree(pid: int) -> list[int]:
+    pids: list[int] = [pid]
+
+    for task in listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as children:
+                for child in children.read().split():
+                    pids.extend(process_tree(int(child)))
+        except OSError:
+            continue
+
+    return pids
+
+
+def peak_rss(pid: int) -> int:
+    total: int = 0
+
+    for process in process_tree(pid):
+        try:
+            with open(f"/proc/{process}/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+
+    return total
+
+
+def measure_start(
+    db_path: str, port: str, env: dict[str, str], timeout: float
+) -> tuple[float, int]:
+    server_env: dict[str, str] = environ.copy()
+    server_env["APP_PORT"] = port
+    server_env["DEDUPLICATION_DB_PATH"] = db_path
+    server_env.update(env)
+
+    started_at: float = perf_counter()
+    server: Popen[bytes] = Popen[bytes](
+        [executable, "-m", "src.aggregator.app.main"],
+        env=server_env,
+        stdout=DEVNULL,
+        stderr=DEVNULL,
+    )
+
+    try:
+        while perf_counter() - started_at < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode}")
+
+            try:
+                with urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return perf_counter() - started_at, peak_rss(server.pid)
+            except OSError:
+                pass
+
+            sleep(0.01)
+
+        raise TimeoutError(f"Server was not healthy after {timeout:.0f}s")
+    finally:
+        server.terminate()
+        _ = server.wait(timeout=60)
+
+
+def run_sizes(arguments: Namespace, env: dict[str, str]) -> list[dict[str, object]]:
+    results: list[dict[str, object]] = []
+
+    with TemporaryDirectory(dir=arguments.db_dir or None) as directory:
+        for size in arguments.sizes:
+            db_path: str = join(directory, f"cold-start-{size}.db")
+
+            print(f"  Populating {size:,} rows...", flush=True)
+            populate_seconds: float = populate(db_path, size)
+
+            timings: list[float] = []
+            rss: list[float] = []
+            for _ in range(arguments.runs):
+                seconds, peak = measure_start(
+                    db_path, arguments.port, env, arguments.timeout
+                )
+                timings.append(seconds)
+                rss.append(peak / 1024 / 1024)
+
+            results.append(
+                {
+                    "name": "cold_start",
+                    "size": size,
+                    "db_mb": sum(getsize(path) for path in glob(f"{db_path}*"))
+                    / 1024
+                    / 1024,
+                    "populate_seconds": populate_seconds,
+                    "healthy_seconds": summarize(timings),
+                    "peak_rss_mb": summarize(rss),
+                    "exceeds_start_period": max(timings) > HEALTHCHECK_START_PERIOD,
+                }
+            )
+
+            for path in glob(f"{db_path}*"):
+                remove(path)
+
+    return results
+
+
+def print_results(results: list[dict[str, object]]) -> None:
+    print("\n" + "=" * 80)
+    print("COLD-START BENCHMARK".center(80))
+    print("=" * 80 + "\n")
+
+    print(
+        f"  {'Rows':>12}  {'DB (MB)':>9}  {'Populate (s)':>12}  {'Healthy p50 (s)':>15}  {'max (s)':>8}  {'Peak RSS (MB)':>13}"
+    )
+    print("-" * 80)
+    for result in results:
+        healthy: dict[str, float] = cast(dict[str, float], result["healthy_seconds"])
+        rss: dict[str, float] = cast(dict[str, float], result["peak_rss_mb"])
+        warning: str = "  > start_period" if result["exceeds_start_period"] else ""
+        print(
+            f"  {result['size']:>12,}  {result['db_mb']:>9.1f}  {result['populate_seconds']:>12.1f}  "
+            f"{healthy['p50']:>15.2f}  {healthy['max']:>8.2f}  {rss['max']:>13.1f}{warning}"
+        )
+
+    print(
+        f"\n  docker-compose healthcheck start_period: {HEALTHCHECK_START_PERIOD:.0f}s"
+    )
+    print("=" * 80 + "\n")
+
+
+def parse_arguments() -> Namespace:
+    parser: ArgumentParser = ArgumentParser(
+        description="Time from process start to a healthy /health over pre-populated databases"
+    )
+    _ = parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",") if size],
+        default=[100_000, 1_000_000, 10_000_000],
+        help="Comma-separated processed_events row counts",
+    )
+    _ = parser.add_argument("--runs", type=int, default=3)
+    _ = parser.add_argument("--port", default="8001")
+    _ = parser.add_argument("--timeout", type=float, default=600)
+    _ = parser.add_argument(
+        "--db-dir", default="", help="Directory for the generated databases"
+    )
+    _ = parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        help="Extra KEY=VALUE for the server, e.g. DEDUPLICATION_INDEX=bloom",
+    )
+    _ = parser.add_argument("--output", default="", help="Write JSON results here")
+    _ = parser.add_argument(
+        "--baseline", default="", help="Compare against a previous JSON result"
+    )
+
+    return parser.parse_args()
+
+
+def run_benchmark() -> None:
+    arguments: Namespace = parse_arguments()
+    env: dict[str, str] = dict(entry.split("=", 1) for entry in arguments.env)
+
+    results: list[dict[str, object]] = run_sizes(arguments, env)
+
+    print_results(results)
+
+    report: dict[str, object] = make_results(
+        "cold_start",
+        {"sizes": arguments.sizes, "runs": arguments.runs, "env": env},
+        results=results,
+    )
+
+    if arguments.output:
+        write_results(arguments.output, report)
+
+    if arguments.baseline:
+        compare_results(report, arguments.baseline, ("p50", "max"))
+
+
+if __name__ == "__main__":
+    run_benchmark()
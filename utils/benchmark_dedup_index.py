@@ -0,0 +1,90 @@
+from multiprocessing import get_context
+from multiprocessing.queues import Queue
+from os import sysconf
+from sys import argv
+from time import perf_counter
+
+from src.aggregator.app.services.deduplication_index import CompactDeduplicationIndex
+
+TOPIC_COUNT: int = 10
+LOOKUP_COUNT: int = 100_000
+
+
+def current_rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * sysconf("SC_PAGE_SIZE")
+
+
+def build_index(
+    structure: str, size: int, results: "Queue[tuple[float, float, float]]"
+) -> None:
+    rss_before: int = current_rss()
+    start: float = perf_counter()
+
+    if structure == "set":
+        keys: set[tuple[str, str]] = set()
+        for i in range(size):
+            keys.add((f"event-{i}", f"topic-{i % TOPIC_COUNT}"))
+
+        build_time: float = perf_counter() - start
+        rss_after: int = current_rss()
+
+        start = perf_counter()
+        for i in range(0, size, max(1, size // LOOKUP_COUNT)):
+            _ = (f"event-{i}", f"topic-{i % TOPIC_COUNT}") in keys
+    else:
+        index: CompactDeduplicationIndex = CompactDeduplicationIndex()
+        for i in range(size):
+            index.add(f"event-{i}", f"topic-{i % TOPIC_COUNT}")
+
+        build_time = perf_counter() - start
+        rss_after = current_rss()
+
+        start = perf_counter()
+        for i in range(0, size, max(1, size // LOOKUP_COUNT)):
+            _ = index.contains(f"event-{i}", f"topic-{i % TOPIC_COUNT}")
+
+    lookup_time: float = (perf_counter() - start) / min(size, LOOKUP_COUNT)
+
+    results.put((rss_after - rss_before, build_time, lookup_time))
+
+
+def measure(structure: str, size: int) -> tuple[float, float, float]:
+    context = get_context("spawn")
+    results: "Queue[tuple[float, float, float]]" = context.Queue()
+
+    process = context.Process(target=build_index, args=(structure, size, results))
+    process.start()
+    result: tuple[float, float, float] = results.get()
+    process.join()
+
+    return result
+
+
+def run_benchmark() -> None:
+    sizes: list[int] = [int(size) for size in argv[1:]] or [1_000_000, 10_000_000]
+
+    print("\n" + "=" * 70)
+    print("DEDUPLICATION INDEX MEMORY BENCHMARK".center(70))
+    print("=" * 70)
+    print(f"  Sizes               : {', '.join(f'{size:,}' for size in sizes)}")
+    print(f"  Topics              : {TOPIC_COUNT}")
+    print("=" * 70 + "\n")
+
+    print(
+        f"  {'Keys':>12}  {'Structure':>10}  {'RSS (MB)':>10}  {'B/key':>7}  {'Build (s)':>10}  {'Lookup (ns)':>12}"
+    )
+    print("-" * 70)
+
+    for size in sizes:
+        for structure in ("set", "compact"):
+            rss, build_time, lookup_time = measure(structure, size)
+            print(
+                f"  {size:>12,}  {structure:>10}  {rss / 1024 / 1024:>10.1f}  {rss / size:>7.1f}  {build_time:>10.2f}  {lookup_time * 1e9:>12.0f}"
+            )
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,120 @@
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import Popen
+from time import perf_counter
+
+from orjson import dumps
+
+from .testing import (
+    cleanup_db,
+    http_request,
+    start_server,
+    stop_server,
+)
+
+
+def make_body(client: int, request: int, batch_size: int) -> bytes:
+    return dumps(
+        {
+            "events": [
+                {
+                    "event_id": f"event-{client}-{request}-{i}",
+                    "topic": f"topic-{client % 4}",
+                    "source": "benchmark",
+                    "payload": {
+                        "message": f"Message {i}",
+                        "timestamp": "2025-01-01T00:00:00",
+                    },
+                    "timestamp": "2025-01-01T00:00:00",
+                }
+                for i in range(batch_size)
+            ]
+        }
+    )
+
+
+def run_client(
+    base_url: str, client: int, requests: int, batch_size: int
+) -> list[float]:
+    headers: dict[str, str] = {"Content-Type": "application/json"}
+    latencies: list[float] = []
+
+    for request in range(requests):
+        body: bytes = make_body(client, request, batch_size)
+        start: float = perf_counter()
+        status, _, _ = http_request(
+            f"{base_url}/publish?ack=durable", method="POST", data=body, headers=headers
+        )
+        latencies.append(perf_counter() - start)
+
+        if status != 200:
+            raise RuntimeError(f"Durable publish failed with status {status}")
+
+    return latencies
+
+
+def measure_concurrency(
+    clients: int, requests: int, batch_size: int, port: str
+) -> tuple[float, float, float]:
+    base_url: str = f"http://localhost:{port}"
+    db_path: str = f"benchmark_durable_ack_{clients}.db"
+
+    cleanup_db(db_path)
+    server: Popen[bytes] = start_server(db_path, port)
+
+    try:
+        start: float = perf_counter()
+
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            latencies: list[float] = [
+                latency
+                for client_latencies in executor.map(
+                    lambda client: run_client(base_url, client, requests, batch_size),
+                    range(clients),
+                )
+                for latency in client_latencies
+            ]
+
+        elapsed: float = perf_counter() - start
+    finally:
+        stop_server(server)
+        cleanup_db(db_path)
+
+    latencies.sort()
+
+    return (
+        len(latencies) * batch_size / elapsed,
+        latencies[len(latencies) // 2] * 1000,
+        latencies[int(len(latencies) * 0.99)] * 1000,
+    )
+
+
+def run_benchmark() -> None:
+    port: str = "8001"
+    total_requests: int = 640
+    batch_size: int = 10
+    client_counts: list[int] = [1, 4, 16, 64]
+
+    print("\n" + "=" * 70)
+    print("DURABLE ACK BENCHMARK".center(70))
+    print("=" * 70)
+    print(f"  Total Requests      : {total_requests:,}")
+    print(f"  Events per Request  : {batch_size}")
+    print(f"  Concurrent Clients  : {', '.join(str(count) for count in client_counts)}")
+    print("=" * 70 + "\n")
+
+    print(
+        f"  {'Clients':>8}  {'Throughput (events/s)':>22}  {'p50 Ack (ms)':>13}  {'p99 Ack (ms)':>13}"
+    )
+    print("-" * 70)
+
+    for clients in client_counts:
+        throughput, p50, p99 = measure_concurrency(
+            clients, total_requests // clients, batch_size, port
+        )
+        print(f"  {clients:>8}  {throughput:>22.2f}  {p50:>13.2f}  {p99:>13.2f}")
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,85 @@
+from subprocess import Popen
+from time import time
+
+from .benchmark_batch import wait_until_received
+from .testing import (
+    EventData,
+    cleanup_db,
+    generate_test_events,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def measure_log_mode(
+    log_mode: str, events: list[EventData], port: str
+) -> tuple[float, float]:
+    base_url: str = f"http://localhost:{port}"
+    db_path: str = f"benchmark_logging_{log_mode}.db"
+
+    cleanup_db(db_path)
+    server: Popen[bytes] = start_server(
+        db_path,
+        port,
+        extra_env={
+            "CONSUMER_LOG_MODE": log_mode,
+            "CONSUMER_BATCH_SIZE": "500",
+        },
+    )
+
+    try:
+        start: float = time()
+
+        for i in range(0, len(events), 5000):
+            status_code, _ = post_request(
+                url=f"{base_url}/publish", data={"events": events[i : i + 5000]}
+            )
+            if status_code != 200:
+                raise RuntimeError(f"Publish failed with status {status_code}")
+
+        if not wait_until_received(base_url, len(events)):
+            raise RuntimeError("Consumer stalled before draining the queue")
+
+        elapsed: float = time() - start
+    finally:
+        stop_server(server)
+        cleanup_db(db_path)
+
+    return elapsed, len(events) / elapsed if elapsed > 0 else 0
+
+
+def run_benchmark() -> None:
+    port: str = "8001"
+    total_events: int = 100000
+    duplicate_ratio: float = 0.2
+    log_modes: list[str] = ["verbose", "sampled", "off"]
+
+    events: list[EventData] = generate_test_events(total_events, duplicate_ratio)
+
+    print("\n" + "=" * 70)
+    print("CONSUMER LOGGING BENCHMARK".center(70))
+    print("=" * 70)
+    print(f"  Total Events        : {len(events):,}")
+    print(f"  Duplicate Ratio     : {duplicate_ratio:.1%}")
+    print(f"  Log Modes           : {', '.join(log_modes)}")
+    print("=" * 70 + "\n")
+
+    print(
+        f"  {'Mode':>10}  {'Elapsed (s)':>12}  {'Throughput (events/s)':>22}  {'Speedup':>8}"
+    )
+    print("-" * 70)
+
+    baseline: float | None = None
+    for log_mode in log_modes:
+        elapsed, throughput = measure_log_mode(log_mode, events, port)
+        baseline = baseline or throughput
+        print(
+            f"  {log_mode:>10}  {elapsed:>12.3f}  {throughput:>22.2f}  {throughput / baseline:>7.2f}x"
+        )
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,296 @@
+from argparse import ArgumentParser, Namespace
+from asyncio import run, sleep
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from os import environ
+from os.path import join
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import cast
+
+from src.aggregator.app.models.event_cursor import EventCursorModel
+from src.aggregator.app.models.events import EventModel, EventPayloadModel
+from src.aggregator.app.services.consumer import ConsumerService, configure_log_sink
+from src.aggregator.app.services.deduplication_store import DeduplicationStoreService
+
+from .benchmark_report import compare_results, make_results, summarize, write_results
+
+TOPICS: int = 10
+
+
+def make_events(start: int, count: int) -> list[EventModel]:
+    now: datetime = datetime.now()
+
+    return [
+        EventModel(
+            event_id=f"event-{i}",
+            topic=f"topic-{i % TOPICS}",
+            source="benchmark",
+            payload=EventPayloadModel(message=f"Message {i}", timestamp=now),
+            timestamp=now,
+        )
+        for i in range(start, start + count)
+    ]
+
+
+async def measure(
+    name: str, size: int, ops: int, operation: Callable[[int], Awaitable[object]]
+) -> dict[str, object]:
+    timings: list[float] = []
+    for i in range(ops):
+        started_at: float = perf_counter()
+        _ = await operation(i)
+        timings.append(perf_counter() - started_at)
+
+    return {"name": name, "size": size, "us": summarize(timings, 1_000_000)}
+
+
+async def populate(db_path: str, size: int) -> None:
+    store: DeduplicationStoreService = DeduplicationStoreService(db_path)
+    await store.initialize()
+
+    for start in range(0, size, 1000):
+        _ = await store.check_and_mark(make_events(start, min(1000, size - start)))
+
+    await store.close()
+
+
+async def measure_store(db_path: str, size: int) -> list[dict[str, object]]:
+    results: list[dict[str, object]] = []
+
+    async def initialize(_: int) -> None:
+        store: DeduplicationStoreService = DeduplicationStoreService(db_path)
+        await store.initialize()
+        await store.close()
+
+    results.append(await measure("initialize", size, 3, initialize))
+
+    store: DeduplicationStoreService = DeduplicationStoreService(db_path)
+    await store.initialize()
+
+    try:
+        results.append(
+            await measure(
+                "get_events_page.topic.cold",
+                size,
+                TOPICS,
+                lambda i: store.get_events_page(
+                    f"topic-{i}", EventCursorModel(after=0), 1000
+                ),
+            )
+        )
+        results.append(
+            await measure(
+                "get_events_page.topic.warm",
+                size,
+                100,
+                lambda i: store.get_events_page(
+                    f"topic-{i % TOPICS}", EventCursorModel(after=0), 1000
+                ),
+            )
+        )
+        pages: int = max(1, min(10, size // 1000))
+        results.append(
+            await measure(
+                "get_events_page.limit_1000.cold",
+                size,
+                pages,
+                lambda i: store.get_events_page(
+                    None, EventCursorModel(after=i * 1000), 1000
+                ),
+            )
+        )
+        results.append(
+            await measure(
+                "get_events_page.limit_1000.warm",
+                size,
+                100,
+                lambda i: store.get_events_page(
+                    None, EventCursorModel(after=i % pages * 1000), 1000
+                ),
+            )
+        )
+        results.append(
+            await measure(
+                "is_processed.hit",
+                size,
+                1000,
+                lambda i: store.is_processed(
+                    f"event-{i * 7919 % size}", f"topic-{i * 7919 % size % TOPICS}"
+                ),
+            )
+        )
+        results.append(
+            await measure(
+                "is_processed.miss",
+                size,
+                1000,
+                lambda i: store.is_processed(f"missing-{i}", f"topic-{i % TOPICS}"),
+            )
+        )
+
+        fresh: list[EventModel] = make_events(size, 200)
+        results.append(
+            await measure(
+                "mark_processed",
+                size,
+                len(fresh),
+                lambda i: store.mark_processed(fresh[i]),
+            )
+        )
+
+        batches: list[EventModel] = make_events(size + len(fresh), 20 * 500)
+        results.append(
+            await measure(
+                "check_and_mark.batch_500",
+                size,
+                20,
+                lambda i: store.check_and_mark(batches[i * 500 : (i + 1) * 500]),
+            )
+        )
+        results.append(
+            await measure(
+                "stats.update_received",
+                size,
+                10000,
+                lambda _: store.update_received(),
+            )
+        )
+        results.append(
+            await measure(
+                "stats.update_duplicated_dropped",
+                size,
+                10000,
+                lambda _: store.update_duplicated_dropped(),
+            )
+        )
+
+        async def flush_stats(_: int) -> None:
+            await store.update_received()
+            await store.flush_stats()
+
+        results.append(await measure("stats.flush", size, 100, flush_stats))
+    finally:
+        await store.close()
+
+    return results
+
+
+async def measure_consumer(db_path: str, size: int) -> list[dict[str, object]]:
+    environ["DEDUPLICATION_DB_PATH"] = db_path
+
+    consumer: ConsumerService = ConsumerService()
+    await consumer.initialize()
+    await consumer.start()
+
+    events: list[EventModel] = make_events(size * 2, 10000)
+    received: int = cast(int, (await consumer.get_stats())["received"])
+
+    try:
+        started_at: float = perf_counter()
+        publish: dict[str, object] = await measure(
+            "consumer.publish.batch_100",
+            size,
+            len(events) // 100,
+            lambda i: consumer.publish(events[i * 100 : (i + 1) * 100], 100 * 256),
+        )
+
+        while cast(int, (await consumer.get_stats())["received"]) < received + len(
+            events
+        ):
+            await sleep(0.001)
+
+        elapsed: float = perf_counter() - started_at
+    finally:
+        await consumer.close()
+
+    return [
+        publish,
+        {
+            "name": "consumer.drain",
+            "size": size,
+            "us": summarize([elapsed / len(events)], 1_000_000),
+            "events_per_second": len(events) / elapsed if elapsed > 0 else 0,
+        },
+    ]
+
+
+async def run_suite(sizes: list[int]) -> list[dict[str, object]]:
+    results: list[dict[str, object]] = []
+
+    for size in sizes:
+        with TemporaryDirectory() as directory:
+            db_path: str = join(directory, "benchmark.db")
+
+            await populate(db_path, size)
+            results.extend(await measure_store(db_path, size))
+            results.extend(await measure_consumer(db_path, size))
+
+    return results
+
+
+def print_results(results: list[dict[str, object]]) -> None:
+    print("\n" + "=" * 86)
+    print("IN-PROCESS MICROBENCHMARKS".center(86))
+    print("=" * 86 + "\n")
+
+    print(
+        f"  {'Operation':<34}  {'Rows':>9}  {'Ops':>6}  {'mean (us)':>10}  {'p50 (us)':>10}  {'p99 (us)':>10}"
+    )
+    print("-" * 86)
+    for result in results:
+        us: dict[str, float] = cast(dict[str, float], result["us"])
+        print(
+            f"  {result['name']:<34}  {result['size']:>9,}  {us['count']:>6.0f}  "
+            f"{us['mean']:>10.2f}  {us['p50']:>10.2f}  {us['p99']:>10.2f}"
+        )
+
+    print("\n" + "=" * 86 + "\n")
+
+
+def parse_arguments() -> Namespace:
+    parser: ArgumentParser = ArgumentParser(
+        description="In-process microbenchmarks for the deduplication store and consumer"
+    )
+    _ = parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        help="Comma-separated row counts to pre-populate",
+    )
+    _ = parser.add_argument("--output", default="", help="Write JSON results here")
+    _ = parser.add_argument(
+        "--baseline", default="", help="Compare against a previous JSON result"
+    )
+
+    return parser.parse_args()
+
+
+def run_benchmark() -> None:
+    arguments: Namespace = parse_arguments()
+    sizes: list[int] = [int(size) for size in arguments.sizes.split(",") if size]
+
+    environ.setdefault("CONSUMER_LOG_MODE", "off")
+    configure_log_sink()
+    results: list[dict[str, object]] = run(run_suite(sizes))
+
+    print_results(results)
+
+    report: dict[str, object] = make_results(
+        "micro",
+        {
+            "sizes": sizes,
+            "topics": TOPICS,
+            "profile": environ.get("DEDUPLICATION_DB_PROFILE", "durable"),
+        },
+        results=results,
+    )
+
+    if arguments.output:
+        write_results(arguments.output, report)
+
+    if arguments.baseline:
+        compare_results(report, arguments.baseline, ("mean", "p50", "p99"))
+
+
+if __name__ == "__main__":
+    run_benchmark()
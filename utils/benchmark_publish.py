@@ -0,0 +1,69 @@
+from subprocess import Popen
+from time import perf_counter
+from typing import LiteralString
+
+from orjson import dumps
+
+from .testing import (
+    EventData,
+    cleanup_db,
+    generate_test_events,
+    http_request,
+    start_server,
+    stop_server,
+)
+
+
+def run_benchmark() -> None:
+    port: str = "8001"
+    base_url: LiteralString = f"http://localhost:{port}"
+    db_path: str = "benchmark_publish.db"
+
+    batch_size: int = 5000
+    rounds: int = 20
+    duplicate_ratio: float = 0.2
+
+    events: list[EventData] = generate_test_events(batch_size, duplicate_ratio)
+    body: bytes = dumps({"events": events})
+    headers: dict[str, str] = {"Content-Type": "application/json"}
+
+    print("\n" + "=" * 70)
+    print("PUBLISH PATH BENCHMARK".center(70))
+    print("=" * 70)
+    print(f"  Batch Size          : {batch_size:,}")
+    print(f"  Rounds              : {rounds}")
+    print(f"  Body Size           : {len(body) / 1024:.1f} KiB")
+    print("=" * 70 + "\n")
+
+    cleanup_db(db_path)
+    server: Popen[bytes] = start_server(db_path, port)
+
+    latencies: list[float] = []
+    try:
+        for _ in range(rounds):
+            start: float = perf_counter()
+            status, _, _ = http_request(
+                f"{base_url}/publish", method="POST", data=body, headers=headers
+            )
+            latencies.append(perf_counter() - start)
+
+            if status != 200:
+                raise RuntimeError(f"Publish failed with status {status}")
+    finally:
+        stop_server(server)
+        cleanup_db(db_path)
+
+    latencies.sort()
+    total_time: float = sum(latencies)
+
+    print(f"  Mean Request Latency       : {total_time / rounds * 1000:.2f}ms")
+    print(f"  Median Request Latency     : {latencies[rounds // 2] * 1000:.2f}ms")
+    print(f"  Fastest Request Latency    : {latencies[0] * 1000:.2f}ms")
+    print(
+        f"  Publish Throughput         : {batch_size * rounds / total_time:.2f} events/s"
+    )
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    run_benchmark()
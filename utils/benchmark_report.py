@@ -0,0 +1,97 @@
+from datetime import datetime
+from platform import platform, python_version
+
+from orjson import OPT_INDENT_2, dumps, loads
+
+PERCENTILES: dict[str, float] = {
+    "p50": 0.5,
+    "p95": 0.95,
+    "p99": 0.99,
+    "p999": 0.999,
+}
+
+
+def summarize(values: list[float], scale: float = 1.0) -> dict[str, float]:
+    if not values:
+        return {"count": 0}
+
+    ordered: list[float] = sorted(values)
+    summary: dict[str, float] = {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) * scale,
+    }
+    for name, quantile in PERCENTILES.items():
+        summary[name] = (
+            ordered[min(len(ordered) - 1, int(len(ordered) * quantile))] * scale
+        )
+    summary["max"] = ordered[-1] * scale
+
+    return summary
+
+
+def make_results(
+    suite: str, config: dict[str, object], **sections: object
+) -> dict[str, object]:
+    return {
+        "suite": suite,
+        "created_at": datetime.now().isoformat(),
+        "python": python_version(),
+        "platform": platform(),
+        "config": config,
+        **sections,
+    }
+
+
+def write_results(path: str, results: dict[str, object]) -> None:
+    with open(path, "wb") as file:
+        _ = file.write(dumps(results, option=OPT_INDENT_2))
+
+
+def flatten(value: object, prefix: str = "") -> dict[str, float]:
+    if isinstance(value, bool):
+        return {}
+
+    if isinstance(value, int | float):
+        return {prefix: float(value)}
+
+    if isinstance(value, dict):
+        flattened: dict[str, float] = {}
+        for key, item in value.items():
+            flattened.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+
+        return flattened
+
+    if isinstance(value, list):
+        flattened = {}
+        for item in value:
+            if isinstance(item, dict) and "name" in item:
+                name: str = f"{item['name']}[{item.get('size', '')}]"
+                flattened.update(
+                    flatten(
+                        {key: field for key, field in item.items() if key != "name"},
+                        f"{prefix}.{name}" if prefix else name,
+                    )
+                )
+
+        return flattened
+
+    return {}
+
+
+def compare_results(
+    results: dict[str, object], baseline_path: str, keys: tuple[str, ...]
+) -> None:
+    with open(baseline_path, "rb") as file:
+        baseline: dict[str, float] = flatten(loads(file.read()))
+
+    current: dict[str, float] = flatten(results)
+
+    print(f"  {'Metric':<52}  {'Baseline':>12}  {'Current':>12}  {'Change':>8}")
+    print("-" * 90)
+    for name, value in current.items():
+        if not name.endswith(keys) or name not in baseline or name.startswith("config"):
+            continue
+
+        previous: float = baseline[name]
+        change: float = (value - previous) / previous * 100 if previous else 0
+        print(f"  {name:<52}  {previous:>12.3f}  {value:>12.3f}  {change:>+7.1f}%")
@@ -0,0 +1,87 @@
+from asyncio import gather, run
+from datetime import datetime
+from os import cpu_count, environ
+from time import perf_counter
+
+from src.aggregator.app.models.events import EventModel, EventPayloadModel
+from src.aggregator.app.services.sharded_deduplication_store import (
+    ShardedDeduplicationStoreService,
+)
+
+from .testing import cleanup_db
+
+
+def make_events(count: int, topics: int) -> list[EventModel]:
+    now: datetime = datetime.now()
+
+    return [
+        EventModel(
+            event_id=f"event-{i}",
+            topic=f"topic-{i % topics}",
+            source="benchmark",
+            payload=EventPayloadModel(message=f"Message {i}", timestamp=now),
+            timestamp=now,
+        )
+        for i in range(count)
+    ]
+
+
+async def measure_shards(
+    shards: int, events: list[EventModel], batch_size: int, writers: int
+) -> float:
+    db_path: str = f"benchmark_shards_{shards}.db"
+
+    cleanup_db(db_path)
+    environ["DEDUPLICATION_DB_PATH"] = f".{db_path}"
+    environ["DEDUPLICATION_SHARDS"] = str(shards)
+
+    store: ShardedDeduplicationStoreService = ShardedDeduplicationStoreService()
+    await store.initialize()
+
+    async def write(writer: int) -> None:
+        for i in range(writer * batch_size, len(events), writers * batch_size):
+            _ = await store.check_and_mark(events[i : i + batch_size])
+
+    try:
+        start: float = perf_counter()
+        _ = await gather(*(write(writer) for writer in range(writers)))
+        elapsed: float = perf_counter() - start
+    finally:
+        await store.close()
+        cleanup_db(db_path)
+
+    return len(events) / elapsed if elapsed > 0 else 0
+
+
+def run_benchmark() -> None:
+    total_events: int = 100000
+    batch_size: int = 100
+    writers: int = 8
+    topics: int = 64
+
+    events: list[EventModel] = make_events(total_events, topics)
+
+    print("\n" + "=" * 70)
+    print("SHARDED STORAGE BENCHMARK".center(70))
+    print("=" * 70)
+    print(f"  Total Events        : {total_events:,}")
+    print(f"  Batch Size          : {batch_size}")
+    print(f"  Concurrent Writers  : {writers}")
+    print(f"  Topics              : {topics}")
+    print(f"  CPU Cores           : {cpu_count()}")
+    print("=" * 70 + "\n")
+
+    print(f"  {'Shards':>8}  {'Throughput (events/s)':>22}  {'Speedup':>10}")
+    print("-" * 70)
+
+    baseline: float = 0
+    for shards in (1, 2, 4, 8):
+        throughput: float = run(measure_shards(shards, events, batch_size, writers))
+        baseline = baseline or throughput
+        print(f"  {shards:>8}  {throughput:>22.2f}  {throughput / baseline:>9.2f}x")
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,92 @@
+from asyncio import run
+from datetime import datetime
+from os import environ
+from time import perf_counter
+
+from src.aggregator.app.models.events import EventModel, EventPayloadModel
+from src.aggregator.app.services.deduplication_store import (
+    SQLITE_PROFILES,
+    DeduplicationStoreService,
+)
+
+from .testing import cleanup_db
+
+
+def make_events(count: int) -> list[EventModel]:
+    now: datetime = datetime.now()
+
+    return [
+        EventModel(
+            event_id=f"event-{i}",
+            topic=f"topic-{i % 10}",
+            source="benchmark",
+            payload=EventPayloadModel(message=f"Message {i}", timestamp=now),
+            timestamp=now,
+        )
+        for i in range(count)
+    ]
+
+
+async def measure_profile(
+    profile: str, events: list[EventModel], batch_size: int
+) -> tuple[float, float, float]:
+    db_path: str = f"benchmark_profile_{profile}.db"
+
+    cleanup_db(db_path)
+    environ["DEDUPLICATION_DB_PATH"] = f".{db_path}"
+    environ["DEDUPLICATION_DB_PROFILE"] = profile
+
+    store: DeduplicationStoreService = DeduplicationStoreService()
+    await store.initialize()
+
+    latencies: list[float] = []
+    try:
+        start: float = perf_counter()
+
+        for i in range(0, len(events), batch_size):
+            commit_start: float = perf_counter()
+            _ = await store.check_and_mark(events[i : i + batch_size])
+            latencies.append(perf_counter() - commit_start)
+
+        elapsed: float = perf_counter() - start
+    finally:
+        await store.close()
+        cleanup_db(db_path)
+
+    latencies.sort()
+
+    return (
+        len(events) / elapsed if elapsed > 0 else 0,
+        latencies[len(latencies) // 2] * 1000,
+        latencies[int(len(latencies) * 0.99)] * 1000,
+    )
+
+
+def run_benchmark() -> None:
+    total_events: int = 50000
+    batch_size: int = 50
+
+    events: list[EventModel] = make_events(total_events)
+
+    print("\n" + "=" * 70)
+    print("SQLITE PROFILE BENCHMARK".center(70))
+    print("=" * 70)
+    print(f"  Total Events        : {total_events:,}")
+    print(f"  Batch Size          : {batch_size}")
+    print(f"  Profiles            : {', '.join(SQLITE_PROFILES)}")
+    print("=" * 70 + "\n")
+
+    print(
+        f"  {'Profile':>10}  {'Throughput (events/s)':>22}  {'p50 Commit (ms)':>16}  {'p99 Commit (ms)':>16}"
+    )
+    print("-" * 70)
+
+    for profile in SQLITE_PROFILES:
+        throughput, p50, p99 = run(measure_profile(profile, events, batch_size))
+        print(f"  {profile:>10}  {throughput:>22.2f}  {p50:>16.3f}  {p99:>16.3f}")
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    run_benchmark()
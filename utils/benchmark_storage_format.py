@@ -0,0 +1,260 @@
+from argparse import ArgumentParser, Namespace
+from asyncio import run, sleep
+from datetime import UTC, datetime, timedelta
+from glob import glob
+from os import environ
+from os.path import getsize, join
+from random import Random
+from shutil import copyfile
+from sqlite3 import Connection, connect
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import cast
+
+from src.aggregator.app.models.event_cursor import EventCursorModel
+from src.aggregator.app.models.events import EventModel, EventPayloadModel
+from src.aggregator.app.services.deduplication_store import DeduplicationStoreService
+
+from .benchmark_report import compare_results, make_results, write_results
+
+TOPICS: int = 10
+SOURCES: int = 5
+BATCH_SIZE: int = 1000
+
+FORMATS: dict[str, dict[str, str]] = {
+    "text": {"DEDUPLICATION_STORAGE_FORMAT": "text"},
+    "compact": {
+        "DEDUPLICATION_STORAGE_FORMAT": "compact",
+        "DEDUPLICATION_PAYLOAD_COMPRESSION": "none",
+    },
+    "compact+zlib": {
+        "DEDUPLICATION_STORAGE_FORMAT": "compact",
+        "DEDUPLICATION_PAYLOAD_COMPRESSION": "zlib",
+    },
+    "compact+dictionary": {
+        "DEDUPLICATION_STORAGE_FORMAT": "compact",
+        "DEDUPLICATION_PAYLOAD_COMPRESSION": "dictionary",
+    },
+}
+
+
+def generate_events(count: int, seed: int) -> list[EventModel]:
+    random: Random = Random(seed)
+    started_at: datetime = datetime(2025, 1, 1, tzinfo=UTC)
+    actions: list[str] = ["created", "updated", "deleted", "viewed", "exported"]
+    resources: list[str] = ["orders", "invoices", "customers", "shipments"]
+
+    return [
+        EventModel(
+            event_id=f"storage-event-{i}",
+            topic=f"service-{i % TOPICS}.events",
+            source=f"worker-{random.randrange(SOURCES)}.chronicle.internal",
+            payload=EventPayloadModel(
+                message=(
+                    f"User {random.randrange(1000)} {random.choice(actions)} "
+                    f"/api/v1/{random.choice(resources)}/{random.randrange(100000)} "
+                    f"status={random.choice((200, 200, 200, 404, 500))} "
+                    f"latency_ms={random.randrange(500)}"
+                ),
+                timestamp=started_at + timedelta(milliseconds=i),
+            ),
+            timestamp=started_at + timedelta(milliseconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def db_size(db_path: str) -> int:
+    return sum(getsize(path) for path in glob(f"{db_path}*"))
+
+
+def payload_bytes(db_path: str) -> float:
+    connection: Connection = connect(db_path)
+    row: tuple[float] = connection.execute(
+        "SELECT AVG(LENGTH(payload)) FROM processed_events"
+    ).fetchone()
+    connection.close()
+
+    return row[0]
+
+
+def is_compact(db_path: str) -> bool:
+    connection: Connection = connect(db_path)
+    columns: dict[str, str] = {
+        row[1]: row[2]
+        for row in connection.execute("PRAGMA table_info(processed_events)")
+    }
+    connection.close()
+
+    return columns.get("topic") == "INTEGER"
+
+
+def vacuum(db_path: str) -> None:
+    connection: Connection = connect(db_path)
+    _ = connection.execute("VACUUM")
+    _ = connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    connection.close()
+
+
+async def measure_format(
+    db_path: str, events: list[EventModel], text_db_path: str
+) -> dict[str, object]:
+    store: DeduplicationStoreService = DeduplicationStoreService(db_path)
+    await store.initialize()
+
+    started_at: float = perf_counter()
+    for i in range(0, len(events), BATCH_SIZE):
+        _ = await store.check_and_mark(events[i : i + BATCH_SIZE])
+    write_seconds: float = perf_counter() - started_at
+
+    await store.close()
+    vacuum(db_path)
+
+    store = DeduplicationStoreService(db_path)
+    started_at = perf_counter()
+    await store.initialize()
+    initialize_seconds: float = perf_counter() - started_at
+
+    started_at = perf_counter()
+    for topic in range(TOPICS):
+        cursor: EventCursorModel | None = EventCursorModel(after=0)
+        while cursor is not None:
+            _, cursor = await store.get_events_page(
+                f"service-{topic}.events", cursor, 1000
+            )
+    load_seconds: float = perf_counter() - started_at
+
+    started_at = perf_counter()
+    streamed: int = 0
+    async for chunk in store.iter_events_ndjson(None):
+        streamed += chunk.count(b"\n")
+    stream_seconds: float = perf_counter() - started_at
+
+    await store.close()
+
+    result: dict[str, object] = {
+        "db_mb": db_size(db_path) / 1024 / 1024,
+        "payload_bytes": payload_bytes(db_path),
+        "write_events_per_second": len(events) / write_seconds,
+        "initialize_seconds": initialize_seconds,
+        "load_events_per_second": len(events) / load_seconds,
+        "stream_events_per_second": streamed / stream_seconds,
+    }
+
+    if text_db_path and is_compact(db_path):
+        migrated_path: str = f"{db_path}.migrated"
+        copyfile(text_db_path, migrated_path)
+
+        store = DeduplicationStoreService(migrated_path)
+        started_at = perf_counter()
+        await store.initialize()
+        while not is_compact(migrated_path):
+            await sleep(0.01)
+        result["migration_seconds"] = perf_counter() - started_at
+        await store.close()
+
+    return result
+
+
+async def run_formats(
+    formats: list[str], events: list[EventModel]
+) -> list[dict[str, object]]:
+    results: list[dict[str, object]] = []
+
+    with TemporaryDirectory() as directory:
+        text_db_path: str = ""
+
+        for name in ["text", *(name for name in formats if name != "text")]:
+            environ.update(FORMATS[name])
+            db_path: str = join(directory, f"{name}.db")
+
+            result: dict[str, object] = await measure_format(
+                db_path, events, text_db_path
+            )
+            if name == "text":
+                text_db_path = db_path
+
+            if name in formats:
+                results.append({"name": name, "size": len(events), **result})
+
+    return results
+
+
+def print_results(results: list[dict[str, object]]) -> None:
+    print("\n" + "=" * 104)
+    print("PROCESSED_EVENTS STORAGE FORMAT BENCHMARK".center(104))
+    print("=" * 104 + "\n")
+
+    print(
+        f"  {'Format':<20}  {'DB (MB)':>8}  {'Payload (B)':>11}  {'Write (ev/s)':>12}  {'Init (s)':>8}  "
+        f"{'Load (ev/s)':>12}  {'Stream (ev/s)':>13}  {'Migrate (s)':>11}"
+    )
+    print("-" * 104)
+    for result in results:
+        migration: str = (
+            f"{cast(float, result['migration_seconds']):>11.2f}"
+            if "migration_seconds" in result
+            else f"{'-':>11}"
+        )
+        print(
+            f"  {result['name']:<20}  {result['db_mb']:>8.1f}  {result['payload_bytes']:>11.1f}  "
+            f"{result['write_events_per_second']:>12,.0f}  {result['initialize_seconds']:>8.2f}  "
+            f"{result['load_events_per_second']:>12,.0f}  {result['stream_events_per_second']:>13,.0f}  {migration}"
+        )
+
+    print("\n" + "=" * 104 + "\n")
+
+
+def parse_arguments() -> Namespace:
+    parser: ArgumentParser = ArgumentParser(
+        description="Compare processed_events storage formats by size and throughput"
+    )
+    _ = parser.add_argument("--events", type=int, default=200000)
+    _ = parser.add_argument(
+        "--formats",
+        default=",".join(FORMATS),
+        help=f"Comma-separated subset of {', '.join(FORMATS)}",
+    )
+    _ = parser.add_argument("--seed", type=int, default=1)
+    _ = parser.add_argument("--output", default="", help="Write JSON results here")
+    _ = parser.add_argument(
+        "--baseline", default="", help="Compare against a previous JSON result"
+    )
+
+    return parser.parse_args()
+
+
+def run_benchmark() -> None:
+    arguments: Namespace = parse_arguments()
+    formats: list[str] = [name for name in arguments.formats.split(",") if name]
+
+    environ.setdefault("DEDUPLICATION_DB_PROFILE", "fast")
+    events: list[EventModel] = generate_events(arguments.events, arguments.seed)
+    results: list[dict[str, object]] = run(run_formats(formats, events))
+
+    print_results(results)
+
+    report: dict[str, object] = make_results(
+        "storage_format",
+        {
+            "events": arguments.events,
+            "topics": TOPICS,
+            "sources": SOURCES,
+            "profile": environ["DEDUPLICATION_DB_PROFILE"],
+        },
+        results=results,
+    )
+
+    if arguments.output:
+        write_results(arguments.output, report)
+
+    if arguments.baseline:
+        compare_results(
+            report,
+            arguments.baseline,
+            ("db_mb", "events_per_second", "seconds"),
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,89 @@
+from subprocess import Popen
+from time import time
+
+from .benchmark_batch import wait_until_received
+from .testing import (
+    EventData,
+    cleanup_db,
+    generate_test_events,
+    post_request,
+    start_server,
+    stop_server,
+)
+
+
+def measure_workers(
+    workers: int, batch_size: int, events: list[EventData], port: str
+) -> tuple[float, float]:
+    base_url: str = f"http://localhost:{port}"
+    db_path: str = f"benchmark_workers_{workers}_{batch_size}.db"
+
+    cleanup_db(db_path)
+    server: Popen[bytes] = start_server(
+        db_path,
+        port,
+        extra_env={
+            "CONSUMER_WORKERS": str(workers),
+            "CONSUMER_BATCH_SIZE": str(batch_size),
+            "CONSUMER_BATCH_TIMEOUT_MS": "10",
+        },
+    )
+
+    try:
+        start: float = time()
+
+        for i in range(0, len(events), 5000):
+            status_code, _ = post_request(
+                url=f"{base_url}/publish", data={"events": events[i : i + 5000]}
+            )
+            if status_code != 200:
+                raise RuntimeError(f"Publish failed with status {status_code}")
+
+        if not wait_until_received(base_url, len(events)):
+            raise RuntimeError("Consumers stalled before draining the queue")
+
+        elapsed: float = time() - start
+    finally:
+        stop_server(server)
+        cleanup_db(db_path)
+
+    return elapsed, len(events) / elapsed if elapsed > 0 else 0
+
+
+def run_benchmark() -> None:
+    port: str = "8001"
+    total_events: int = 100000
+    duplicate_ratio: float = 0.2
+    worker_counts: list[int] = [1, 2, 4, 8]
+    batch_sizes: list[int] = [50, 500]
+
+    events: list[EventData] = generate_test_events(total_events, duplicate_ratio)
+
+    print("\n" + "=" * 70)
+    print("CONSUMER WORKERS BENCHMARK".center(70))
+    print("=" * 70)
+    print(f"  Total Events        : {len(events):,}")
+    print(f"  Duplicate Ratio     : {duplicate_ratio:.1%}")
+    print(f"  Worker Counts       : {', '.join(str(count) for count in worker_counts)}")
+    print(f"  Batch Sizes         : {', '.join(str(size) for size in batch_sizes)}")
+    print("=" * 70 + "\n")
+
+    print(
+        f"  {'Batch':>6}  {'Workers':>8}  {'Elapsed (s)':>12}  {'Throughput (events/s)':>22}  {'Speedup':>8}"
+    )
+    print("-" * 70)
+
+    for batch_size in batch_sizes:
+        baseline: float | None = None
+        for workers in worker_counts:
+            elapsed, throughput = measure_workers(workers, batch_size, events, port)
+            baseline = baseline or throughput
+            print(
+                f"  {batch_size:>6}  {workers:>8}  {elapsed:>12.3f}  {throughput:>22.2f}  {throughput / baseline:>7.2f}x"
+            )
+
+    print("\n" + "=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,4 +1,5 @@
 from datetime import datetime
+from glob import glob
 from http.client import HTTPResponse
 from os import environ, remove
 from os.path import exists
@@ -8,7 +9,7 @@ from typing import Any, TypeAlias
 from urllib.error import HTTPError
 from urllib.request import Request, urlopen
 
-from orjson import dumps
+from orjson import dumps, loads
 
 EventData: TypeAlias = dict[str, str | dict[str, str]]
 
@@ -51,10 +52,29 @@ def generate_test_events(
     return events
 
 
-def start_server(db_path: str, port: str = "8000") -> Popen[bytes]:
+def make_events(topic: str, count: int, start: int = 0) -> list[EventData]:
+    return [
+        {
+            "event_id": f"{topic}-event-{i}",
+            "topic": topic,
+            "source": "test-source",
+            "payload": {
+                "message": f"Message {i}",
+                "timestamp": "2025-01-01T00:00:00",
+            },
+            "timestamp": "2025-01-01T00:00:00",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def start_server(
+    db_path: str, port: str = "8000", extra_env: dict[str, str] | None = None
+) -> Popen[bytes]:
     env: dict[str, str] = environ.copy()
     env["APP_PORT"] = port
     env["DEDUPLICATION_DB_PATH"] = f".{db_path}"
+    env.update(extra_env or {})
 
     server: Popen[bytes] = Popen[bytes](
         [
@@ -94,6 +114,25 @@ def get_request(url: str) -> tuple[int | None, str | None]:
         return None, None
 
 
+def get_all_events(url: str) -> list[dict[str, Any]] | None:
+    events: list[dict[str, Any]] = []
+    separator: str = "&" if "?" in url else "?"
+    next_cursor: str | None = None
+
+    while True:
+        page_url: str = f"{url}{separator}cursor={next_cursor}" if next_cursor else url
+        status, response = get_request(url=page_url)
+        if status != 200 or not response:
+            return None
+
+        page: dict[str, Any] = loads(response)
+        events.extend(page["events"])
+
+        next_cursor = page["next_cursor"]
+        if not next_cursor:
+            return events
+
+
 def post_request(url: str, data: dict[str, Any]) -> tuple[int | None, str | None]:
     try:
         request: Request = Request(
@@ -114,8 +153,29 @@ def post_request(url: str, data: dict[str, Any]) -> tuple[int | None, str | None
         return None, None
 
 
+def http_request(
+    url: str,
+    method: str = "GET",
+    data: bytes | None = None,
+    headers: dict[str, str] | None = None,
+) -> tuple[int | None, dict[str, str], bytes | None]:
+    try:
+        request: Request = Request(url, data=data, headers=headers or {}, method=method)
+
+        response: HTTPResponse = urlopen(url=request)
+        with response:
+            return response.getcode(), dict(response.headers.items()), response.read()
+    except HTTPError as e:
+        return e.code, dict(e.headers.items()), e.read()
+    except Exception as e:
+        print(f"Request failed: {e}")
+
+        return None, {}, None
+
+
 def cleanup_db(db_path: str) -> None:
     db_path = f".{db_path}"
 
-    if exists(path=db_path):
-        remove(path=db_path)
+    for path in [db_path, *glob(f"{db_path}.*"), *glob(f"{db_path}-*")]:
+        if exists(path=path):
+            remove(path=path)